@@ -12,12 +12,29 @@ Outputs: cases.csv, documents.csv, results.json  .
 
 import asyncio
 import base64
+import contextlib
+import cProfile
 import csv
+import functools
+import heapq
+import io
 import json
 import logging
+import os
+import pstats
+import random
 import re
-from datetime import date, timedelta
+import sqlite3
+import threading
+import time
+import tracemalloc
+import unicodedata
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field, fields
+from datetime import date, datetime, timedelta, timezone
 from pathlib import Path
+from urllib.parse import parse_qsl, urlencode, urlsplit
 
 import nodriver as uc
 from lxml import html as lxml_html
@@ -227,6 +244,318 @@ PROCEEDINGS = [
 INDEX_BOOK_LETTERS = list("ABCDEFGHIJKLMNOPQRSTUVWXYZ")
 
 
+def date_chunks(start: date, end: date, chunk_days: int) -> list[tuple[str, str]]:
+    """Split [start, end] into (MM/DD/YYYY, MM/DD/YYYY) windows of chunk_days."""
+    chunks = []
+    current = start
+    while current <= end:
+        chunk_end = min(current + timedelta(days=chunk_days - 1), end)
+        chunks.append((current.strftime("%m/%d/%Y"), chunk_end.strftime("%m/%d/%Y")))
+        current = chunk_end + timedelta(days=1)
+    return chunks
+
+
+def unit_label(unit: dict) -> str:
+    """Short stable label for a bulk work unit, e.g. "Kings|PROBATE PETITION|01/01/2025-01/30/2025"."""
+    parts = [unit["court"]]
+    if unit.get("search_type", "file_info") != "file_info":
+        parts.append(unit["search_type"])
+    parts += [str(v) for k, v in unit.items()
+              if k not in ("court", "search_type", "deep", "from_date", "to_date")]
+    if unit.get("from_date"):
+        parts.append(f"{unit['from_date']}-{unit.get('to_date', '')}")
+    return "|".join(parts)
+
+
+def read_file_numbers(path: str | Path, courts: list[str] | None = None) -> list[tuple[str, str]]:
+    """Read (court, file_number) pairs for batch lookups.
+
+    .txt  one file number per line, or "Court,number"
+    .csv  columns file_number (or file_num) and optional court
+    .json a results.json — every case's related_files, in that case's court
+    Numbers without a court are paired with each of courts.
+    """
+    path = Path(path)
+    courts = courts or []
+    pairs: list[tuple[str | None, str]] = []
+    if path.suffix.lower() == ".json":
+        data = json.loads(path.read_text(encoding="utf-8"))
+        for case in data.get("cases", []):
+            related = case.get("related_files") or "[]"
+            for num in json.loads(related) if isinstance(related, str) else related:
+                pairs.append((case.get("court"), num))
+    elif path.suffix.lower() == ".csv":
+        with open(path, newline="", encoding="utf-8") as f:
+            for rec in csv.DictReader(f):
+                num = (rec.get("file_number") or rec.get("file_num") or "").strip()
+                if num:
+                    pairs.append(((rec.get("court") or "").strip() or None, num))
+    else:
+        for line in path.read_text(encoding="utf-8").splitlines():
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            court, _, num = line.rpartition(",")
+            pairs.append((court.strip() or None, num.strip()))
+
+    out: dict[tuple[str, str], None] = {}  # ordered de-dupe
+    for court, num in pairs:
+        for c in ([court] if court else courts):
+            if c not in COURTS:
+                log.warning("Skipping %s: unknown court %r", num, c)
+                continue
+            out[(c, num)] = None
+    return list(out)
+
+
+# ---------------------------------------------------------------------------
+# Record model: slotted dataclasses for rows, cases, parties and documents
+# ---------------------------------------------------------------------------
+SEARCH_ROW_FIELDS = ("btn_value", "file_num", "file_date", "file_name", "proceeding", "dod")
+SEARCH_ROW_DERIVED = ("file_date_iso", "dod_iso", "name_key")
+CASE_FIELDS = (
+    "court", "file_number", "file_history_url", "file_date", "file_name",
+    "proceeding", "dod", "estate_closed", "disposed", "letters", "letters_issued",
+    "estate_attorney", "estate_attorney_firm", "judge",
+)
+CASE_DERIVED = ("file_date_iso", "dod_iso", "letters_issued_iso", "name_key")
+
+_SITE_DATE = re.compile(r"(\d{1,2})/(\d{1,2})/(\d{4})")
+
+
+@functools.lru_cache(maxsize=16384)
+def iso_date(value: str) -> str:
+    """Site date (MM/DD/YYYY, possibly unpadded) -> YYYY-MM-DD; "" if not a date.
+
+    Cached: the same few thousand dates recur across every row and document.
+    """
+    m = _SITE_DATE.fullmatch(value.strip())
+    if not m:
+        return ""
+    month, day, year = (int(g) for g in m.groups())
+    try:
+        return date(year, month, day).isoformat()
+    except ValueError:
+        return ""
+
+
+@functools.lru_cache(maxsize=65536)
+def name_key(name: str) -> str:
+    """Normalised decedent name for grouping and matching.
+
+    ASCII-folded, upper case, punctuation other than , ' - dropped and
+    spacing made uniform: "Smith ,John  A." -> "SMITH, JOHN A".
+    """
+    s = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode().upper()
+    s = re.sub(r"[^A-Z0-9,'\- ]+", " ", s)
+    s = re.sub(r"\s*,\s*", ", ", s)
+    return re.sub(r"\s+", " ", s).strip(" ,")
+
+
+@functools.cache
+def _init_fields(cls) -> frozenset[str]:
+    return frozenset(f.name for f in fields(cls) if f.init)
+
+
+def _from_dict(cls, d: dict):
+    """Build a record from a dict, ignoring keys it has no (init) field for."""
+    names = _init_fields(cls)
+    return cls(**{k: v for k, v in d.items() if k in names})
+
+
+@dataclass(slots=True)
+class SearchRow:
+    """One search results row.
+
+    Historical search tables keep their header-derived columns (plus
+    search_type and href) in extra; to_dict() flattens them back. ISO
+    dates and the name key are derived once, on construction.
+    """
+    btn_value: str = ""
+    file_num: str = ""
+    file_date: str = ""
+    file_name: str = ""
+    proceeding: str = ""
+    dod: str = ""
+    court: str = ""
+    extra: dict | None = None
+    file_date_iso: str = field(init=False, default="")
+    dod_iso: str = field(init=False, default="")
+    name_key: str = field(init=False, default="")
+
+    def __post_init__(self):
+        self.file_date_iso = iso_date(self.file_date)
+        self.dod_iso = iso_date(self.dod)
+        self.name_key = name_key(self.file_name)
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "SearchRow":
+        extra = {k: v for k, v in d.items()
+                 if k not in SEARCH_ROW_FIELDS and k not in SEARCH_ROW_DERIVED and k != "court"}
+        return cls(*(d.get(k, "") for k in SEARCH_ROW_FIELDS),
+                   court=d.get("court", ""), extra=extra or None)
+
+    def to_dict(self) -> dict:
+        d = {k: getattr(self, k) for k in SEARCH_ROW_FIELDS + SEARCH_ROW_DERIVED}
+        if self.extra is not None:
+            # Historical rows: only the columns their table actually had
+            d = {k: v for k, v in d.items() if v or k in ("btn_value", "file_num")}
+            d.update(self.extra)
+        d["court"] = self.court
+        return d
+
+
+@dataclass(slots=True)
+class Party:
+    party: str
+    role: str
+    dod: str = ""
+    appointed: str = ""
+    active: str = ""
+    dod_iso: str = field(init=False, default="")
+    appointed_iso: str = field(init=False, default="")
+
+    def __post_init__(self):
+        self.dod_iso = iso_date(self.dod)
+        self.appointed_iso = iso_date(self.appointed)
+
+    def to_dict(self) -> dict:
+        return {k: getattr(self, k) for k in self.__slots__}
+
+
+@dataclass(slots=True)
+class Document:
+    doc_name: str
+    comments: str = ""
+    qty: str = ""
+    doc_filed: str = ""
+    signed_date: str = ""
+    uuid: str = ""
+    has_link: bool = False
+    viewer_url: str = ""
+    downloaded: bool = False
+    local_path: str = ""
+    doc_filed_iso: str = field(init=False, default="")
+    signed_date_iso: str = field(init=False, default="")
+
+    def __post_init__(self):
+        self.doc_filed_iso = iso_date(self.doc_filed)
+        self.signed_date_iso = iso_date(self.signed_date)
+
+    def to_dict(self) -> dict:
+        d = {k: getattr(self, k) for k in self.__slots__}
+        if not self.local_path:
+            del d["local_path"]  # only written for downloaded documents
+        return d
+
+
+@dataclass(slots=True)
+class Case:
+    """One deep-scraped file."""
+    court: str
+    file_number: str
+    file_history_url: str = ""
+    file_date: str = ""
+    file_name: str = ""
+    proceeding: str = ""
+    dod: str = ""
+    estate_closed: str = ""
+    disposed: str = ""
+    letters: str = ""
+    letters_issued: str = ""
+    estate_attorney: str = ""
+    estate_attorney_firm: str = ""
+    judge: str = ""
+    parties: list[Party] = field(default_factory=list)
+    documents: list[Document] = field(default_factory=list)
+    related_files: list[str] = field(default_factory=list)
+    file_date_iso: str = field(init=False, default="")
+    dod_iso: str = field(init=False, default="")
+    letters_issued_iso: str = field(init=False, default="")
+    name_key: str = field(init=False, default="")
+
+    def __post_init__(self):
+        self.file_date_iso = iso_date(self.file_date)
+        self.dod_iso = iso_date(self.dod)
+        self.letters_issued_iso = iso_date(self.letters_issued)
+        self.name_key = name_key(self.file_name)
+
+    def to_row(self) -> dict:
+        """Flat row as in results_deep.csv / results.json: parties, documents
+        and related_files as JSON strings ("" when empty)."""
+        row = {k: getattr(self, k) for k in CASE_FIELDS + CASE_DERIVED}
+        row["parties"] = json.dumps([p.to_dict() for p in self.parties]) if self.parties else ""
+        row["documents"] = json.dumps([d.to_dict() for d in self.documents]) if self.documents else ""
+        row["document_count"] = len(self.documents)
+        row["related_files"] = json.dumps(self.related_files) if self.related_files else ""
+        return row
+
+    @classmethod
+    def from_row(cls, row: dict) -> "Case":
+        def nested(key):
+            v = row.get(key) or []
+            return json.loads(v) if isinstance(v, str) else v
+
+        return cls(
+            **{k: row.get(k, "") for k in CASE_FIELDS},
+            parties=[_from_dict(Party, p) for p in nested("parties")],
+            documents=[_from_dict(Document, d) for d in nested("documents")],
+            related_files=nested("related_files"),
+        )
+
+
+def bench_record_memory(n: int = 500_000) -> dict:
+    """Traced memory for n synthetic search rows and n/10 cases held as the
+    old dicts (rows copied with court, cases with JSON-string columns) vs
+    the slotted records."""
+
+    def row_values(i):
+        return (f"v{i}", f"{2000 + i % 25}-{i}", f"{1 + i % 12:02d}/{1 + i % 28:02d}/2024",
+                f"SMITH, JOHN {i}", "PROBATE PETITION", "01/02/2023")
+
+    def case_parts(i):
+        parties = [Party(f"SMITH, JANE {i}", "Executor", "", "01/05/2024", "Y"),
+                   Party(f"SMITH, JOHN {i}", "Decedent", "01/02/2023")]
+        docs = [Document(f"DOC {j}", "", "1", "01/05/2024", "", f"uuid-{i}-{j}", True,
+                         f"{BASE}/File/FileHistory?UUIDValue=uuid-{i}-{j}") for j in range(5)]
+        return parties, docs
+
+    def old_rows():
+        return [{**dict(zip(SEARCH_ROW_FIELDS, row_values(i))), "court": "Kings"} for i in range(n)]
+
+    def new_rows():
+        return [SearchRow(*row_values(i), court="Kings") for i in range(n)]
+
+    def old_cases():
+        out = []
+        for i in range(n // 10):
+            parties, docs = case_parts(i)
+            out.append(Case("Kings", f"2024-{i}", parties=parties, documents=docs).to_row())
+        return out
+
+    def new_cases():
+        out = []
+        for i in range(n // 10):
+            parties, docs = case_parts(i)
+            out.append(Case("Kings", f"2024-{i}", parties=parties, documents=docs))
+        return out
+
+    report = {}
+    for label, build in (("rows_dict", old_rows), ("rows_slots", new_rows),
+                         ("cases_dict", old_cases), ("cases_slots", new_cases)):
+        tracemalloc.start()
+        t0 = time.perf_counter()
+        held = build()
+        seconds = time.perf_counter() - t0
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        report[label] = {"count": len(held), "mb": round(current / 1_048_576, 1),
+                         "bytes_each": current // max(len(held), 1),
+                         "build_s": round(seconds, 2)}
+        del held
+    return report
+
+
 # ---------------------------------------------------------------------------
 # HTML parsers (work on raw HTML strings via lxml)
 # ---------------------------------------------------------------------------
@@ -248,7 +577,7 @@ def extract_select_options(html_str: str, select_id: str) -> dict:
     return options
 
 
-def parse_search_results(html_str: str) -> list[dict]:
+def parse_search_results(html_str: str) -> list[SearchRow]:
     tree = lxml_html.fromstring(html_str)
     table = tree.cssselect("#NameResultsTable")
     if not table:
@@ -264,14 +593,14 @@ def parse_search_results(html_str: str) -> list[dict]:
         btn = tr.cssselect("button[name='button'], button.ButtonAsLink")
         btn_value = btn[0].get("value", "") if btn else ""
 
-        results.append({
-            "btn_value": btn_value,
-            "file_num": vals[0] if vals else "",
-            "file_date": vals[1] if len(vals) > 1 else "",
-            "file_name": vals[2] if len(vals) > 2 else "",
-            "proceeding": vals[3] if len(vals) > 3 else "",
-            "dod": vals[4] if len(vals) > 4 else "",
-        })
+        results.append(SearchRow(
+            btn_value=btn_value,
+            file_num=vals[0] if vals else "",
+            file_date=vals[1] if len(vals) > 1 else "",
+            file_name=vals[2] if len(vals) > 2 else "",
+            proceeding=vals[3] if len(vals) > 3 else "",
+            dod=vals[4] if len(vals) > 4 else "",
+        ))
     return results
 
 
@@ -327,13 +656,7 @@ def parse_file_history(html_str: str) -> dict:
             for tr in data_rows:
                 cells = [td.text_content().strip() for td in tr.cssselect("td")]
                 if len(cells) >= 2:
-                    parties.append({
-                        "party": cells[0],
-                        "role": cells[1],
-                        "dod": cells[2] if len(cells) > 2 else "",
-                        "appointed": cells[3] if len(cells) > 3 else "",
-                        "active": cells[4] if len(cells) > 4 else "",
-                    })
+                    parties.append(Party(*cells[:5]))
             break
 
     # Strategy 2: Find by "Parties" text in page, then next table
@@ -345,13 +668,7 @@ def parse_file_history(html_str: str) -> dict:
             for line in section_text.split("\n"):
                 parts = [p.strip() for p in line.split("  ") if p.strip()]
                 if len(parts) >= 2 and parts[0] not in ("Party", "Parties", "Name", "Role"):
-                    parties.append({
-                        "party": parts[0],
-                        "role": parts[1],
-                        "dod": parts[2] if len(parts) > 2 else "",
-                        "appointed": parts[3] if len(parts) > 3 else "",
-                        "active": parts[4] if len(parts) > 4 else "",
-                    })
+                    parties.append(Party(*parts[:5]))
 
     # Documents table
     documents = []
@@ -363,15 +680,11 @@ def parse_file_history(html_str: str) -> dict:
                 continue
             vals = [c.text_content().strip() for c in cells]
             btn = tr.cssselect("button[name='UUIDValue']")
-            documents.append({
-                "doc_name": vals[0],
-                "comments": vals[1] if len(vals) > 1 else "",
-                "qty": vals[2] if len(vals) > 2 else "",
-                "doc_filed": vals[3] if len(vals) > 3 else "",
-                "signed_date": vals[4] if len(vals) > 4 else "",
-                "uuid": btn[0].get("value", "") if btn else "",
-                "has_link": bool(btn),
-            })
+            documents.append(Document(
+                *vals[:5],
+                uuid=btn[0].get("value", "") if btn else "",
+                has_link=bool(btn),
+            ))
 
     # Related files
     related_files = []
@@ -403,6 +716,77 @@ def parse_file_history(html_str: str) -> dict:
     }
 
 
+# Historical search types. Unlike File Search, these forms have not been
+# mapped field-by-field, so each logical field lists candidate ids/names
+# tried in order. Matches are exact: a field or submit button that matches
+# none of them fails the search rather than filling in a lookalike.
+INDEX_SEARCH_TYPES = ("old_index", "index_book", "will")
+
+SEARCH_FORMS = {
+    "old_index": {
+        "court": ["CourtSelect", "CourtId", "CourtIDasString"],
+        "last_name": ["LastName", "txtLastName"],
+        "first_name": ["FirstName", "txtFirstName"],
+        "submit": ["OldIndexSearchSubmit", "OldIndexSubmit"],
+    },
+    "index_book": {
+        "court": ["CourtSelect", "CourtId", "CourtIDasString"],
+        "letter": ["SelectedLetter", "Letter", "IndexLetter"],
+        "submit": ["IndexBookSearchSubmit", "IndexBookSubmit"],
+    },
+    "will": {
+        "court": ["CourtSelect", "CourtId", "CourtIDasString"],
+        "last_name": ["LastName", "txtLastName"],
+        "first_name": ["FirstName", "txtFirstName"],
+        "from_date": ["FromDateString", "FromDate"],
+        "to_date": ["ToDateString", "ToDate"],
+        "submit": ["WillSearchSubmit", "WillsSearchSubmit"],
+    },
+}
+
+# Header text -> key used by parse_search_results, so historical rows share
+# the shallow CSV schema where the columns mean the same thing.
+RESULT_HEADER_KEYS = {
+    "file #": "file_num", "file number": "file_num", "file no": "file_num",
+    "file date": "file_date", "date filed": "file_date",
+    "name": "file_name", "file name": "file_name", "decedent": "file_name",
+    "proceeding": "proceeding",
+    "dod": "dod", "date of death": "dod",
+}
+
+
+def parse_index_results(html_str: str) -> list[SearchRow]:
+    """Parse a historical search results table with header-derived keys.
+
+    Uses #NameResultsTable when present, otherwise the table with the most
+    rows. Link targets (buttons or anchors) are kept as btn_value / href.
+    """
+    tree = lxml_html.fromstring(html_str)
+    tables = tree.cssselect("#NameResultsTable") or sorted(
+        tree.cssselect("table"), key=lambda t: len(t.cssselect("tr")), reverse=True)
+    if not tables:
+        return []
+    table = tables[0]
+    headers = [th.text_content().strip() for th in table.cssselect("thead th, tr:first-child th")]
+    keys = [RESULT_HEADER_KEYS.get(h.lower().rstrip(":"), re.sub(r"\W+", "_", h.lower()).strip("_")
+                                   or f"col{i}") for i, h in enumerate(headers)]
+    results = []
+    for tr in table.cssselect("tbody tr") or table.cssselect("tr")[1:]:
+        cells = tr.cssselect("td")
+        if not cells:
+            continue
+        row = {}
+        for i, c in enumerate(cells):
+            row[keys[i] if i < len(keys) else f"col{i}"] = c.text_content().strip()
+        btn = tr.cssselect("button[name='button'], button.ButtonAsLink")
+        row["btn_value"] = btn[0].get("value", "") if btn else ""
+        link = tr.cssselect("a[href]")
+        if link:
+            row["href"] = link[0].get("href", "")
+        results.append(SearchRow.from_dict(row))
+    return results
+
+
 # ---------------------------------------------------------------------------
 # Browser helper: JavaScript for form manipulation
 # ---------------------------------------------------------------------------
@@ -430,6 +814,42 @@ JS_SET_INPUT = """
 })('%s', '%s')
 """
 
+# A numbered marker on window survives until the document is replaced, so
+# "not carrying the latest mark + complete" means the navigation we
+# triggered has landed. Numbering keeps bfcache restores (history.back)
+# from looking stale: they carry an older mark, not the latest one.
+JS_MARK_PAGE = "window.__wsMark = %d"
+JS_PAGE_READY = "JSON.stringify(window.__wsMark !== %d && document.readyState === 'complete')"
+
+JS_FILE_FORM_STATE = """
+JSON.stringify((function() {
+    var sel = document.getElementById('CourtSelect');
+    var num = document.getElementById('FileNumber') ||
+              document.querySelector('input[name="FileNumber"]');
+    var btn = document.getElementById('FileSearchSubmit') ||
+              document.getElementById('FileSearchSubmit2');
+    var info = document.getElementById('SelectedProceeding') &&
+               document.querySelector('input[name="FromDateString"]');
+    return {ready: !!(sel && num && btn), info: !!info, court: sel ? sel.value : ''};
+})())
+"""
+
+JS_SET_FIELD = """
+(function(cands, value) {
+    function set(el) {
+        el.value = value;
+        el.dispatchEvent(new Event('input', {bubbles: true}));
+        el.dispatchEvent(new Event('change', {bubbles: true}));
+    }
+    for (var i = 0; i < cands.length; i++) {
+        var el = document.getElementById(cands[i]) ||
+                 document.querySelector('[name="' + cands[i] + '"]');
+        if (el) { set(el); return cands[i]; }
+    }
+    return '';
+})(%s, %s)
+"""
+
 JS_CLICK_SUBMIT = """
 (function() {
     var btn = document.querySelector('input[type="submit"], button[type="submit"]');
@@ -448,12 +868,1626 @@ JS_CLICK_BUTTON_BY_VALUE = """
     return false;
 })('%s')
 """
+# A row read from another results page (DataTables API or a stepped pager)
+# has no button in the DOM: post its value through the results form, as
+# clicking its button would have
+JS_POST_RESULT_VALUE = """
+(function(val) {
+    var table = document.getElementById('NameResultsTable');
+    var form = table && table.closest('form');
+    if (!form) return false;
+    var inp = document.createElement('input');
+    inp.type = 'hidden'; inp.name = 'button'; inp.value = val;
+    form.appendChild(inp);
+    form.submit();
+    return true;
+})(%s)
+"""
+
+# Search results paging. DataTables keeps only the visible page's rows in
+# the DOM; the API has all of them (as nodes, or as cell HTML when
+# deferRender never built the node).
+RESULTS_NEXT_SELECTOR = (
+    "'.paginate_button.next:not(.disabled), li.next:not(.disabled) a, "
+    "a[rel=next], .pagination a[aria-label=Next]'"
+)
+JS_RESULTS_PAGING = """
+(function() {
+    var t = document.getElementById('NameResultsTable');
+    if (!t) return JSON.stringify({table: false});
+    var out = {table: true, page_rows: t.querySelectorAll('tbody tr').length,
+               next: !!document.querySelector(%s)};
+    var $ = window.jQuery;
+    if ($ && $.fn && $.fn.dataTable && $.fn.dataTable.isDataTable(t)) {
+        var api = $(t).DataTable();
+        var nodes = api.rows().nodes().toArray(), data = api.rows().data().toArray();
+        out.datatable = true;
+        out.total = api.page.info().recordsDisplay;  // server-side tables hold one page
+        out.rows = nodes.map(function(n, i) {
+            if (n) return n.outerHTML;
+            var cells = Array.isArray(data[i]) ? data[i] : Object.values(data[i] || {});
+            return '<tr>' + cells.map(function(c) { return '<td>' + c + '</td>'; }).join('') + '</tr>';
+        });
+    }
+    return JSON.stringify(out);
+})()
+""" % RESULTS_NEXT_SELECTOR
+JS_CLICK_NEXT_PAGE = """
+(function() {
+    var el = document.querySelector(%s);
+    if (!el) return false;
+    el.click();
+    return true;
+})()
+""" % RESULTS_NEXT_SELECTOR
+# Row counts that look like a cap rather than a real total when no pager
+# was found: common page lengths and server result limits
+RESULT_PAGE_LENGTHS = frozenset({10, 25, 50, 100})
+RESULT_CAPS = frozenset({100, 200, 250, 500, 1000})
+RESULTS_MAX_PAGES = 200
+
+
+# ---------------------------------------------------------------------------
+# Run telemetry: structured JSON-lines events + live progress / ETA
+# ---------------------------------------------------------------------------
+class EventLog:
+    """Append-only JSON-lines event stream for long bulk runs.
+
+    Disabled when path is None, so call sites can emit unconditionally.
+    Events are buffered and written in batches — emitting from the hot
+    loop costs one dict and one list append.
+    """
+
+    def __init__(self, path: str | Path | None = None, flush_every: int = 50):
+        self.path = Path(path) if path else None
+        self.flush_every = flush_every
+        self._buf: list[dict] = []
+        self._fh = None
+        if self.path:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._fh = open(self.path, "a", encoding="utf-8")
+
+    def emit(self, event: str, **fields):
+        if self._fh is None:
+            return
+        fields["event"] = event
+        fields["ts"] = round(time.time(), 3)
+        self._buf.append(fields)
+        if len(self._buf) >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        if self._fh is None or not self._buf:
+            return
+        self._fh.write("".join(
+            json.dumps(e, ensure_ascii=False, default=str) + "\n" for e in self._buf
+        ))
+        self._fh.flush()
+        self._buf.clear()
+
+    def close(self):
+        self.flush()
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+
+
+class RunProgress:
+    """Counters for a whole run (all courts and chunks) with throughput/ETA.
+
+    Work units are search chunks; files are rows deep-scraped inside them.
+    ETA = remaining files in the current unit at the observed per-file rate
+    plus remaining units at the observed per-unit rate.
+    """
+
+    def __init__(self, events: EventLog | None = None, report_every: float = 30.0):
+        self.events = events or EventLog(None)
+        self.report_every = report_every
+        self.started = time.monotonic()
+        self._last_report = self.started
+        self.units_total = 0
+        self.units_done = 0
+        self.unit_time = 0.0
+        self.unit_files_total = 0
+        self.unit_files_done = 0
+        self.files_done = 0
+        self.file_time = 0.0
+        self.rows_found = 0
+        self.duplicates = 0  # search rows for files already seen this run
+        self.docs_downloaded = 0
+        self.bytes_downloaded = 0
+        self.errors = 0
+
+    def add_units(self, n: int):
+        self.units_total += n
+
+    def unit_finished(self, duration: float, failed: bool = False):
+        self.units_done += 1
+        self.unit_time += duration
+        self.unit_files_total = self.unit_files_done = 0
+        if failed:
+            self.errors += 1
+        self.maybe_report()
+
+    def unit_files(self, n: int):
+        self.unit_files_total = n
+        self.unit_files_done = 0
+
+    def file_finished(self, duration: float, docs: int = 0):
+        self.files_done += 1
+        self.unit_files_done += 1
+        self.file_time += duration
+        self.docs_downloaded += docs
+        self.maybe_report()
+
+    def eta_seconds(self) -> float | None:
+        eta = 0.0
+        left_in_unit = self.unit_files_total - self.unit_files_done
+        if left_in_unit > 0 and self.files_done:
+            eta += left_in_unit * self.file_time / self.files_done
+        # The unit in flight is counted by the per-file term above
+        units_left = self.units_total - self.units_done - (1 if self.unit_files_total else 0)
+        if units_left > 0:
+            if not self.units_done:
+                return None
+            eta += units_left * self.unit_time / self.units_done
+        return eta
+
+    def snapshot(self) -> dict:
+        elapsed = max(time.monotonic() - self.started, 1e-6)
+        minutes = elapsed / 60
+        eta = self.eta_seconds()
+        return {
+            "elapsed_s": round(elapsed, 1),
+            "units_done": self.units_done,
+            "units_total": self.units_total,
+            "files_done": self.files_done,
+            "rows_found": self.rows_found,
+            "duplicates": self.duplicates,
+            "docs_downloaded": self.docs_downloaded,
+            "bytes_downloaded": self.bytes_downloaded,
+            "errors": self.errors,
+            "files_per_min": round(self.files_done / minutes, 2),
+            "mb_per_min": round(self.bytes_downloaded / 1_048_576 / minutes, 2),
+            "eta_s": round(eta, 1) if eta is not None else None,
+        }
+
+    def summary(self) -> str:
+        s = self.snapshot()
+        eta = (str(timedelta(seconds=int(s["eta_s"]))) if s["eta_s"] is not None else "?")
+        return (f"units {s['units_done']}/{s['units_total']}, files {s['files_done']}, "
+                f"docs {s['docs_downloaded']} ({s['bytes_downloaded'] / 1_048_576:.1f} MB), "
+                f"{s['files_per_min']} files/min, {s['mb_per_min']} MB/min, "
+                f"duplicates {s['duplicates']}, errors {s['errors']}, ETA {eta}")
+
+    def maybe_report(self, force: bool = False):
+        now = time.monotonic()
+        if not force and now - self._last_report < self.report_every:
+            return
+        self._last_report = now
+        log.info("Progress: %s", self.summary())
+        self.events.emit("progress", **self.snapshot())
+
+
+class RunProfiler:
+    """--profile-cpu, --profile-mem and --debug-loop for one run.
+
+    cpu_path: write a cProfile .pstats of the event-loop thread there.
+    mem_top: trace allocations; checkpoint() logs the top mem_top source
+        lines by growth since the previous checkpoint (chunk boundaries).
+    slow_callback: put the loop in asyncio debug mode and warn about any
+        callback or coroutine step that blocks it longer than this (s).
+    """
+
+    def __init__(self, cpu_path: str | None = None, mem_top: int = 0,
+                 slow_callback: float = 0.0):
+        self.cpu_path = Path(cpu_path) if cpu_path else None
+        self.mem_top = mem_top
+        self.slow_callback = slow_callback
+        self._cpu: cProfile.Profile | None = None
+        self._snapshot: tracemalloc.Snapshot | None = None
+
+    def start(self):
+        if self.slow_callback:
+            loop = asyncio.get_running_loop()
+            loop.set_debug(True)
+            loop.slow_callback_duration = self.slow_callback
+            logging.getLogger("asyncio").setLevel(logging.WARNING)
+        if self.mem_top:
+            tracemalloc.start(10)
+        if self.cpu_path:
+            self._cpu = cProfile.Profile()
+            self._cpu.enable()
+
+    def checkpoint(self, label: str):
+        if not self.mem_top or not tracemalloc.is_tracing():
+            return
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+        ))
+        if self._snapshot is None:
+            stats = snapshot.statistics("lineno")
+        else:
+            stats = snapshot.compare_to(self._snapshot, "lineno")
+        self._snapshot = snapshot
+        current, peak = tracemalloc.get_traced_memory()
+        log.info("Memory after %s: %.1f MB traced (peak %.1f MB); top allocators:",
+                 label, current / 1_048_576, peak / 1_048_576)
+        for stat in stats[:self.mem_top]:
+            frame = stat.traceback[0]
+            grown = getattr(stat, "size_diff", stat.size)
+            log.info("    %+9.1f KB  %8.1f KB  %s:%d", grown / 1024, stat.size / 1024,
+                     frame.filename, frame.lineno)
+
+    def stop(self):
+        if self._cpu:
+            self._cpu.disable()
+            self.cpu_path.parent.mkdir(parents=True, exist_ok=True)
+            self._cpu.dump_stats(self.cpu_path)
+            out = io.StringIO()
+            pstats.Stats(self._cpu, stream=out).sort_stats("cumulative").print_stats(20)
+            log.info("CPU profile saved to %s (python -m pstats %s)\n%s",
+                     self.cpu_path, self.cpu_path, out.getvalue())
+            self._cpu = None
+        if self.mem_top and tracemalloc.is_tracing():
+            self.checkpoint("run")
+            tracemalloc.stop()
+
+
+# ---------------------------------------------------------------------------
+# Politeness: per-host token buckets with adaptive back-off
+# ---------------------------------------------------------------------------
+VIEWER_BASE = "https://iapps.courts.state.ny.us"
+
+
+class TokenBucket:
+    """Async token bucket. Waiters are served in FIFO order.
+
+    The effective rate adapts between min_rpm and the configured ceiling:
+    penalize() halves it and imposes a short cool-down, reward() creeps
+    back up by 5% of the ceiling per successful request.
+    """
+
+    def __init__(self, rpm: float, burst: int = 2, min_rpm: float = 6.0):
+        self.ceiling = rpm
+        self.rpm = rpm
+        self.min_rpm = min(min_rpm, rpm)
+        self.burst = burst
+        self.tokens = float(burst)
+        self.cooldown_until = 0.0
+        self.penalties = 0
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rpm / 60)
+        self._updated = now
+
+    async def acquire(self) -> float:
+        """Take one token, sleeping only as long as needed. Returns seconds waited."""
+        waited = 0.0
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                delay = max(self.cooldown_until - now, 0.0)
+                if not delay and self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                if not delay:
+                    delay = (1 - self.tokens) * 60 / self.rpm
+                await asyncio.sleep(delay)
+                waited += delay
+
+    def penalize(self, cooldown: float = 5.0):
+        self.penalties += 1
+        self.rpm = max(self.min_rpm, self.rpm / 2)
+        self.tokens = 0.0
+        self.cooldown_until = max(self.cooldown_until,
+                                  time.monotonic() + cooldown * min(self.penalties, 6))
+
+    def reward(self):
+        self.penalties = 0
+        if self.rpm < self.ceiling:
+            self.rpm = min(self.ceiling, self.rpm + self.ceiling * 0.05)
+
+
+class RateLimiter:
+    """One TokenBucket per host, shared by every tab of a scraper."""
+
+    def __init__(self, rpm: float, burst: int = 2):
+        self.rpm = rpm
+        self.burst = burst
+        self._buckets: dict[str, TokenBucket] = {}
+
+    def bucket(self, url: str) -> TokenBucket:
+        host = urlsplit(url).hostname or url
+        b = self._buckets.get(host)
+        if b is None:
+            b = self._buckets[host] = TokenBucket(self.rpm, self.burst)
+        return b
+
+    async def acquire(self, url: str = BASE) -> float:
+        return await self.bucket(url).acquire()
+
+    def penalize(self, url: str = BASE, reason: str = ""):
+        b = self.bucket(url)
+        b.penalize()
+        log.warning("Rate limiter: backing off %s to %.0f req/min (%s)",
+                    urlsplit(url).hostname, b.rpm, reason or "error")
+
+    def reward(self, url: str = BASE):
+        self.bucket(url).reward()
+
+
+# ---------------------------------------------------------------------------
+# Retries: failure classification, back-off with jitter, dead-letter queue
+# ---------------------------------------------------------------------------
+FAIL_TIMEOUT = "timeout"
+FAIL_SESSION = "session_expired"
+FAIL_VIEWER = "viewer_not_cleared"
+FAIL_PARSE = "parse_error"
+FAIL_OTHER = "other"
+
+
+def classify_failure(error: BaseException | str) -> str:
+    """Map an exception or a logged failure reason onto a failure kind."""
+    text = str(error).lower()
+    if isinstance(error, (asyncio.TimeoutError, TimeoutError)) or "timeout" in text \
+            or "timed out" in text:
+        return FAIL_TIMEOUT
+    if any(k in text for k in ("request could not be processed", "support id",
+                               "captcha", "session")):
+        return FAIL_SESSION
+    if any(k in text for k in ("not pdf", "bad pdf", "no tab", "too small", "cloudflare",
+                               "viewer")):
+        return FAIL_VIEWER
+    if isinstance(error, (KeyError, IndexError, json.JSONDecodeError)) or "parse" in text:
+        return FAIL_PARSE
+    return FAIL_OTHER
+
+
+class FileScrapeError(Exception):
+    """A deep scrape failed inside one file; the results page state is unknown."""
+
+    def __init__(self, court: str, file_num: str, cause: Exception, dead_lettered: bool):
+        super().__init__(f"{court} {file_num}: {cause}")
+        self.court = court
+        self.file_num = file_num
+        self.cause = cause
+        self.dead_lettered = dead_lettered
+
+
+class RetryPolicy:
+    """Exponential back-off with full jitter; per-kind attempt budgets."""
+
+    def __init__(self, max_attempts: int = 3, base: float = 2.0, cap: float = 60.0):
+        self.max_attempts = max_attempts
+        self.base = base
+        self.cap = cap
+        # Parse errors are usually deterministic — one retry covers a
+        # half-rendered page, more just burns time.
+        self.attempts_by_kind = {FAIL_PARSE: min(2, max_attempts)}
+
+    def attempts_for(self, kind: str) -> int:
+        return min(self.attempts_by_kind.get(kind, self.max_attempts), self.max_attempts)
+
+    def should_retry(self, kind: str, attempt: int) -> bool:
+        """attempt is the 1-based number of the attempt that just failed."""
+        return attempt < self.attempts_for(kind)
+
+    def delay(self, attempt: int) -> float:
+        return random.uniform(0, min(self.cap, self.base * 2 ** (attempt - 1)))
+
+
+class DeadLetterQueue:
+    """JSON-lines file of work units that failed permanently.
+
+    Entry types: "unit" (a search chunk), "file" (one deep-scraped file)
+    and "document" (one PDF). --retry-failed replays them.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.count = 0
+        self.added: list[dict] = []  # entries added by this process
+
+    def add(self, type_: str, kind: str, error: str, attempts: int, **fields):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        entry = {"type": type_, "kind": kind, "error": error, "attempts": attempts,
+                 "ts": round(time.time(), 3), **fields}
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self.count += 1
+        self.added.append(entry)
+
+    @property
+    def _replay_path(self) -> Path:
+        return self.path.with_suffix(self.path.suffix + ".replaying")
+
+    def take(self) -> list[dict]:
+        """Move the queue aside for replay; entries that fail again are re-added.
+
+        A .replaying file left by an interrupted replay is picked up again.
+        """
+        replay = self._replay_path
+        if self.path.exists():
+            with open(self.path, encoding="utf-8") as src, open(replay, "a", encoding="utf-8") as dst:
+                dst.write(src.read())
+            self.path.unlink()
+        if not replay.exists():
+            return []
+        with open(replay, encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def finish_replay(self, keep: list[dict] = ()):
+        """End a replay; entries in keep (not retried to an outcome) go back
+        on the queue as they were."""
+        if keep:
+            with open(self.path, "a", encoding="utf-8") as f:
+                for entry in keep:
+                    f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self.count += len(keep)
+        self._replay_path.unlink(missing_ok=True)
+
+
+# ---------------------------------------------------------------------------
+# Session health: page-state detection, age tracking, lifetime statistics
+# ---------------------------------------------------------------------------
+URL_KEYS = {u: k for k, u in URLS.items()}  # URL -> search option key
+SEARCH_OPTION = {  # search type -> search option key (others map to themselves)
+    "file_info": "file", "file_number": "file",
+    "name_person": "name", "name_org": "name",
+}
+
+PAGE_OK = "ok"
+PAGE_ERROR = "error"        # "Request Could Not Be Processed" (stale session)
+PAGE_WELCOME = "welcome"
+PAGE_CAPTCHA = "captcha"
+PAGE_OPTIONS = "options"    # Search Options buttons, no captcha
+
+
+def page_state(html_str: str) -> str:
+    """Classify a page by the session gate it shows, if any."""
+    if "Request Could Not Be Processed" in html_str or "support ID" in html_str:
+        return PAGE_ERROR
+    if "Start Search" in html_str and "Welcome to WebSurrogate" in html_str:
+        return PAGE_WELCOME
+    if "CAPTCHA is required" in html_str or "I am human" in html_str:
+        return PAGE_CAPTCHA
+    if "Select one of the following search options" in html_str:
+        return PAGE_OPTIONS
+    return PAGE_OK
+
+
+class SessionManager:
+    """Tracks the site session shared by every tab of one browser.
+
+    Records how long sessions we authenticated ourselves actually lived
+    (persisted across runs) so callers can refresh proactively at a work
+    unit boundary instead of discovering expiry mid-chunk. The lock makes
+    concurrent re-authentication collapse into one: callers pass the
+    generation they saw fail and skip the refresh if it has moved on.
+    """
+
+    def __init__(self, stats_path: str | Path | None = None, validate_after: float = 120.0):
+        self.stats_path = Path(stats_path) if stats_path else None
+        self.validate_after = validate_after
+        self.lock = asyncio.Lock()
+        self.generation = 0
+        self.started: float | None = None
+        self.last_success: float | None = None
+        self.restored = False
+        self.reauths = 0
+        self.lifetimes: list[float] = []
+        if self.stats_path and self.stats_path.exists():
+            try:
+                self.lifetimes = json.loads(self.stats_path.read_text())["lifetimes"]
+            except (OSError, ValueError, KeyError):
+                pass
+
+    def mark_authenticated(self, restored: bool = False):
+        self.started = self.last_success = time.monotonic()
+        self.restored = restored
+        self.generation += 1
+
+    def mark_success(self):
+        self.last_success = time.monotonic()
+
+    def mark_expired(self, reason: str = "", sample: bool = True):
+        """Record the lifetime of the session that just died.
+
+        sample=False ends a session we retired ourselves (a proactive
+        refresh): its age is not a lifetime and would drag the estimate down.
+        """
+        if self.started is None:
+            return
+        lifetime = time.monotonic() - self.started
+        log.info("Session ended after %.0fs (%s)", lifetime, reason or "expired")
+        self.reauths += 1
+        # A session restored from the profile started at an unknown time
+        if sample and not self.restored:
+            self.lifetimes = (self.lifetimes + [round(lifetime, 1)])[-200:]
+            self._save()
+        self.started = None
+
+    def _save(self):
+        if not self.stats_path:
+            return
+        self.stats_path.parent.mkdir(parents=True, exist_ok=True)
+        self.stats_path.write_text(json.dumps({
+            "lifetimes": self.lifetimes,
+            "expected_lifetime": self.expected_lifetime(),
+        }, indent=2))
+
+    def age(self) -> float:
+        return time.monotonic() - self.started if self.started is not None else 0.0
+
+    def idle(self) -> float:
+        return time.monotonic() - self.last_success if self.last_success is not None else 0.0
+
+    def expected_lifetime(self) -> float | None:
+        """Conservative (25th percentile) observed lifetime, once we have data."""
+        if len(self.lifetimes) < 3:
+            return None
+        ordered = sorted(self.lifetimes)
+        return ordered[len(ordered) // 4]
+
+    def due_for_refresh(self, upcoming: float = 0.0) -> bool:
+        """True if the session is expected to expire within `upcoming` seconds."""
+        expected = self.expected_lifetime()
+        return (expected is not None and self.started is not None
+                and self.age() + upcoming >= expected)
+
+    def summary(self) -> str:
+        expected = self.expected_lifetime()
+        return (f"age {self.age():.0f}s, {self.reauths} re-auth(s), "
+                f"expected lifetime {f'{expected:.0f}s' if expected else 'unknown'} "
+                f"({len(self.lifetimes)} samples)")
+
+
+# ---------------------------------------------------------------------------
+# CDP network instrumentation: resource blocking, byte metering
+# ---------------------------------------------------------------------------
+class ResourceFilter:
+    """Opt-in blocking of assets we never read (we only use DOM text and PDF bytes).
+
+    Fetch.enable pauses requests of the blocked resource types and fails
+    them unless the URL is allow-listed; Network.setBlockedURLs drops
+    analytics outright. The allow-list keeps Cloudflare challenges and the
+    hCaptcha widget (including its image challenge) working.
+    """
+
+    BLOCKED_TYPES = ("Image", "Font", "Stylesheet", "Media")
+    BLOCKED_URLS = [
+        "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+        "*connect.facebook.net*", "*hotjar.com*", "*clarity.ms*",
+    ]
+    ALLOW_HOSTS = ("challenges.cloudflare.com", "hcaptcha.com")
+    ALLOW_PATHS = ("/cdn-cgi/",)
+
+    def __init__(self):
+        self.blocked = 0
+        self.passed = 0
+
+    def allows(self, url: str) -> bool:
+        parts = urlsplit(url)
+        host = parts.hostname or ""
+        if any(host == h or host.endswith("." + h) for h in self.ALLOW_HOSTS):
+            return True
+        return any(parts.path.startswith(p) for p in self.ALLOW_PATHS)
+
+    async def attach(self, tab):
+        await tab.send(uc.cdp.network.enable())
+        await tab.send(uc.cdp.network.set_blocked_ur_ls(urls=self.BLOCKED_URLS))
+        await tab.send(uc.cdp.fetch.enable(patterns=[
+            uc.cdp.fetch.RequestPattern(
+                url_pattern="*", resource_type=uc.cdp.network.ResourceType(t),
+                request_stage=uc.cdp.fetch.RequestStage.REQUEST)
+            for t in self.BLOCKED_TYPES
+        ]))
+        tab.add_handler(uc.cdp.fetch.RequestPaused, self._on_paused)
+
+    async def detach(self, tab):
+        tab.remove_handler(uc.cdp.fetch.RequestPaused, self._on_paused)
+        await tab.send(uc.cdp.fetch.disable())
+        await tab.send(uc.cdp.network.set_blocked_ur_ls(urls=[]))
+
+    async def _on_paused(self, event, tab):
+        try:
+            if self.allows(event.request.url):
+                self.passed += 1
+                await tab.send(uc.cdp.fetch.continue_request(request_id=event.request_id))
+            else:
+                self.blocked += 1
+                await tab.send(uc.cdp.fetch.fail_request(
+                    request_id=event.request_id,
+                    error_reason=uc.cdp.network.ErrorReason.BLOCKED_BY_CLIENT))
+        except Exception as e:
+            log.debug("Resource filter: %s", e)
+
+
+class NetworkMeter:
+    """Counts bytes received by a tab (Network.loadingFinished) for benchmarks."""
+
+    def __init__(self):
+        self.bytes = 0
+        self.requests = 0
+
+    async def attach(self, tab):
+        await tab.send(uc.cdp.network.enable())
+        tab.add_handler(uc.cdp.network.LoadingFinished, self._on_finished)
+
+    def detach(self, tab):
+        tab.remove_handler(uc.cdp.network.LoadingFinished, self._on_finished)
+
+    def _on_finished(self, event):
+        self.bytes += int(event.encoded_data_length)
+        self.requests += 1
+
+    def reset(self):
+        self.bytes = self.requests = 0
+
+
+class ResponseCapture:
+    """Hands over a main-frame document's HTML straight from the network layer.
+
+    arm() before a click/submit returns a future; it resolves with the body
+    (Network.getResponseBody) as soon as the next main-frame Document
+    response finishes loading — without waiting for rendering or scripts,
+    which parse_search_results/parse_file_history don't need on these
+    server-rendered ASP.NET pages.
+    """
+
+    def __init__(self):
+        self._docs: set[str] = set()  # request ids of main-frame documents
+        self._waiter: asyncio.Future | None = None
+        self.captured = 0
+
+    async def attach(self, tab):
+        await tab.send(uc.cdp.network.enable())
+        tab.add_handler(uc.cdp.network.ResponseReceived, self._on_response)
+        tab.add_handler(uc.cdp.network.LoadingFinished, self._on_finished)
+
+    def detach(self, tab):
+        tab.remove_handler(uc.cdp.network.ResponseReceived, self._on_response)
+        tab.remove_handler(uc.cdp.network.LoadingFinished, self._on_finished)
+
+    def arm(self) -> asyncio.Future:
+        self.disarm()
+        self._docs.clear()
+        self._waiter = asyncio.get_running_loop().create_future()
+        return self._waiter
+
+    def disarm(self):
+        if self._waiter and not self._waiter.done():
+            self._waiter.cancel()
+        self._waiter = None
+
+    def _on_response(self, event, tab):
+        # The main frame's id is the page target's id
+        if event.type_ == uc.cdp.network.ResourceType.DOCUMENT \
+                and str(event.frame_id) == str(tab.target.target_id):
+            self._docs.add(str(event.request_id))
+
+    async def _on_finished(self, event, tab):
+        if str(event.request_id) not in self._docs or not self._waiter or self._waiter.done():
+            return
+        waiter = self._waiter
+        try:
+            body, b64 = await tab.send(uc.cdp.network.get_response_body(event.request_id))
+            html = base64.b64decode(body).decode("utf-8", "replace") if b64 else body
+        except Exception as e:
+            if not waiter.done():
+                waiter.set_exception(e)
+            return
+        if not waiter.done():
+            self.captured += 1
+            waiter.set_result(html)
+
+
+# ---------------------------------------------------------------------------
+# Record / replay: a SQLite archive of the site's responses and the PDFs
+# ---------------------------------------------------------------------------
+# Anti-forgery/view-state fields differ on every visit; they are left out
+# of request keys so a replayed form post matches its recording.
+VOLATILE_FIELDS = frozenset({
+    "__RequestVerificationToken", "__VIEWSTATE", "__VIEWSTATEGENERATOR", "__EVENTVALIDATION",
+})
+# Bodies are stored decoded, so these no longer describe them on replay
+REPLAY_DROP_HEADERS = frozenset({"content-encoding", "content-length", "transfer-encoding"})
+ARCHIVE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    id INTEGER PRIMARY KEY, key TEXT NOT NULL, url TEXT NOT NULL, status INTEGER,
+    headers TEXT, body BLOB, elapsed REAL
+);
+CREATE INDEX IF NOT EXISTS responses_key ON responses (key);
+CREATE TABLE IF NOT EXISTS documents (
+    uuid TEXT PRIMARY KEY, body BLOB NOT NULL, elapsed REAL
+);
+"""
+
+
+def request_key(method: str, url: str, post_data: str | None = None) -> str:
+    """Archive key of a request: method, URL and its stable form fields."""
+    key = f"{method.upper()} {url}"
+    if post_data:
+        pairs = sorted((k, v) for k, v in parse_qsl(post_data, keep_blank_values=True)
+                       if k not in VOLATILE_FIELDS)
+        key += "\n" + urlencode(pairs)
+    return key
+
+
+def _archive_db(path: str | Path) -> sqlite3.Connection:
+    db = sqlite3.connect(str(path))
+    db.executescript(ARCHIVE_SCHEMA)
+    return db
+
+
+class ArchiveRecorder:
+    """Records every response the site tab receives from the site host.
+
+    Fetch pauses each request twice: at the request stage (start of the
+    clock) and at the response stage, where status, headers and body are
+    stored under request_key() and the response continues unchanged.
+    Document PDFs come from viewer tabs and are added by the scraper
+    (add_document) keyed by UUID.
+    """
+
+    def __init__(self, path: str | Path, host: str = urlsplit(BASE).hostname):
+        self.path = Path(path)
+        self.host = host
+        self.db = _archive_db(self.path)
+        self.responses = 0
+        self.documents = 0
+        self._started: dict[str, float] = {}
+
+    async def attach(self, tab):
+        await tab.send(uc.cdp.fetch.enable(patterns=[
+            uc.cdp.fetch.RequestPattern(url_pattern=f"*://{self.host}/*", request_stage=stage)
+            for stage in (uc.cdp.fetch.RequestStage.REQUEST, uc.cdp.fetch.RequestStage.RESPONSE)
+        ]))
+        tab.add_handler(uc.cdp.fetch.RequestPaused, self._on_paused)
+
+    async def _on_paused(self, event, tab):
+        rid = str(event.request_id)
+        try:
+            if event.response_status_code is None and event.response_error_reason is None:
+                self._started[rid] = time.monotonic()
+                return
+            elapsed = time.monotonic() - self._started.pop(rid, time.monotonic())
+            body = b""
+            if event.response_error_reason is None and not 300 <= event.response_status_code < 400:
+                data, b64 = await tab.send(uc.cdp.fetch.get_response_body(event.request_id))
+                body = base64.b64decode(data) if b64 else data.encode("utf-8")
+            req = event.request
+            self.db.execute(
+                "INSERT INTO responses (key, url, status, headers, body, elapsed) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (request_key(req.method, req.url, req.post_data), req.url,
+                 event.response_status_code or 0,
+                 json.dumps([[h.name, h.value] for h in event.response_headers or []]),
+                 body, round(elapsed, 4)),
+            )
+            self.responses += 1
+            if self.responses % 50 == 0:
+                self.db.commit()
+        except Exception as e:
+            log.debug("Archive recorder: %s", e)
+        finally:
+            try:
+                await tab.send(uc.cdp.fetch.continue_request(request_id=event.request_id))
+            except Exception as e:
+                log.debug("Archive recorder: %s", e)
+
+    def add_document(self, uuid: str, body: bytes, elapsed: float):
+        self.db.execute("INSERT OR REPLACE INTO documents (uuid, body, elapsed) VALUES (?, ?, ?)",
+                        (uuid, body, round(elapsed, 4)))
+        self.documents += 1
+        self.db.commit()
+
+    def close(self):
+        self.db.commit()
+        self.db.close()
+
+    def summary(self) -> str:
+        return f"recorded {self.responses} responses and {self.documents} documents to {self.path}"
+
+
+class ArchiveReplayer:
+    """Serves a recorded archive to the site tab instead of the network.
+
+    Every request the tab makes is paused and fulfilled from the archive:
+    responses recorded under the same key are served in recording order
+    (the last one repeats); a GET falls back to the latest response for
+    the same URL, a POST never serves another form's response. Anything
+    else fails as if offline. latency is
+    "recorded" (sleep each response's recorded time) or "zero".
+    """
+
+    def __init__(self, path: str | Path, latency: str = "recorded"):
+        self.path = Path(path)
+        if not self.path.exists():
+            raise FileNotFoundError(f"No archive at {self.path}")
+        self.db = _archive_db(self.path)
+        self.latency = latency
+        self.served = 0
+        self.missed = 0
+        self._by_key: dict[str, list[int]] = {}
+        self._by_url: dict[str, int] = {}
+        for rid, key in self.db.execute("SELECT id, key FROM responses ORDER BY id"):
+            self._by_key.setdefault(key, []).append(rid)
+            if key.startswith("GET "):
+                self._by_url[key.split("\n", 1)[0]] = rid
+        self._cursor: dict[str, int] = {}
+
+    async def attach(self, tab):
+        await tab.send(uc.cdp.fetch.enable(patterns=[
+            uc.cdp.fetch.RequestPattern(url_pattern="*",
+                                        request_stage=uc.cdp.fetch.RequestStage.REQUEST)
+        ]))
+        tab.add_handler(uc.cdp.fetch.RequestPaused, self._on_paused)
+
+    def _lookup(self, key: str) -> int | None:
+        ids = self._by_key.get(key)
+        if ids:
+            n = self._cursor.get(key, 0)
+            self._cursor[key] = n + 1
+            return ids[min(n, len(ids) - 1)]
+        return self._by_url.get(key.split("\n", 1)[0])  # only GETs are indexed
+
+    async def _on_paused(self, event, tab):
+        req = event.request
+        fulfilled = False
+        try:
+            rid = self._lookup(request_key(req.method, req.url, req.post_data))
+            if rid is None:
+                self.missed += 1
+                log.debug("Replay miss: %s %s", req.method, req.url)
+                return
+            status, headers, body, elapsed = self.db.execute(
+                "SELECT status, headers, body, elapsed FROM responses WHERE id = ?", (rid,)
+            ).fetchone()
+            if self.latency == "recorded" and elapsed:
+                await asyncio.sleep(elapsed)
+            await tab.send(uc.cdp.fetch.fulfill_request(
+                request_id=event.request_id, response_code=status or 200,
+                response_headers=[uc.cdp.fetch.HeaderEntry(name=n, value=v)
+                                  for n, v in json.loads(headers or "[]")
+                                  if n.lower() not in REPLAY_DROP_HEADERS],
+                body=base64.b64encode(body or b"").decode("ascii"),
+            ))
+            fulfilled = True
+            self.served += 1
+        except Exception as e:
+            log.debug("Archive replayer: %s", e)
+        finally:
+            if not fulfilled:
+                try:
+                    await tab.send(uc.cdp.fetch.fail_request(
+                        request_id=event.request_id,
+                        error_reason=uc.cdp.network.ErrorReason.INTERNET_DISCONNECTED))
+                except Exception as e:
+                    log.debug("Archive replayer: %s", e)
+
+    async def document(self, uuid: str) -> bytes | None:
+        """A recorded PDF by UUID (after its recorded fetch time, if realistic)."""
+        row = self.db.execute("SELECT body, elapsed FROM documents WHERE uuid = ?",
+                              (uuid,)).fetchone()
+        if row is None:
+            self.missed += 1
+            return None
+        if self.latency == "recorded" and row[1]:
+            await asyncio.sleep(row[1])
+        self.served += 1
+        return row[0]
+
+    def close(self):
+        self.db.close()
+
+    def summary(self) -> str:
+        return f"served {self.served} responses from {self.path}, {self.missed} not in the archive"
+
+
+# ---------------------------------------------------------------------------
+# Related-files crawl: bounded priority frontier + persisted visited set
+# ---------------------------------------------------------------------------
+class RelatedFilesCrawler:
+    """Frontier of (court, file number) pairs reached through related_files.
+
+    Shallower files are fetched first (FIFO within a depth). The frontier
+    is capped at max_frontier entries — because pops are depth-ordered, new
+    pushes are never shallower than what is queued, so dropping them when
+    full keeps the closest relatives. The visited set is persisted so later
+    runs don't re-crawl the same files.
+    """
+
+    def __init__(self, visited_path: str | Path | None = None,
+                 max_depth: int = 1, max_frontier: int = 5000):
+        self.visited_path = Path(visited_path) if visited_path else None
+        self.max_depth = max_depth
+        self.max_frontier = max_frontier
+        self._heap: list[tuple[int, int, str, str]] = []  # (depth, seq, court, file_num)
+        self._queued: set[tuple[str, str]] = set()
+        self._seq = 0
+        self.visited: set[str] = set()
+        self.edges: list[dict] = []
+        self._edge_keys: set[tuple[str, str, str]] = set()
+        self.dropped = 0
+        if self.visited_path and self.visited_path.exists():
+            self.visited = set(json.loads(self.visited_path.read_text(encoding="utf-8")))
+
+    @staticmethod
+    def key(court: str, file_num: str) -> str:
+        return f"{court}|{file_num}"
+
+    def visit(self, court: str, file_num: str):
+        self.visited.add(self.key(court, file_num))
+
+    def add_edges(self, court: str, file_num: str, related: list[str], depth: int):
+        """Record file -> related edges and queue unvisited relatives."""
+        for rel in related:
+            if rel == file_num or (court, file_num, rel) in self._edge_keys:
+                continue
+            self._edge_keys.add((court, file_num, rel))
+            self.edges.append({"court": court, "file_number": file_num,
+                               "related_file": rel, "depth": depth + 1})
+            self.push(court, rel, depth + 1)
+
+    def push(self, court: str, file_num: str, depth: int):
+        if depth > self.max_depth or self.key(court, file_num) in self.visited \
+                or (court, file_num) in self._queued:
+            return
+        if len(self._heap) >= self.max_frontier:
+            self.dropped += 1
+            return
+        heapq.heappush(self._heap, (depth, self._seq, court, file_num))
+        self._queued.add((court, file_num))
+        self._seq += 1
+
+    def pop(self) -> tuple[str, str, int] | None:
+        while self._heap:
+            depth, _, court, file_num = heapq.heappop(self._heap)
+            self._queued.discard((court, file_num))
+            if self.key(court, file_num) not in self.visited:
+                return court, file_num, depth
+        return None
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def save(self, edges_path: str | Path | None = None):
+        if self.visited_path:
+            self.visited_path.parent.mkdir(parents=True, exist_ok=True)
+            self.visited_path.write_text(json.dumps(sorted(self.visited)), encoding="utf-8")
+        if edges_path and self.edges:
+            with open(edges_path, "w", newline="", encoding="utf-8") as f:
+                w = csv.DictWriter(f, fieldnames=["court", "file_number", "related_file", "depth"])
+                w.writeheader()
+                w.writerows(self.edges)
+            log.info("Saved %d related-file edges -> %s", len(self.edges), edges_path)
+
+
+# ---------------------------------------------------------------------------
+# De-duplication across runs
+# ---------------------------------------------------------------------------
+class FileIndex:
+    """(court, file number) pairs deep-scraped by this and earlier runs.
+
+    One "court<TAB>file number" line per file, appended as each file
+    completes so an interrupted run still records what it finished.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self._fh = None
+
+    def load(self) -> dict[str, set[str]]:
+        done: dict[str, set[str]] = {}
+        if self.path.exists():
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    court, _, file_num = line.rstrip("\n").partition("\t")
+                    if file_num:
+                        done.setdefault(court, set()).add(file_num)
+        return done
+
+    def add(self, court: str, file_num: str):
+        if self._fh is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._fh = open(self.path, "a", encoding="utf-8", buffering=1)
+        self._fh.write(f"{court}\t{file_num}\n")
+
+    def close(self):
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+
+
+class WatermarkStore:
+    """Per (court, proceeding): the last filing date fully searched.
+
+    A file_info chunk that succeeds moves its pair's watermark to the
+    chunk's end date, but only if the chunk starts on or before the day
+    after the watermark. So the mark never jumps over a window that
+    wasn't searched, whether the gap comes from a failed chunk or from a
+    one-off run further ahead. Saved after every move
+    (JSON {"Court|PROCEEDING": "YYYY-MM-DD"}).
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.marks: dict[str, str] = {}
+        self._blocked: set[str] = set()  # pairs with a failed chunk this run
+        if self.path.exists():
+            self.marks = json.loads(self.path.read_text(encoding="utf-8"))
+
+    @staticmethod
+    def key(court: str, proceeding: str) -> str:
+        return f"{court}|{proceeding}"
+
+    def get(self, court: str, proceeding: str) -> date | None:
+        mark = self.marks.get(self.key(court, proceeding))
+        return date.fromisoformat(mark) if mark else None
+
+    def start(self, court: str, proceeding: str, overlap_days: int = 1) -> date | None:
+        """First date the next run should search: the day after the mark,
+        moved back by overlap_days (filings can be entered late)."""
+        mark = self.get(court, proceeding)
+        return mark + timedelta(days=1 - overlap_days) if mark else None
+
+    def unit_done(self, unit: dict):
+        key = self.key(unit["court"], unit["proceeding"])
+        if key in self._blocked:
+            return
+        start = date.fromisoformat(iso_date(unit["from_date"]))
+        end = date.fromisoformat(iso_date(unit["to_date"]))
+        mark = self.get(unit["court"], unit["proceeding"])
+        if mark is not None and (start > mark + timedelta(days=1) or end <= mark):
+            return
+        self.marks[key] = end.isoformat()
+        self.save()
+
+    def unit_failed(self, unit: dict):
+        self._blocked.add(self.key(unit["court"], unit["proceeding"]))
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text(json.dumps(self.marks, indent=1, sort_keys=True), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+
+# ---------------------------------------------------------------------------
+# Change feed: field/document-level deltas against each file's last version
+# ---------------------------------------------------------------------------
+# Compared per case; the URL and local download state aren't facts about the file
+CHANGE_FIELDS = tuple(f for f in CASE_FIELDS if f not in ("court", "file_number", "file_history_url"))
+DOC_CHANGE_FIELDS = ("doc_name", "comments", "qty", "doc_filed", "signed_date", "has_link")
+PARTY_CHANGE_FIELDS = ("dod", "appointed", "active")
+
+
+def _keyed(items: list, key) -> dict:
+    """items by key(item); repeats of a key get "#2", "#3"… in page order."""
+    out, seen = {}, {}
+    for item in items:
+        k = key(item)
+        seen[k] = seen.get(k, 0) + 1
+        out[k if seen[k] == 1 else f"{k}#{seen[k]}"] = item
+    return out
+
+
+def diff_cases(old: Case | None, new: Case) -> list[dict]:
+    """Deltas from old to new, one dict per change ({"change": kind, ...})."""
+    if old is None:
+        return [{"change": "case_added", "file_name": new.file_name,
+                 "proceeding": new.proceeding, "file_date": new.file_date}]
+    changes = [{"change": "field", "field": f, "old": getattr(old, f), "new": getattr(new, f)}
+               for f in CHANGE_FIELDS if getattr(old, f) != getattr(new, f)]
+
+    def doc_key(d):
+        return d.uuid or f"{d.doc_name}|{d.doc_filed}|{d.comments}"
+
+    def doc_view(d):
+        return {"uuid": d.uuid, **{f: getattr(d, f) for f in DOC_CHANGE_FIELDS}}
+
+    before, after = _keyed(old.documents, doc_key), _keyed(new.documents, doc_key)
+    for k, d in after.items():
+        if k not in before:
+            changes.append({"change": "document_added", "document": doc_view(d)})
+            continue
+        delta = {f: [getattr(before[k], f), getattr(d, f)] for f in DOC_CHANGE_FIELDS
+                 if getattr(before[k], f) != getattr(d, f)}
+        if delta:
+            changes.append({"change": "document_changed", "uuid": d.uuid,
+                            "doc_name": d.doc_name, "fields": delta})
+    changes += [{"change": "document_removed", "document": doc_view(d)}
+                for k, d in before.items() if k not in after]
+
+    def party_key(p):
+        return f"{p.party}|{p.role}"
+
+    before, after = _keyed(old.parties, party_key), _keyed(new.parties, party_key)
+    for k, p in after.items():
+        if k not in before:
+            changes.append({"change": "party_added", "party": p.party, "role": p.role})
+            continue
+        delta = {f: [getattr(before[k], f), getattr(p, f)] for f in PARTY_CHANGE_FIELDS
+                 if getattr(before[k], f) != getattr(p, f)}
+        if delta:
+            changes.append({"change": "party_changed", "party": p.party, "role": p.role,
+                            "fields": delta})
+    changes += [{"change": "party_removed", "party": p.party, "role": p.role}
+                for k, p in before.items() if k not in after]
+
+    old_rel, new_rel = set(old.related_files), set(new.related_files)
+    changes += [{"change": "related_added", "related_file": r} for r in new.related_files
+                if r not in old_rel]
+    changes += [{"change": "related_removed", "related_file": r} for r in old.related_files
+                if r not in new_rel]
+    return changes
+
+
+class ChangeFeed:
+    """Appends each deep-scraped file's deltas to a JSON-lines feed.
+
+    The last version of every file is kept in a SQLite store (one row per
+    court + file number, the results.json case row). record() diffs the
+    fresh case against it, appends one line per change and stores the
+    fresh version. A file seen for the first time yields "case_added";
+    seed() fills in files the store lacks from an earlier results.json.
+    """
+
+    def __init__(self, feed_path: str | Path, store_path: str | Path):
+        self.feed_path = Path(feed_path)
+        self.feed_path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(str(store_path))
+        self.db.execute("CREATE TABLE IF NOT EXISTS cases (court TEXT, file_number TEXT, "
+                        "row TEXT, scraped_at TEXT, PRIMARY KEY (court, file_number))")
+        self._fh = open(self.feed_path, "a", encoding="utf-8")
+        self.files_changed = 0
+        self.changes = 0
+
+    def seed(self, results_path: str | Path) -> int:
+        """Store the cases of an earlier results.json that have no version
+        yet, stamped with the file's mtime. Returns the number stored."""
+        path = Path(results_path)
+        if not path.exists():
+            return 0
+        with open(path, encoding="utf-8") as f:
+            rows = json.load(f).get("cases", [])
+        ts = datetime.fromtimestamp(path.stat().st_mtime, timezone.utc).isoformat(timespec="seconds")
+        before = self.db.total_changes
+        self.db.executemany("INSERT OR IGNORE INTO cases VALUES (?, ?, ?, ?)",
+                            [(r["court"], r["file_number"], json.dumps(r), ts) for r in rows])
+        self.db.commit()
+        return self.db.total_changes - before
+
+    def previous(self, court: str, file_number: str) -> Case | None:
+        hit = self.db.execute("SELECT row FROM cases WHERE court = ? AND file_number = ?",
+                              (court, file_number)).fetchone()
+        return Case.from_row(json.loads(hit[0])) if hit else None
+
+    def record(self, case: Case) -> list[dict]:
+        ts = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        changes = diff_cases(self.previous(case.court, case.file_number), case)
+        if changes:
+            self._fh.write("".join(
+                json.dumps({"ts": ts, "court": case.court, "file_number": case.file_number, **c},
+                           ensure_ascii=False) + "\n"
+                for c in changes
+            ))
+            self._fh.flush()
+            self.files_changed += 1
+            self.changes += len(changes)
+        self.db.execute("INSERT OR REPLACE INTO cases VALUES (?, ?, ?, ?)",
+                        (case.court, case.file_number, json.dumps(case.to_row()), ts))
+        self.db.commit()
+        return changes
+
+    def close(self):
+        self._fh.close()
+        self.db.close()
+
+
+# ---------------------------------------------------------------------------
+# Download policy: which documents of a file to fetch, and in what order
+# ---------------------------------------------------------------------------
+class DownloadPolicy:
+    """Include/exclude/priority patterns on doc_name plus a per-file cap.
+
+    Patterns are case-insensitive regular expressions matched anywhere in
+    the name ("CLERK DUE SLIP", "^AFFIDAVIT"). With include patterns only
+    matching documents are fetched; exclude always wins. Documents are
+    fetched in priority order (first matching pattern), then page order,
+    and max_per_file keeps the highest-priority ones.
+
+    Also estimates what skipping saved, from the average size and time of
+    the documents that were downloaded.
+    """
+
+    def __init__(self, include=(), exclude=(), priority=(), max_per_file: int = 0):
+        self.include = [re.compile(p, re.I) for p in include]
+        self.exclude = [re.compile(p, re.I) for p in exclude]
+        self.priority = [re.compile(p, re.I) for p in priority]
+        self.max_per_file = max_per_file
+        self.considered = 0
+        self.skipped = 0
+        self.downloaded = 0
+        self.bytes = 0
+        self.seconds = 0.0
+
+    @classmethod
+    def from_file(cls, path: str | Path) -> "DownloadPolicy":
+        """JSON: {"include": [...], "exclude": [...], "priority": [...], "max_per_file": N}"""
+        cfg = json.loads(Path(path).read_text(encoding="utf-8"))
+        return cls(cfg.get("include", ()), cfg.get("exclude", ()),
+                   cfg.get("priority", ()), cfg.get("max_per_file", 0))
+
+    def allows(self, doc_name: str) -> bool:
+        if any(p.search(doc_name) for p in self.exclude):
+            return False
+        return not self.include or any(p.search(doc_name) for p in self.include)
+
+    def rank(self, doc_name: str) -> int:
+        return next((i for i, p in enumerate(self.priority) if p.search(doc_name)),
+                    len(self.priority))
+
+    def select(self, queue: list[tuple[int, str, Path]], docs: list[Document]
+               ) -> list[tuple[int, str, Path]]:
+        """Filter and order one file's download queue (entries index docs)."""
+        chosen = [q for q in queue if self.allows(docs[q[0]].doc_name)]
+        chosen.sort(key=lambda q: self.rank(docs[q[0]].doc_name))  # stable: page order within a rank
+        if self.max_per_file:
+            chosen = chosen[:self.max_per_file]
+        self.considered += len(queue)
+        self.skipped += len(queue) - len(chosen)
+        return chosen
+
+    def record(self, docs: int, nbytes: int, seconds: float):
+        self.downloaded += docs
+        self.bytes += nbytes
+        self.seconds += seconds
+
+    def summary(self) -> dict:
+        per_doc = self.downloaded or 1
+        return {
+            "considered": self.considered,
+            "skipped": self.skipped,
+            "downloaded": self.downloaded,
+            "est_mb_saved": round(self.skipped * self.bytes / per_doc / 1_048_576, 1),
+            "est_min_saved": round(self.skipped * self.seconds / per_doc / 60, 1),
+        }
+
+
+# ---------------------------------------------------------------------------
+# PDF validation: cheap structural checks on downloaded documents
+# ---------------------------------------------------------------------------
+PDF_MAGIC = b"%PDF-"
+PDF_EOF = b"%%EOF"
+PDF_SCAN = 1024  # bytes searched at each end (readers tolerate leading/trailing junk)
+
+
+def _pdf_check(head: bytes, tail: bytes, size: int, expected_size: int | None) -> str | None:
+    if not size:
+        return "empty"
+    if expected_size and size != expected_size:
+        return f"truncated ({size} of {expected_size} bytes)"
+    if PDF_MAGIC not in head:
+        if head.lstrip()[:1] == b"<":
+            return "HTML instead of PDF"
+        return "no %PDF- header"
+    if PDF_EOF not in tail:
+        return "no %%EOF trailer"
+    return None
+
+
+def pdf_problem(data: bytes, expected_size: int | None = None) -> str | None:
+    """Why data isn't a complete PDF, or None if it looks like one.
+
+    Checks the %PDF- header, the %%EOF trailer and, when the server sent
+    a Content-Length, that every byte arrived.
+    """
+    return _pdf_check(data[:PDF_SCAN], data[-PDF_SCAN:], len(data), expected_size)
+
+
+def pdf_file_problem(path: Path) -> str | None:
+    """pdf_problem() for a file on disk, reading only its first and last KB."""
+    with open(path, "rb") as f:
+        head = f.read(PDF_SCAN)
+        size = f.seek(0, os.SEEK_END)
+        f.seek(max(0, size - PDF_SCAN))
+        tail = f.read()
+    return _pdf_check(head, tail, size, None)
+
+
+def _expected_size(result: dict) -> int | None:
+    """Content-Length from a viewer fetch, when it describes the body we got."""
+    length = result.get("length")
+    if not length or result.get("encoding"):  # compressed: header is the wire size
+        return None
+    try:
+        return int(length)
+    except ValueError:
+        return None
+
+
+def verify_pdf_files(download_dir: Path, cases: list[Case]) -> list[Path]:
+    """Check every PDF under download_dir and queue the corrupt ones again.
+
+    A corrupt file is renamed to "<name>.corrupt" and the document that
+    points at it is marked not downloaded, so saving the cases records it
+    and the next download_pending() fetches it again. Returns the corrupt
+    paths.
+    """
+    by_path = {d.local_path: d for c in cases for d in c.documents if d.local_path}
+    checked, bad = 0, []
+    for path in sorted(download_dir.rglob("*.pdf")):
+        checked += 1
+        try:
+            problem = pdf_file_problem(path)
+        except OSError as e:
+            problem = str(e)
+        if not problem:
+            continue
+        doc = by_path.get(str(path))
+        log.warning("  Corrupt: %s — %s%s", path, problem, "" if doc else " (not in results)")
+        path.replace(path.with_name(path.name + ".corrupt"))
+        if doc:
+            doc.downloaded, doc.local_path = False, ""
+        bad.append(path)
+    log.info("Verified %d PDF(s): %d corrupt, %d queued for re-download",
+             checked, len(bad), sum(1 for p in bad if str(p) in by_path))
+    return bad
+
+
+# ---------------------------------------------------------------------------
+# Browser governor: keep one long-lived Chrome from growing without bound
+# ---------------------------------------------------------------------------
+RELAUNCH_ATTEMPTS = 3  # Chrome relaunches tried before a run is aborted
+
+
+class BrowserLost(RuntimeError):
+    """Chrome could not be relaunched; the run stops and saves what it has."""
+
+
+def process_tree_pss(pid: int | None) -> int | None:
+    """Proportional set size of pid and its descendants, read from /proc.
+
+    PSS splits pages shared between Chrome's processes among them, so the
+    sum is the tree's real footprint (RSS would count shared pages once per
+    process). None where /proc or smaps_rollup (Linux 4.14+) isn't available.
+    """
+    if not pid:
+        return None
+    children: dict[int, list[int]] = {}
+    try:
+        entries = [e.name for e in os.scandir("/proc") if e.name.isdigit()]
+    except OSError:
+        return None
+    for name in entries:
+        try:
+            with open(f"/proc/{name}/stat") as f:
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(ppid, []).append(int(name))
+    total, stack, measured = 0, [pid], False
+    while stack:
+        p = stack.pop()
+        stack.extend(children.get(p, ()))
+        try:
+            with open(f"/proc/{p}/smaps_rollup") as f:
+                for line in f:
+                    if line.startswith("Pss:"):
+                        total += int(line.split()[1]) * 1024
+                        measured = True
+                        break
+        except (OSError, IndexError, ValueError):
+            pass
+    return total if measured else None
+
+
+def on_viewer_host(tab) -> bool:
+    """Whether a tab is showing a document viewer page."""
+    url = str(getattr(tab, "url", "") or "")
+    return urlsplit(url).hostname == urlsplit(VIEWER_BASE).hostname
+
+
+class BrowserGovernor:
+    """When to restart Chrome between work units (each limit: 0 = off).
+
+    Every File History visit adds history entries to the main tab, and a
+    viewer tab whose close failed stays open, so Chrome grows over a long
+    --deep --download run. Stray viewer tabs are closed first; if the
+    process tree's PSS is still over max_mb, more than max_tabs tabs are
+    open, or restart_every files were scraped since the last launch, the
+    scraper restarts Chrome on the same profile (so the session cookies
+    survive).
+    """
+
+    def __init__(self, max_mb: float = 2048, max_tabs: int = 4, restart_every: int = 0):
+        self.max_mb = max_mb
+        self.max_tabs = max_tabs
+        self.restart_every = restart_every
+        self.restarts = 0
+        self.orphans_closed = 0
+        self.peak_bytes = 0
+        self._files_at_launch = 0
+
+    def reason(self, pss: int | None, tabs: int, files_done: int) -> str | None:
+        """Why Chrome should be restarted now, or None."""
+        if pss:
+            self.peak_bytes = max(self.peak_bytes, pss)
+            if self.max_mb and pss > self.max_mb * 1_048_576:
+                return f"PSS {pss / 1_048_576:.0f} MB > {self.max_mb:.0f} MB"
+        if self.max_tabs and tabs > self.max_tabs:
+            return f"{tabs} tabs open"
+        if self.restart_every and files_done - self._files_at_launch >= self.restart_every:
+            return f"{files_done - self._files_at_launch} files since launch"
+        return None
+
+    def restarted(self, files_done: int):
+        self.restarts += 1
+        self._files_at_launch = files_done
+
+    def summary(self) -> str:
+        return (f"{self.restarts} restart(s), {self.orphans_closed} stray tab(s) closed, "
+                f"peak PSS {self.peak_bytes / 1_048_576:.0f} MB")
+
+
+# ---------------------------------------------------------------------------
+# Disk writer: downloaded files are written off the event loop
+# ---------------------------------------------------------------------------
+class DiskWriter:
+    """Writes files from worker threads so a slow disk can't stall CDP traffic.
+
+    Each file goes to a ".name.part" temp file next to its target and is
+    renamed into place, so a crash never leaves a truncated file under the
+    final name. At most max_pending writes are queued; write() waits for a
+    slot, which holds back the fetch stage when the disk falls behind.
+    With fsync_every > 0, each file is fsynced before its rename (so the
+    rename can't land ahead of the data) and the directories holding the
+    renames are fsynced in batches of that many files (and on close).
+    """
+
+    def __init__(self, max_pending: int = 8, fsync_every: int = 0, workers: int = 2):
+        self.fsync_every = fsync_every
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="disk-writer")
+        self._slots = asyncio.Semaphore(max_pending)
+        self._pending: set[asyncio.Future] = set()
+        self._lock = threading.Lock()
+        self._unsynced: list[Path] = []
+        self.files = 0
+        self.bytes = 0
+        self.stalled = 0.0  # seconds write() spent waiting for a free slot
+
+    async def write(self, path: Path, data: bytes) -> asyncio.Future:
+        """Queue a write; returns a future that resolves once the file is in place."""
+        t0 = time.monotonic()
+        await self._slots.acquire()
+        self.stalled += time.monotonic() - t0
+        fut = asyncio.get_running_loop().run_in_executor(self._pool, self._write, path, data)
+        self._pending.add(fut)
+        fut.add_done_callback(self._done)
+        return fut
+
+    def _done(self, fut: asyncio.Future):
+        self._pending.discard(fut)
+        self._slots.release()
+
+    def _write(self, path: Path, data: bytes):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.part")
+        try:
+            with open(tmp, "wb") as f:
+                f.write(data)
+                if self.fsync_every:
+                    f.flush()
+                    os.fsync(f.fileno())
+            os.replace(tmp, path)
+        except BaseException:
+            tmp.unlink(missing_ok=True)
+            raise
+        batch = None
+        with self._lock:
+            self.files += 1
+            self.bytes += len(data)
+            if self.fsync_every:
+                self._unsynced.append(path.parent)
+                if len(self._unsynced) >= self.fsync_every:
+                    batch, self._unsynced = self._unsynced, []
+        if batch:
+            self._sync(batch)
+
+    @staticmethod
+    def _sync(dirs: list[Path]):
+        """fsync each directory once, making the renames into it durable."""
+        for d in dict.fromkeys(dirs):
+            fd = os.open(d, os.O_RDONLY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+
+    async def close(self):
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
+        with self._lock:
+            batch, self._unsynced = self._unsynced, []
+        if batch:
+            await asyncio.get_running_loop().run_in_executor(self._pool, self._sync, batch)
+        self._pool.shutdown(wait=True)
+
+    def summary(self) -> str:
+        return (f"{self.files} files, {self.bytes / 1_048_576:.1f} MB, "
+                f"{self.stalled:.1f}s waiting for disk")
+
+
+# ---------------------------------------------------------------------------
+# Results files
+# ---------------------------------------------------------------------------
+def load_results(basename: str = "results") -> tuple[list[SearchRow], list[Case]] | None:
+    """The search rows and cases of output/<basename>.json, or None if absent."""
+    path = OUTPUT_DIR / f"{basename}.json"
+    if not path.exists():
+        return None
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    return ([SearchRow.from_dict(r) for r in data.get("search_results", [])],
+            [Case.from_row(c) for c in data.get("cases", [])])
+
+
+def save_results(search_results: list[SearchRow], cases: list[Case],
+                 basename: str = "results"):
+    """Write output/<basename>.json plus the _search and _deep CSVs."""
+    OUTPUT_DIR.mkdir(exist_ok=True)
+
+    # Records are flattened to the CSV/JSON schema once, here
+    search_rows = [r.to_dict() for r in search_results]
+    case_rows = [c.to_row() for c in cases]
+
+    # Shallow search results (always saved)
+    if search_rows:
+        path = OUTPUT_DIR / f"{basename}_search.csv"
+        # Union of keys: historical search types add their own columns
+        keys = list(dict.fromkeys(
+            k for r in search_rows for k in r if k != "btn_value"))
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            w = csv.DictWriter(f, fieldnames=keys, extrasaction="ignore")
+            w.writeheader()
+            w.writerows(search_rows)
+        log.info("Saved %d search results -> %s", len(search_rows), path)
+
+    # Deep scrape: single flat CSV with all data per file
+    if case_rows:
+        path = OUTPUT_DIR / f"{basename}_deep.csv"
+        keys = list(case_rows[0].keys())
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            w = csv.DictWriter(f, fieldnames=keys)
+            w.writeheader()
+            w.writerows(case_rows)
+        log.info("Saved %d files (deep) -> %s", len(case_rows), path)
+
+    # Full JSON with everything
+    path = OUTPUT_DIR / f"{basename}.json"
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "search_results": search_rows,
+                "cases": case_rows,
+            },
+            f, indent=2, ensure_ascii=False,
+        )
+    log.info("Saved -> %s", path)
 
 
 # ---------------------------------------------------------------------------
 # Scraper class — uses nodriver for all browser interactions
 # ---------------------------------------------------------------------------
 PROFILE_DIR = Path(__file__).parent / ".browser_profile"
+STARTUP_POLL = 0.5  # seconds between page checks while opening a session
 
 
 class WebSurrogateScraper:
@@ -463,6 +2497,13 @@ class WebSurrogateScraper:
         headless: bool = False,
         download: bool = False,
         profile_dir: str | Path | None = None,
+        events: EventLog | None = None,
+        rpm: float | None = None,
+        block_resources: bool = False,
+        capture_responses: bool = False,
+        record: str | Path | None = None,
+        replay: str | Path | None = None,
+        replay_latency: str = "recorded",
     ):
         self.request_delay = request_delay
         self.headless = headless
@@ -471,16 +2512,56 @@ class WebSurrogateScraper:
         self.profile_dir = Path(profile_dir) if profile_dir else PROFILE_DIR
         self._browser = None
         self._page = None
-        self.search_results: list[dict] = []  # shallow results
-        self.cases: list[dict] = []  # deep: case details
+        self._nav_mark = 0
+        self._nav_t0 = time.monotonic()
+        self._dom_pending = False
+        self._viewer_tabs: list = []  # viewer tabs opened by download batches, not yet closed
+        self.parse_timings: dict[str, list[float]] = {"network": [], "dom": []}
+        self.search_results: list[SearchRow] = []  # shallow results
+        self.cases: list[Case] = []  # deep: case details
         self.documents: list[dict] = []  # deep: document details
         self.download_dir = OUTPUT_DIR / "downloads"
+        self.events = events or EventLog(None)
+        self.progress = RunProgress(self.events)
+        # Requests-per-minute ceiling per host; --delay maps onto it for
+        # backwards compatibility (1.0s delay == 60 req/min).
+        self.rate_limiter = RateLimiter(rpm or 60.0 / max(request_delay, 0.05))
+        self.retry = RetryPolicy()
+        self.dead_letter = DeadLetterQueue(OUTPUT_DIR / "dead_letter.jsonl")
+        self.only_uuids: set[str] | None = None  # restrict downloads (DLQ replay)
+        self.download_policy: DownloadPolicy | None = None
+        self.writer = DiskWriter()
+        self.profiler: RunProfiler | None = None
+        self.governor: BrowserGovernor | None = None  # run() sets one unless --no-governor
+        self.recorder = ArchiveRecorder(record) if record else None
+        self.replayer = ArchiveReplayer(replay, replay_latency) if replay else None
+        self._file_failures: dict[tuple[str, str], int] = {}
+        self._dead_files: set[tuple[str, str]] = set()
+        self._done: dict[str, set[str]] = {}  # court -> file numbers scraped/dead-lettered
+        self._seen_rows: set[tuple[str, str]] = set()  # (court, file_num) already in search_results
+        self._off_page_values: set[str] = set()  # btn_values of the last search's paged-in rows
+        self._case_pos: dict[tuple[str, str], int] = {}  # (court, file_number) -> index in cases
+        self._case_pos_len = 0  # len(cases) _case_pos was built for
+        self.file_index: FileIndex | None = None
+        self.watermarks: WatermarkStore | None = None
+        self.change_feed: ChangeFeed | None = None
+        self._court_proceedings: dict[str, set[str]] = {}  # court -> dropdown options
+        self.session = SessionManager(OUTPUT_DIR / "session_stats.json")
+        self.resource_filter = ResourceFilter() if block_resources else None
+        self.capture = ResponseCapture() if capture_responses else None
 
     async def __aenter__(self):
         await self._init_browser()
         return self
 
     async def __aexit__(self, *exc):
+        await self.writer.close()
+        self.events.flush()
+        if self.file_index:
+            self.file_index.close()
+        for archive in (self.recorder, self.replayer, self.change_feed):
+            if archive:
+                archive.close()
         if self._browser:
             self._browser.stop()
 
@@ -491,11 +2572,97 @@ class WebSurrogateScraper:
             headless=self.headless,
             user_data_dir=str(self.profile_dir),
         )
+        self._viewer_tabs = []
+        if self.resource_filter:
+            await self.resource_filter.attach(self._browser.main_tab)
+        if self.capture:
+            await self.capture.attach(self._browser.main_tab)
+        if self.recorder:
+            await self.recorder.attach(self._browser.main_tab)
+        if self.replayer:
+            await self.replayer.attach(self._browser.main_tab)
         self._page = await self._browser.get(BASE)
+        restored = await self._open_session()
+        self.session.mark_authenticated(restored=restored)
+
+    async def _close_orphan_tabs(self) -> int:
+        """Close the viewer tabs download batches left open. Tabs the scraper
+        didn't open for a document (a user's, a challenge's) are left alone."""
+        closed, still_open = 0, []
+        open_ids = {id(t) for t in self._browser.tabs}
+        for tab in self._viewer_tabs:
+            if id(tab) not in open_ids:
+                continue  # already gone
+            try:
+                await tab.close()
+                closed += 1
+            except Exception:
+                still_open.append(tab)
+        self._viewer_tabs = still_open
+        return closed
 
-        # Phase 1: Wait for Cloudflare to clear (may be instant with cached cookies)
-        for attempt in range(30):
-            await asyncio.sleep(2)
+    async def _govern(self):
+        """Between work units: close stray tabs, restart Chrome if it has grown too big.
+
+        The restart relaunches on the same profile and re-authenticates, so
+        the unit about to run starts on a fresh browser as if nothing happened.
+        """
+        if not self.governor:
+            return
+        if self._browser is None:  # an earlier relaunch failed; try again
+            await self._relaunch("browser lost")
+            return
+        self.governor.orphans_closed += await self._close_orphan_tabs()
+        pss = process_tree_pss(getattr(self._browser, "_process_pid", None))
+        tabs = len(self._browser.tabs)
+        reason = self.governor.reason(pss, tabs, self.progress.files_done)
+        if not reason:
+            return
+        log.warning("Restarting Chrome: %s", reason)
+        self.events.emit("browser_restart", reason=reason, tabs=tabs,
+                         pss_mb=round((pss or 0) / 1_048_576, 1),
+                         files_done=self.progress.files_done)
+        if self.capture:
+            self.capture.disarm()
+        browser, self._browser, self._page = self._browser, None, None
+        browser.stop()
+        # The profile is locked until the old process has exited
+        proc = getattr(browser, "_process", None)
+        if proc is not None:
+            with contextlib.suppress(Exception):
+                await asyncio.wait_for(proc.wait(), 15)
+        self._viewer_cf_cleared = False
+        await self._relaunch(reason)
+
+    async def _relaunch(self, reason: str):
+        """Launch Chrome again, retrying a failed launch; raises BrowserLost
+        after RELAUNCH_ATTEMPTS failures."""
+        for attempt in range(1, RELAUNCH_ATTEMPTS + 1):
+            try:
+                await self._init_browser()
+            except Exception as e:
+                log.error("Chrome relaunch failed (attempt %d/%d): %s",
+                          attempt, RELAUNCH_ATTEMPTS, e)
+                if self._browser:
+                    with contextlib.suppress(Exception):
+                        self._browser.stop()
+                self._browser = self._page = None
+                if attempt < RELAUNCH_ATTEMPTS:
+                    await asyncio.sleep(self.retry.delay(attempt))
+                continue
+            self.governor.restarted(self.progress.files_done)
+            return
+        raise BrowserLost(f"Chrome could not be relaunched ({reason})")
+
+    async def _open_session(self) -> bool:
+        """Get from BASE to the File Search form. Returns True if the
+        session persisted in the profile was still valid."""
+        # Phase 1: Wait for Cloudflare to clear (may be instant with cached cookies).
+        # Short polls so a warm profile is through in well under a second.
+        t0 = time.monotonic()
+        while time.monotonic() - t0 < 60:
+            await asyncio.sleep(STARTUP_POLL)
+            elapsed = time.monotonic() - t0
             try:
                 text = str(await self._page.evaluate("document.body.innerText"))
                 url = str(await self._page.evaluate("window.location.href"))
@@ -510,15 +2677,15 @@ class WebSurrogateScraper:
 
                 # Already past all gates — on a search page
                 if "/File/" in url or "/Names/" in url or "/OldIndex/" in url:
-                    log.info("Session restored — already on search page (%ds)", (attempt + 1) * 2)
-                    return  # Skip welcome, captcha, search option
+                    log.info("Session restored — already on search page (%.1fs)", elapsed)
+                    return True  # Skip welcome, captcha, search option
 
                 if any(k in text for k in ("Start Search", "Welcome to WebSurrogate",
                                             "I am human", "Search Options", "File Search")):
-                    log.info("Cloudflare cleared after %ds", (attempt + 1) * 2)
+                    log.info("Cloudflare cleared after %.1fs", elapsed)
                     break
                 if "Verifying" in text or "moment" in text.lower():
-                    log.info("  still verifying… (%ds)", (attempt + 1) * 2)
+                    log.debug("  still verifying… (%.1fs)", elapsed)
             except Exception:
                 pass
         else:
@@ -531,10 +2698,10 @@ class WebSurrogateScraper:
             if "Select one of the following search options" in text:
                 log.info("Session valid — skipping captcha, clicking search option")
                 await self._click_search_option("file")
-                return
+                return True
             if "/File/" in url or "/Names/" in url:
                 log.info("Session valid — already on search page")
-                return
+                return True
         except Exception:
             pass
 
@@ -546,6 +2713,7 @@ class WebSurrogateScraper:
 
         # Phase 4: Click "File Search" on Search Options page (default entry point)
         await self._click_search_option("file")
+        return False
 
     async def _handle_welcome_page(self):
         """Click 'Start Search' button on the Welcome page if present."""
@@ -557,6 +2725,7 @@ class WebSurrogateScraper:
             return
 
         log.info("Welcome page detected — clicking 'Start Search'…")
+        await self._mark_page()
         try:
             btn = await self._page.find("Start Search", timeout=5)
             if btn:
@@ -573,12 +2742,11 @@ class WebSurrogateScraper:
                 pass
 
         # Wait for navigation to Authenticate page and update page reference
-        await asyncio.sleep(3)
-        # Get the current active tab after navigation
         try:
             self._page = self._browser.main_tab
         except Exception:
             pass
+        await self._wait_for_ready(poll=STARTUP_POLL)
 
     async def _solve_hcaptcha(self):
         """Solve hCaptcha on the Authenticate page."""
@@ -595,8 +2763,8 @@ class WebSurrogateScraper:
         log.info("hCaptcha page detected — waiting for iframe to load…")
 
         # Wait for hCaptcha iframe to fully load
-        for _ in range(15):
-            await asyncio.sleep(1)
+        for _ in range(int(15 / STARTUP_POLL)):
+            await asyncio.sleep(STARTUP_POLL)
             try:
                 has_iframe = await self._page.evaluate(
                     "!!document.querySelector('iframe[src*=\"hcaptcha\"]')"
@@ -694,17 +2862,18 @@ class WebSurrogateScraper:
         log.info("Clicking search option '%s' (id=%s)…", search_type, btn_id)
 
         # Click by element ID
+        await self._mark_page()
         clicked = await self._page.evaluate(
             f"JSON.stringify((function(){{ var b=document.getElementById('{btn_id}'); if(b){{b.click();return true;}} return false; }})())"
         )
         if str(clicked) == "true":
             log.info("  Clicked %s button", btn_id)
-            await asyncio.sleep(3)
             # Update page ref after navigation
             try:
                 self._page = self._browser.main_tab
             except Exception:
                 pass
+            await self._wait_for_ready(poll=STARTUP_POLL)
             return
 
         # Fallback: find by text
@@ -721,125 +2890,284 @@ class WebSurrogateScraper:
             if btn:
                 await btn.click()
                 log.info("  Clicked '%s' by text", label)
-                await asyncio.sleep(3)
+                await self._wait_for_ready(poll=STARTUP_POLL)
                 return
         except Exception:
             pass
 
         # Last resort: navigate directly
         log.info("  Fallback: navigating directly to %s", URLS.get(search_type, URLS["file"]))
+        await self.rate_limiter.acquire(BASE)
         self._page = await self._browser.get(URLS.get(search_type, URLS["file"]))
-        await asyncio.sleep(self.request_delay + 1)
+        await self._wait_for_ready()
 
     async def _get_html(self) -> str:
         return await self._page.evaluate(JS_GET_HTML)
 
     async def _navigate(self, url: str) -> str:
+        await self._mark_page()
+        await self.rate_limiter.acquire(url)
         self._page = await self._browser.get(url)
-        await asyncio.sleep(self.request_delay)
-        html = await self._get_html()
+        html = await self._wait_for_ready()
+        state = page_state(html)
+        key = URL_KEYS.get(url)
 
         # Stale session — clear cookies and re-authenticate
-        if "Request Could Not Be Processed" in html or "support ID" in html:
+        if state == PAGE_ERROR:
+            # Already penalized by _wait_for_ready when the page came in
             log.warning("Stale session during navigation — clearing cookies…")
-            await self._page.send(uc.cdp.network.clear_browser_cookies())
-            self._page = await self._browser.get(BASE)
-            await asyncio.sleep(3)
-            await self._handle_welcome_page()
-            await self._solve_hcaptcha()
-            for key, u in URLS.items():
-                if u == url:
-                    await self._click_search_option(key)
-                    break
+            await self._reauthenticate(key, reason="stale session page",
+                                       seen_generation=self.session.generation)
+            await self._mark_page()
+            await self.rate_limiter.acquire(url)
             self._page = await self._browser.get(url)
-            await asyncio.sleep(self.request_delay)
+            html = await self._wait_for_ready()
+        # Session dropped server-side: walk the gates we were sent back to
+        elif state in (PAGE_WELCOME, PAGE_CAPTCHA, PAGE_OPTIONS):
+            log.info("Redirected to %s page — handling…", state)
+            self.session.mark_expired(f"redirected to {state} page")
+            await self._pass_gates(state, key)
+            self.session.mark_authenticated()
             html = await self._get_html()
+        else:
+            self.rate_limiter.reward(url)
+        self.session.mark_success()
+        return html
 
-        # If redirected to Welcome page
-        if "Start Search" in html and "Welcome to WebSurrogate" in html:
-            log.info("Redirected to Welcome page — handling…")
+    async def _pass_gates(self, state: str, search_key: str | None):
+        """Walk Welcome -> hCaptcha -> Search Options from the given gate."""
+        if state == PAGE_WELCOME:
             await self._handle_welcome_page()
+        if state in (PAGE_WELCOME, PAGE_CAPTCHA):
             await self._solve_hcaptcha()
-            for key, u in URLS.items():
-                if u == url:
-                    await self._click_search_option(key)
-                    break
-            html = await self._get_html()
-        # If redirected to captcha page
-        elif "CAPTCHA is required" in html or "I am human" in html:
-            log.info("Redirected to captcha page — solving…")
-            await self._solve_hcaptcha()
-            for key, u in URLS.items():
-                if u == url:
-                    await self._click_search_option(key)
-                    break
-            html = await self._get_html()
-        # If on Search Options page (no captcha, just buttons)
-        elif "Select one of the following search options" in html:
-            log.info("On Search Options page — clicking through…")
-            for key, u in URLS.items():
-                if u == url:
-                    await self._click_search_option(key)
-                    break
-            html = await self._get_html()
+        if search_key:
+            await self._click_search_option(search_key)
 
-        return html
+    async def _reauthenticate(
+        self, search_key: str | None = "file", reason: str = "",
+        full_reset: bool = True, seen_generation: int | None = None,
+        proactive: bool = False,
+    ):
+        """Start a fresh site session once, shared by every tab.
 
-    async def _wait_for_navigation(self, timeout: float = 10.0) -> str:
-        """Wait for page to load after a click/submit."""
-        await asyncio.sleep(self.request_delay + 1.0)
-        # Wait for body to be available
-        for _ in range(int(timeout)):
-            try:
-                ready = await self._page.evaluate("document.readyState")
-                if ready == "complete":
-                    break
-            except Exception:
-                pass
-            await asyncio.sleep(1)
-        return await self._get_html()
+        full_reset clears all browser cookies (needed after a stale-session
+        error page); otherwise only the site's session cookies are dropped
+        and Cloudflare clearance is kept. proactive marks a refresh of a
+        session that had not expired.
+        """
+        async with self.session.lock:
+            if seen_generation is not None and seen_generation != self.session.generation:
+                log.info("Session already refreshed by another task")
+                return
+            self.session.mark_expired(reason, sample=not proactive)
+            if full_reset:
+                await self._page.send(uc.cdp.network.clear_browser_cookies())
+            else:
+                for c in await self._page.send(uc.cdp.network.get_cookies(urls=[BASE])):
+                    if not c.name.startswith(("cf_", "__cf")):
+                        await self._page.send(uc.cdp.network.delete_cookies(
+                            name=c.name, domain=c.domain, path=c.path))
+            await self.rate_limiter.acquire(BASE)
+            self._page = await self._browser.get(BASE)
+            await asyncio.sleep(3)
+            await self._pass_gates(PAGE_WELCOME, search_key)
+            self.session.mark_authenticated()
+            self.events.emit("session_refreshed", reason=reason, reauths=self.session.reauths)
 
-    async def _set_select(self, select_id: str, value: str):
-        await self._page.evaluate(JS_SET_SELECT % (select_id, value))
+    async def _validate_session(self) -> bool:
+        """Cheap check: fetch the search form in the background and look for gates."""
+        await self.rate_limiter.acquire(BASE)
+        try:
+            text = str(await self._page.evaluate(
+                f"fetch('{URLS['file']}', {{credentials: 'include'}})"
+                ".then(r => r.text()).catch(e => 'fetch error: ' + e)",
+                await_promise=True,
+            ))
+        except Exception as e:
+            log.info("Session check failed: %s", e)
+            return False
+        return page_state(text) == PAGE_OK and not text.startswith("fetch error")
 
-    async def _set_input(self, name: str, value: str):
-        await self._page.evaluate(JS_SET_INPUT % (name, value))
+    async def ensure_session(self, search_key: str = "file", upcoming: float = 0.0):
+        """Call before a long batch/work unit.
 
-    async def _click_submit(self):
+        Refreshes proactively if the session is expected to expire within
+        `upcoming` seconds; otherwise validates cheaply when it has been
+        idle long enough that expiry is plausible. The browser governor
+        runs first, so a restart happens here rather than mid-unit.
+        """
+        await self._govern()
+        seen = self.session.generation
+        if self.session.due_for_refresh(upcoming):
+            log.info("Refreshing session proactively (%s)", self.session.summary())
+            await self._reauthenticate(search_key, reason="proactive refresh",
+                                       full_reset=False, seen_generation=seen,
+                                       proactive=True)
+        elif self.session.idle() >= self.session.validate_after:
+            if await self._validate_session():
+                self.session.mark_success()
+            else:
+                await self._reauthenticate(search_key, reason="failed validation",
+                                           seen_generation=seen)
+
+    async def _mark_page(self, capture: bool = False):
+        """Tag the current document so _wait_for_ready can tell when it is replaced.
+
+        capture=True also arms the response capture (if enabled) for the
+        navigation about to be triggered.
+        """
+        await self._settle()
+        self._nav_mark += 1
+        self._nav_t0 = time.monotonic()
+        if self.capture:
+            if capture:
+                self.capture.arm()
+            else:
+                self.capture.disarm()
+        if self._page is None:
+            return
+        try:
+            await self._page.evaluate(JS_MARK_PAGE % self._nav_mark)
+        except Exception:
+            pass
+
+    async def _wait_for_ready(self, timeout: float = 10.0, poll: float = 0.25) -> str:
+        """Poll until a fresh (unmarked) document has finished loading.
+
+        Replaces fixed post-navigation sleeps: fast pages return as soon as
+        they are ready, and pacing is left to the rate limiter.
+        """
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            try:
+                if str(await self._page.evaluate(JS_PAGE_READY % self._nav_mark)) == "true":
+                    break
+            except Exception:
+                pass
+            await asyncio.sleep(poll)
+        html = await self._get_html()
+        if page_state(html) == PAGE_ERROR:
+            self.rate_limiter.penalize(BASE, "Request Could Not Be Processed")
+        return html
+
+    async def _wait_for_navigation(self, timeout: float = 10.0) -> str:
+        """Wait for page to load after a click/submit.
+
+        With response capture armed, returns the document's HTML as soon as
+        its network response completes; the live DOM is settled lazily
+        before the next interaction. Falls back to the DOM path on timeout.
+        """
+        waiter = self.capture._waiter if self.capture else None
+        if waiter is not None:
+            try:
+                html = await asyncio.wait_for(asyncio.shield(waiter), timeout)
+            except Exception as e:
+                log.debug("Response capture missed (%s) — using DOM", e)
+            else:
+                self.capture.disarm()
+                self._dom_pending = True
+                self.parse_timings["network"].append(time.monotonic() - self._nav_t0)
+                if page_state(html) == PAGE_ERROR:
+                    self.rate_limiter.penalize(BASE, "Request Could Not Be Processed")
+                return html
+            self.capture.disarm()
+        html = await self._wait_for_ready(timeout)
+        self.parse_timings["dom"].append(time.monotonic() - self._nav_t0)
+        return html
+
+    async def _settle(self):
+        """Wait for a document returned early by response capture to finish loading."""
+        if self._dom_pending:
+            self._dom_pending = False
+            await self._wait_for_ready()
+
+    def parse_timing_summary(self) -> str:
+        parts = []
+        for path, ts in self.parse_timings.items():
+            if ts:
+                parts.append(f"{path} {sum(ts) / len(ts):.2f}s avg over {len(ts)}")
+        return ", ".join(parts) or "no page loads"
+
+    # Everything that reads or writes the live DOM settles first: after a
+    # captured navigation the page may still be the outgoing document.
+    async def _set_select(self, select_id: str, value: str):
+        await self._settle()
+        await self._page.evaluate(JS_SET_SELECT % (select_id, value))
+
+    async def _set_input(self, name: str, value: str):
+        await self._settle()
+        await self._page.evaluate(JS_SET_INPUT % (name, value))
+
+    async def _click_submit(self):
+        await self._mark_page(capture=True)
+        await self.rate_limiter.acquire(BASE)
         await self._page.evaluate(JS_CLICK_SUBMIT)
 
-    async def _click_button_by_value(self, value: str):
-        await self._page.evaluate(JS_CLICK_BUTTON_BY_VALUE % value)
+    async def _click_button_by_value(self, value: str) -> bool:
+        """Click the results button with this value; False if there is none."""
+        await self._mark_page(capture=True)
+        await self.rate_limiter.acquire(BASE)
+        return await self._page.evaluate(JS_CLICK_BUTTON_BY_VALUE % value) is True
+
+    async def _history_back(self) -> str:
+        await self._mark_page()
+        await self.rate_limiter.acquire(BASE)
+        await self._page.evaluate("window.history.back()")
+        return await self._wait_for_navigation()
 
     # -- search form submission via browser ------------------------------------
     async def _submit_file_search(
         self, court: str, proceeding: str | None = None,
         from_date: str | None = None, to_date: str | None = None,
-        file_number: str | None = None,
-    ) -> str:
+        file_number: str | None = None, reuse_form: bool = False,
+    ) -> str | None:
+        """Fill and submit the File Search form; returns the results HTML.
+
+        Returns None without submitting if the court's proceeding dropdown
+        doesn't offer `proceeding`.
+        """
         court_id = COURTS.get(court)
         if not court_id:
             raise ValueError(f"Unknown court: {court!r}")
 
-        # Navigate to File Search page
-        await self._navigate(URLS["file"])
+        await self._settle()
+        form = await self._file_form_state() if reuse_form else {}
+        if form.get("ready") and (file_number or form.get("info")):
+            # Search form already on the page (e.g. above the last results)
+            loaded = form.get("court") == court_id
+            if not loaded:
+                await self._set_select("CourtSelect", court_id)
+                await asyncio.sleep(0.5)
+            if not file_number:
+                await self._set_input("FileNumber", "")
+        else:
+            loaded = False
+            # Navigate to File Search page
+            await self._navigate(URLS["file"])
 
-        # Set court (id=CourtSelect) — triggers dynamic loading of proceedings
-        await self._set_select("CourtSelect", court_id)
+            # Set court (id=CourtSelect) — triggers dynamic loading of proceedings
+            await self._set_select("CourtSelect", court_id)
+            if file_number:
+                await asyncio.sleep(0.5)
 
         if file_number:
-            await asyncio.sleep(0.5)
             await self._set_input("FileNumber", file_number)
         else:
             # Wait for proceeding dropdown (id=SelectedProceeding) to populate
-            # Values are the proceeding names themselves
-            for _ in range(10):
-                await asyncio.sleep(1)
+            # Values are the proceeding names themselves; a reused form for
+            # the same court already has them.
+            for attempt in range(10):
+                if attempt or not loaded:
+                    await asyncio.sleep(1)
                 page_html = await self._get_html()
                 options = extract_select_options(page_html, "SelectedProceeding")
                 if len(options) > 1:
+                    self._court_proceedings[court] = set(options)
                     break
 
+            if proceeding and len(options) > 1 and proceeding not in options:
+                log.info("  %s not offered in %s — skipped", proceeding, court)
+                return None
             if proceeding:
                 await self._set_select("SelectedProceeding", proceeding)
             if from_date:
@@ -849,6 +3177,8 @@ class WebSurrogateScraper:
 
         await asyncio.sleep(0.3)
         # Click the specific submit button by ID
+        await self._mark_page(capture=True)
+        await self.rate_limiter.acquire(BASE)
         await self._page.evaluate("""
             var btn = document.getElementById('FileSearchSubmit');
             if (btn) btn.click();
@@ -859,6 +3189,14 @@ class WebSurrogateScraper:
         """)
         return await self._wait_for_navigation()
 
+    async def _file_form_state(self) -> dict:
+        """Is a usable File Search form on the current page, and for which court?"""
+        await self._settle()
+        try:
+            return json.loads(str(await self._page.evaluate(JS_FILE_FORM_STATE)))
+        except Exception:
+            return {}
+
     async def _submit_name_search(
         self, court: str, last_name: str | None = None,
         first_name: str | None = None,
@@ -870,6 +3208,7 @@ class WebSurrogateScraper:
     ) -> str:
         court_id = COURTS.get(court, court)
 
+        await self._settle()
         await self._navigate(URLS["name"])
         await self._set_select("CourtId", court_id)
         await asyncio.sleep(0.5)
@@ -893,41 +3232,196 @@ class WebSurrogateScraper:
         await self._click_submit()
         return await self._wait_for_navigation()
 
+    async def _set_field(self, candidates: list[str], value: str) -> str:
+        """Set the first form field whose id or name is one of candidates;
+        returns it. Raises if the form has none of them."""
+        await self._settle()
+        found = await self._page.evaluate(
+            JS_SET_FIELD % (json.dumps(candidates), json.dumps(value)))
+        if not found:
+            raise RuntimeError(f"Search form has no field {' / '.join(candidates)}")
+        return str(found)
+
+    async def _submit_index_search(self, search_type: str, court: str, **values: str) -> str:
+        """Fill and submit an Old Index / Index Book / Wills search form."""
+        court_id = COURTS.get(court)
+        if not court_id:
+            raise ValueError(f"Unknown court: {court!r}")
+        form = SEARCH_FORMS[search_type]
+
+        await self._settle()
+        await self._navigate(URLS[search_type])
+        await self._set_field(form["court"], court_id)
+        await asyncio.sleep(0.5)
+        for field, value in values.items():
+            if not value:
+                continue
+            if field not in form:
+                raise ValueError(f"{search_type} search has no {field!r} field")
+            await self._set_field(form[field], value)
+
+        await asyncio.sleep(0.3)
+        await self._settle()
+        submit = await self._page.evaluate(
+            "(function(ids){ for (var i = 0; i < ids.length; i++) {"
+            " if (document.getElementById(ids[i])) return ids[i]; } return ''; })(%s)"
+            % json.dumps(form["submit"]))
+        if not submit:
+            raise RuntimeError(f"{search_type} form has no submit button "
+                               f"{' / '.join(form['submit'])}")
+        await self._mark_page(capture=True)
+        await self.rate_limiter.acquire(BASE)
+        await self._page.evaluate(f"document.getElementById({json.dumps(submit)}).click()")
+        return await self._wait_for_navigation()
+
     async def _click_file_number(self, btn_value: str) -> str:
-        await self._click_button_by_value(btn_value)
+        if not await self._click_button_by_value(btn_value):
+            # Only rows _all_results read from other pages may be posted blind
+            posted = btn_value in self._off_page_values and await self._page.evaluate(
+                JS_POST_RESULT_VALUE % json.dumps(btn_value)) is True
+            if not posted:
+                if self.capture:
+                    self.capture.disarm()
+                raise RuntimeError(f"No result button for {btn_value!r} on the page")
         return await self._wait_for_navigation()
 
+    async def _all_results(self, html: str) -> list[SearchRow]:
+        """parse_search_results() over every page of a paginated results table.
+
+        With DataTables, the full row set is read from the table API in one
+        evaluate. Other pagers are stepped through with their Next control.
+        A result that still looks like a page or result cap is logged as
+        possibly truncated. Rows read from other pages are remembered so
+        _click_file_number can post them (their buttons aren't in the DOM).
+        """
+        self._off_page_values = set()
+        rows = parse_search_results(html)
+        if len(rows) < min(RESULT_PAGE_LENGTHS):
+            return rows  # less than one page: nothing to page through
+        await self._settle()
+        try:
+            state = json.loads(str(await self._page.evaluate(JS_RESULTS_PAGING)))
+        except Exception as e:
+            log.debug("Results paging check failed: %s", e)
+            state = {}
+        paged = False
+        if state.get("datatable") and len(state["rows"]) > len(rows):
+            rows = parse_search_results(
+                '<table id="NameResultsTable"><tbody>' + "".join(state["rows"]) + "</tbody></table>")
+            log.info("  Read %d rows from the paginated results table (%d per page)",
+                     len(rows), state["page_rows"])
+            paged = True
+        elif not state.get("datatable") and state.get("next"):
+            rows = await self._step_result_pages(rows)
+            paged = True
+        if paged:
+            self._off_page_values = {r.btn_value for r in rows if r.btn_value}
+        total = state.get("total") or 0
+        if total > len(rows):
+            log.warning("  Read %d of %d results — the search is truncated "
+                        "(try a smaller --chunk-days)", len(rows), total)
+            self.events.emit("results_truncated", rows=len(rows), total=total)
+        elif not paged and len(rows) in RESULT_CAPS | RESULT_PAGE_LENGTHS:
+            log.warning("  %d results — a typical page/result cap; the search may be "
+                        "truncated (try a smaller --chunk-days)", len(rows))
+            self.events.emit("results_truncated", rows=len(rows))
+        return rows
+
+    async def _step_result_pages(self, rows: list[SearchRow]) -> list[SearchRow]:
+        """Click the results pager's Next control until it runs out."""
+        seen = {(r.btn_value, r.file_num) for r in rows}
+        pages = 1
+        while pages < RESULTS_MAX_PAGES:
+            await self.rate_limiter.acquire(BASE)
+            if await self._page.evaluate(JS_CLICK_NEXT_PAGE) is not True:
+                break  # no Next control, or the script threw (ExceptionDetails)
+            # Client-side pagers redraw in place, server-side ones navigate:
+            # either way the page is in once its first row is a new one
+            for _ in range(40):
+                await asyncio.sleep(0.25)
+                try:
+                    page_rows = parse_search_results(await self._get_html())
+                except Exception:
+                    continue  # mid-navigation
+                if page_rows and (page_rows[0].btn_value, page_rows[0].file_num) not in seen:
+                    break
+            else:
+                log.warning("  Results page %d did not load — keeping %d rows", pages + 1, len(rows))
+                break
+            pages += 1
+            new = [r for r in page_rows if (r.btn_value, r.file_num) not in seen]
+            seen.update((r.btn_value, r.file_num) for r in new)
+            rows.extend(new)
+            try:
+                state = json.loads(str(await self._page.evaluate(JS_RESULTS_PAGING)))
+            except Exception as e:
+                log.debug("Results paging check failed: %s", e)
+                state = {}
+            if not state.get("next"):
+                break
+        log.info("  Stepped through %d result page(s): %d rows", pages, len(rows))
+        return rows
+
+    def _ingest_rows(self, rows: list[SearchRow], court: str):
+        """Record shallow search rows for output and telemetry.
+
+        File rows are keyed by (court, file_num): a file that turns up again
+        (overlapping chunks, another proceeding or search type) is counted
+        as a duplicate and kept out of search_results.
+        """
+        dupes = 0
+        for r in rows:
+            if r.btn_value and r.file_num:
+                key = (court, r.file_num)
+                if key in self._seen_rows:
+                    dupes += 1
+                    continue
+                self._seen_rows.add(key)
+            r.court = court
+            self.search_results.append(r)
+        log.info("  Found %d results%s", len(rows), f" ({dupes} duplicate)" if dupes else "")
+        self.progress.rows_found += len(rows) - dupes
+        self.progress.duplicates += dupes
+        self.events.emit("rows_found", court=court, rows=len(rows) - dupes, duplicates=dupes)
+
     # -- high-level search methods -----------------------------------------
     async def file_search_by_info(
         self, court: str, proceeding: str,
         from_date: str, to_date: str | None = None,
-        deep: bool = False,
+        deep: bool = False, skip: set[str] | None = None,
+        reuse_form: bool = False,
     ) -> list[dict]:
+        offered = self._court_proceedings.get(court)
+        if offered and proceeding not in offered:
+            log.debug("%s not offered in %s — skipped", proceeding, court)
+            return []
         log.info("File search: %s / %s / %s–%s", court, proceeding, from_date, to_date or "")
         results_html = await self._submit_file_search(
             court, proceeding=proceeding, from_date=from_date, to_date=to_date,
+            reuse_form=reuse_form,
         )
-        rows = parse_search_results(results_html)
-        log.info("  Found %d results", len(rows))
-        for r in rows:
-            self.search_results.append({**r, "court": court})
+        if results_html is None:
+            return []
+        rows = await self._all_results(results_html)
+        self._ingest_rows(rows, court)
 
         if deep and rows:
-            await self._deep_scrape(rows, court)
+            await self._deep_scrape(rows, court, skip=skip)
         return rows
 
     async def file_search_by_number(
         self, court: str, file_number: str, deep: bool = False,
+        skip: set[str] | None = None, reuse_form: bool = False,
     ) -> list[dict]:
         log.info("File search by number: %s / %s", court, file_number)
-        results_html = await self._submit_file_search(court, file_number=file_number)
+        results_html = await self._submit_file_search(
+            court, file_number=file_number, reuse_form=reuse_form,
+        )
         rows = parse_search_results(results_html)
-        log.info("  Found %d results", len(rows))
-        for r in rows:
-            self.search_results.append({**r, "court": court})
+        self._ingest_rows(rows, court)
 
         if deep and rows:
-            await self._deep_scrape(rows, court)
+            await self._deep_scrape(rows, court, skip=skip)
         return rows
 
     async def name_search_person(
@@ -942,10 +3436,8 @@ class WebSurrogateScraper:
             court, last_name=last_name, first_name=first_name,
             death_from_date=death_from_date, death_to_date=death_to_date,
         )
-        rows = parse_search_results(results_html)
-        log.info("  Found %d results", len(rows))
-        for r in rows:
-            self.search_results.append({**r, "court": court})
+        rows = await self._all_results(results_html)
+        self._ingest_rows(rows, court)
 
         if deep and rows:
             await self._deep_scrape(rows, court)
@@ -962,132 +3454,34 @@ class WebSurrogateScraper:
             court, organization=organization,
             file_from_date=file_from_date, file_to_date=file_to_date,
         )
-        rows = parse_search_results(results_html)
-        log.info("  Found %d results", len(rows))
-        for r in rows:
-            self.search_results.append({**r, "court": court})
+        rows = await self._all_results(results_html)
+        self._ingest_rows(rows, court)
 
         if deep and rows:
             await self._deep_scrape(rows, court)
         return rows
 
-    # -- document download via viewer tab ----------------------------------
-    _viewer_cf_cleared = False  # Cloudflare on iapps.courts.state.ny.us
-
-    async def _download_document(self, uuid: str, save_path: Path) -> bool:
-        """Download a document PDF by clicking its UUID button (opens a viewer
-        tab at iapps.courts.state.ny.us), waiting for Cloudflare to clear,
-        then fetching the raw PDF via JavaScript fetch().
-        """
-        tabs_before = set(id(t) for t in self._browser.tabs)
-        try:
-            # Submit the FHForm with the UUID value in a new tab.
-            # Instead of finding and clicking the UUID button (which can fail
-            # if the DOM isn't ready), we inject a hidden input and submit
-            # the form directly with target="_blank".
-            await self._page.evaluate(
-                f"""(function(){{
-                    var form = document.getElementById('FHForm');
-                    if (!form) return;
-                    var inp = document.createElement('input');
-                    inp.type = 'hidden'; inp.name = 'UUIDValue'; inp.value = '{uuid}';
-                    form.appendChild(inp);
-                    var origTarget = form.target;
-                    form.target = '_blank';
-                    form.submit();
-                    form.removeChild(inp);
-                    form.target = origTarget;
-                }})()"""
-            )
-
-            # Wait for new viewer tab to appear
-            viewer_tab = None
-            for _ in range(15):
-                await asyncio.sleep(1)
-                for tab in self._browser.tabs:
-                    if id(tab) not in tabs_before:
-                        viewer_tab = tab
-                        break
-                if viewer_tab:
-                    break
-
-            if not viewer_tab:
-                log.warning("      No viewer tab opened for %s", uuid[:8])
-                return False
+    async def index_search(
+        self, search_type: str, court: str, deep: bool = False,
+        skip: set[str] | None = None, **values: str,
+    ) -> list[dict]:
+        """Old Index / Index Book / Wills search. Rows that link to a File
+        History page (btn_value) are deep-scraped like file searches."""
+        log.info("%s search: %s / %s", search_type, court,
+                 " ".join(f"{k}={v}" for k, v in values.items() if v))
+        results_html = await self._submit_index_search(search_type, court, **values)
+        rows = parse_index_results(results_html)
+        for r in rows:
+            r.extra = {**(r.extra or {}), "search_type": search_type}
+        self._ingest_rows(rows, court)
 
-            # Wait for Cloudflare to clear on the viewer domain.
-            # First doc takes ~10s; subsequent docs are instant (cookie cached).
-            max_wait = 60 if not self._viewer_cf_cleared else 15
-            for i in range(max_wait):
-                await asyncio.sleep(1)
-                try:
-                    ct = await viewer_tab.evaluate(
-                        "fetch(window.location.href)"
-                        ".then(r => r.headers.get('content-type'))"
-                        ".catch(() => 'error')",
-                        await_promise=True,
-                    )
-                    ct = str(ct)
-                    if "pdf" in ct.lower():
-                        if not self._viewer_cf_cleared:
-                            log.info("      Viewer Cloudflare cleared after %ds", i + 1)
-                            self._viewer_cf_cleared = True
-                        break
-                except Exception:
-                    pass
-            else:
-                log.warning("      Viewer Cloudflare timeout for %s", uuid[:8])
-                await viewer_tab.close()
-                return False
-
-            # Fetch the PDF as base64
-            raw = await viewer_tab.evaluate("""
-                (async function() {
-                    try {
-                        var resp = await fetch(window.location.href);
-                        var blob = await resp.blob();
-                        return new Promise(function(resolve) {
-                            var reader = new FileReader();
-                            reader.onload = function() {
-                                resolve(JSON.stringify({ok:true, size:blob.size, data:reader.result}));
-                            };
-                            reader.readAsDataURL(blob);
-                        });
-                    } catch(e) { return JSON.stringify({error: e.toString()}); }
-                })()
-            """, await_promise=True)
-
-            result = json.loads(str(raw))
-            if not result.get("ok") or not result.get("data"):
-                log.warning("      Fetch failed for %s: %s", uuid[:8], result.get("error"))
-                await viewer_tab.close()
-                return False
-
-            b64_data = result["data"].split(",", 1)[1]
-            pdf_bytes = base64.b64decode(b64_data)
-
-            if len(pdf_bytes) < 100:
-                log.warning("      PDF too small (%d bytes) for %s", len(pdf_bytes), uuid[:8])
-                await viewer_tab.close()
-                return False
-
-            save_path.parent.mkdir(parents=True, exist_ok=True)
-            save_path.write_bytes(pdf_bytes)
-            log.info("      Saved %s (%d bytes)", save_path.name, len(pdf_bytes))
-
-            await viewer_tab.close()
-            return True
+        linked = [r for r in rows if r.btn_value and r.file_num]
+        if deep and linked:
+            await self._deep_scrape(linked, court, skip=skip)
+        return rows
 
-        except Exception as e:
-            log.warning("      Download exception for %s: %s", uuid[:8], e)
-            # Close any extra tabs
-            for tab in self._browser.tabs:
-                if id(tab) not in tabs_before:
-                    try:
-                        await tab.close()
-                    except Exception:
-                        pass
-            return False
+    # -- document download via viewer tab ----------------------------------
+    _viewer_cf_cleared = False  # Cloudflare on iapps.courts.state.ny.us
 
     @staticmethod
     def _sanitize_filename(name: str) -> str:
@@ -1104,18 +3498,26 @@ class WebSurrogateScraper:
     # -- batch download: open all tabs, then fetch all PDFs ----------------
     async def _batch_download(
         self, queue: list[tuple[int, str, Path]],
+        errors: dict[int, str] | None = None,
     ) -> list[tuple[int, bool, Path]]:
         """Open all document viewer tabs at once, wait for Cloudflare,
         then fetch all PDFs in parallel. Much faster than one-by-one.
 
         queue: list of (doc_index, uuid, save_path)
         returns: list of (doc_index, success, save_path)
+        errors: if given, filled with doc_index -> failure reason
         """
+        if errors is None:
+            errors = {}
+        if self.replayer:
+            return await self._replay_downloads(queue, errors)
+        await self._settle()  # FHForm must be in the live DOM
         if not queue:
             return []
 
         results: list[tuple[int, bool, Path]] = []
         fh_tab_id = id(self._page)
+        batch_start = {id(t) for t in self._browser.tabs}
 
         # --- Phase 1: Open all viewer tabs ---
         log.info("      Opening %d document tabs…", len(queue))
@@ -1123,6 +3525,7 @@ class WebSurrogateScraper:
 
         for idx, uuid, save_path in queue:
             tabs_before = set(id(t) for t in self._browser.tabs)
+            await self.rate_limiter.acquire(BASE)
             await self._page.evaluate(
                 f"""(function(){{
                     var form = document.getElementById('FHForm');
@@ -1146,6 +3549,8 @@ class WebSurrogateScraper:
                 if id(tab) not in tabs_before and id(tab) != fh_tab_id:
                     new_tab = tab
                     break
+            if new_tab is not None:
+                self._viewer_tabs.append(new_tab)
             tab_map.append((idx, uuid, save_path, new_tab))
 
         opened = sum(1 for _, _, _, t in tab_map if t is not None)
@@ -1155,6 +3560,7 @@ class WebSurrogateScraper:
         first_tab = next((t for _, _, _, t in tab_map if t is not None), None)
         if first_tab and not self._viewer_cf_cleared:
             log.info("      Waiting for Cloudflare on viewer domain…")
+            # Paced by the sleep; each document takes its token in phase 3
             for i in range(60):
                 await asyncio.sleep(1)
                 try:
@@ -1172,18 +3578,25 @@ class WebSurrogateScraper:
                     pass
             else:
                 log.warning("      Viewer Cloudflare timeout")
+                self.rate_limiter.penalize(VIEWER_BASE, "viewer Cloudflare timeout")
 
         # Give all tabs a moment to finish loading after CF clears
         await asyncio.sleep(2)
 
         # --- Phase 3: Fetch PDFs from all tabs ---
+        # Writes overlap the next fetches; they are awaited before returning.
+        writes: list[tuple[int, str, Path, int, asyncio.Future]] = []
         for idx, uuid, save_path, viewer_tab in tab_map:
             if viewer_tab is None:
                 log.warning("      No tab for %s", uuid[:8])
+                self.events.emit("document_failed", uuid=uuid, error="no tab")
+                errors[idx] = "no tab"
                 results.append((idx, False, save_path))
                 continue
 
             try:
+                await self.rate_limiter.acquire(VIEWER_BASE)
+                t_fetch = time.monotonic()
                 raw = await viewer_tab.evaluate("""
                     (async function() {
                         try {
@@ -1191,10 +3604,13 @@ class WebSurrogateScraper:
                             var ct = resp.headers.get('content-type') || '';
                             if (!ct.includes('pdf')) return JSON.stringify({error: 'not pdf: ' + ct});
                             var blob = await resp.blob();
+                            var length = resp.headers.get('content-length');
+                            var encoding = resp.headers.get('content-encoding');
                             return new Promise(function(resolve) {
                                 var reader = new FileReader();
                                 reader.onload = function() {
-                                    resolve(JSON.stringify({ok:true, size:blob.size, data:reader.result}));
+                                    resolve(JSON.stringify({ok:true, size:blob.size, length:length,
+                                                            encoding:encoding, data:reader.result}));
                                 };
                                 reader.readAsDataURL(blob);
                             });
@@ -1206,194 +3622,1287 @@ class WebSurrogateScraper:
                 if result.get("ok") and result.get("data"):
                     b64_data = result["data"].split(",", 1)[1]
                     pdf_bytes = base64.b64decode(b64_data)
-                    if len(pdf_bytes) > 100:
-                        save_path.parent.mkdir(parents=True, exist_ok=True)
-                        save_path.write_bytes(pdf_bytes)
-                        log.info("      Saved %s (%d bytes)", save_path.name, len(pdf_bytes))
-                        results.append((idx, True, save_path))
+                    problem = pdf_problem(pdf_bytes, _expected_size(result))
+                    if not problem:
+                        self.rate_limiter.reward(VIEWER_BASE)
+                        if self.recorder:
+                            self.recorder.add_document(uuid, pdf_bytes, time.monotonic() - t_fetch)
+                        writes.append((idx, uuid, save_path, len(pdf_bytes),
+                                       await self.writer.write(save_path, pdf_bytes)))
                     else:
-                        log.warning("      Too small: %s (%d bytes)", uuid[:8], len(pdf_bytes))
+                        log.warning("      Bad PDF %s: %s", uuid[:8], problem)
+                        errors[idx] = f"bad PDF: {problem}"
+                        self.events.emit("document_failed", uuid=uuid, error=errors[idx])
                         results.append((idx, False, save_path))
                 else:
                     log.warning("      Fetch failed %s: %s", uuid[:8], result.get("error", ""))
+                    errors[idx] = result.get("error", "") or "fetch failed"
+                    self.events.emit("document_failed", uuid=uuid, error=errors[idx])
                     results.append((idx, False, save_path))
             except Exception as e:
                 log.warning("      Error fetching %s: %s", uuid[:8], e)
+                self.rate_limiter.penalize(VIEWER_BASE, "fetch error")
+                errors[idx] = str(e)
+                self.events.emit("document_failed", uuid=uuid, error=errors[idx])
                 results.append((idx, False, save_path))
 
+        for idx, uuid, save_path, nbytes, fut in writes:
+            try:
+                await fut
+            except OSError as e:
+                log.warning("      Write failed %s: %s", save_path.name, e)
+                errors[idx] = f"write failed: {e}"
+                self.events.emit("document_failed", uuid=uuid, error=errors[idx])
+                results.append((idx, False, save_path))
+                continue
+            log.info("      Saved %s (%d bytes)", save_path.name, nbytes)
+            self.progress.bytes_downloaded += nbytes
+            self.events.emit("document_downloaded", uuid=uuid, bytes=nbytes, path=str(save_path))
+            results.append((idx, True, save_path))
+
         # --- Phase 4: Close all viewer tabs ---
+        closed = set()
         for _, _, _, viewer_tab in tab_map:
             if viewer_tab is not None:
                 try:
                     await viewer_tab.close()
+                    closed.add(id(viewer_tab))
                 except Exception:
                     pass
+        tracked = {id(t) for t in self._viewer_tabs}
+        self._viewer_tabs = [t for t in self._viewer_tabs if id(t) not in closed]
+        # Viewer tabs that spawned too late to be matched to a document
+        self._viewer_tabs += [t for t in self._browser.tabs
+                              if id(t) not in batch_start and id(t) not in tracked
+                              and on_viewer_host(t)]
+        # ...and those whose close failed
+        if self.governor:
+            self.governor.orphans_closed += await self._close_orphan_tabs()
 
         downloaded = sum(1 for _, s, _ in results if s)
         log.info("      Downloaded %d/%d PDFs", downloaded, len(queue))
         return results
 
+    async def _replay_downloads(
+        self, queue: list[tuple[int, str, Path]], errors: dict[int, str],
+    ) -> list[tuple[int, bool, Path]]:
+        """_batch_download against the replay archive: no viewer tabs."""
+        results = []
+        for idx, uuid, save_path in queue:
+            pdf_bytes = await self.replayer.document(uuid)
+            problem = "not in archive" if pdf_bytes is None else pdf_problem(pdf_bytes)
+            if problem:
+                errors[idx] = problem if pdf_bytes is None else f"bad PDF: {problem}"
+                self.events.emit("document_failed", uuid=uuid, error=errors[idx])
+                results.append((idx, False, save_path))
+                continue
+            await (await self.writer.write(save_path, pdf_bytes))
+            self.progress.bytes_downloaded += len(pdf_bytes)
+            self.events.emit("document_downloaded", uuid=uuid, bytes=len(pdf_bytes),
+                             path=str(save_path))
+            results.append((idx, True, save_path))
+        return results
+
     # -- deep scrape -------------------------------------------------------
-    async def _deep_scrape(self, rows: list[dict], court: str):
-        """Click into each file -> extract File History -> collect all data."""
+    async def _deep_scrape(
+        self, rows: list[SearchRow], court: str, skip: set[str] | None = None,
+    ):
+        """Click into each file -> extract File History -> collect all data.
+
+        Files in skip (default: the court's scraped or dead-lettered files)
+        are passed over, so each file is deep-scraped at most once per run.
+        A failure inside a file is raised as FileScrapeError so the caller
+        can restore the results page and resume. Returns True if the last
+        file's File History page is still open (the caller goes back).
+        """
+        if skip is None:
+            skip = self._skip_files(court)
         if self.limit:
             rows = rows[:self.limit]
             log.info("    Limited to %d file(s)", self.limit)
         total = len(rows)
+        self.progress.unit_files(total)
+        on_file = False
         for i, row in enumerate(rows):
-            file_num = row["file_num"]
-            btn_val = row["btn_value"]
+            file_num = row.file_num
+            btn_val = row.btn_value
             log.info("  [%d/%d] Deep scraping file %s", i + 1, total, file_num)
 
             if not btn_val:
                 log.warning("    No button value, skipping")
                 continue
+            if file_num in skip:
+                log.info("    Already done, skipping")
+                continue
 
-            # Click file number to go to File History page
-            fh_html = await self._click_file_number(btn_val)
-
-            # Capture the File History page URL
-            file_history_url = str(await self._page.evaluate("window.location.href"))
-
-            fh = parse_file_history(fh_html)
-            info = fh["info"]
-            parties_list = fh["parties"]
-            docs = fh["documents"]
-            related = fh["related_files"]
-
-            # Person folder name for downloads
-            person_name = self._sanitize_filename(row.get("file_name", file_num))
-
-            # Process documents: build entries and collect downloadable docs
-            docs_with_urls = []
-            download_queue = []  # (index, uuid, save_path) for batch download
-            name_counter: dict[str, int] = {}
-            for doc in docs:
-                doc_entry = {**doc, "viewer_url": "", "downloaded": False}
-
-                if doc.get("has_link") and doc.get("uuid"):
-                    uuid_val = doc["uuid"]
-                    doc_entry["viewer_url"] = f"{BASE}/File/FileHistory?UUIDValue={uuid_val}"
-
-                    if self.download:
-                        doc_name = self._sanitize_filename(doc.get("doc_name", "document"))
-                        doc_date = doc.get("doc_filed", "").replace("/", "-")
-                        base_name = f"{doc_name}_{doc_date}" if doc_date else doc_name
-
-                        if base_name in name_counter:
-                            name_counter[base_name] += 1
-                            file_name = f"{base_name}_{name_counter[base_name]}.pdf"
-                        else:
-                            name_counter[base_name] = 0
-                            file_name = f"{base_name}.pdf"
-
-                        save_path = self.download_dir / person_name / file_name
-                        download_queue.append((len(docs_with_urls), uuid_val, save_path))
-
-                docs_with_urls.append(doc_entry)
-
-            # Batch download: open all viewer tabs at once, then fetch all PDFs
-            if download_queue:
-                results = await self._batch_download(download_queue)
-                for idx, success, save_path in results:
-                    docs_with_urls[idx]["downloaded"] = success
-                    if success:
-                        docs_with_urls[idx]["local_path"] = str(save_path)
-
-            # Build single flat row with all data
-            self.cases.append({
-                "court": court,
-                "file_number": file_num,
-                "file_history_url": file_history_url,
-                "file_date": row.get("file_date", ""),
-                "file_name": row.get("file_name", ""),
-                "proceeding": row.get("proceeding", info.get("proceeding", "")),
-                "dod": row.get("dod", ""),
-                "estate_closed": info.get("estate_closed", ""),
-                "disposed": info.get("disposed", ""),
-                "letters": info.get("letters", ""),
-                "letters_issued": info.get("letters_issued", ""),
-                "estate_attorney": info.get("estate_attorney", ""),
-                "estate_attorney_firm": info.get("estate_attorney_firm", ""),
-                "judge": info.get("judge", ""),
-                "parties": json.dumps(parties_list) if parties_list else "",
-                "documents": json.dumps(docs_with_urls) if docs_with_urls else "",
-                "document_count": len(docs_with_urls),
-                "related_files": json.dumps(related) if related else "",
-            })
-
-            downloaded_count = sum(1 for d in docs_with_urls if d.get("downloaded"))
-            log.info("    -> %d parties, %d docs, %d related, %d downloaded",
-                     len(parties_list), len(docs_with_urls), len(related), downloaded_count)
+            try:
+                await self._scrape_file(row, court)
+            except Exception as e:
+                raise self._file_failed(court, file_num, e) from e
 
             # Navigate back to results for next click
-            if i < total - 1:
-                await self._page.evaluate("window.history.back()")
-                await self._wait_for_navigation()
+            on_file = i == total - 1
+            if not on_file:
+                await self._history_back()
+        return on_file
+
+    async def _scrape_file(self, row: SearchRow, court: str):
+        """From a results page: open one file's File History and record it."""
+        file_num = row.file_num
+        t0 = time.monotonic()
+        self.events.emit("file_started", court=court, file_num=file_num)
+
+        # Click file number to go to File History page
+        fh_html = await self._click_file_number(row.btn_value)
+
+        # Capture the File History page URL (the live document, not the
+        # captured response, so wait for it to finish loading)
+        await self._settle()
+        file_history_url = str(await self._page.evaluate("window.location.href"))
+
+        fh = parse_file_history(fh_html)
+        info = fh["info"]
+        parties_list = fh["parties"]
+        docs = fh["documents"]
+        related = fh["related_files"]
+
+        for doc in docs:
+            if doc.has_link and doc.uuid:
+                doc.viewer_url = f"{BASE}/File/FileHistory?UUIDValue={doc.uuid}"
+
+        if self.download:
+            download_queue = self._plan_downloads(docs, row.file_name or file_num)
+            if self.only_uuids is not None:
+                download_queue = [q for q in download_queue if q[1] in self.only_uuids]
+            # A DLQ replay names its documents explicitly, so the policy is skipped
+            elif self.download_policy:
+                download_queue = self.download_policy.select(download_queue, docs)
+            await self._download_docs(download_queue, docs, court, file_num)
+
+        case = Case(
+            court=court,
+            file_number=file_num,
+            file_history_url=file_history_url,
+            file_date=row.file_date,
+            file_name=row.file_name,
+            proceeding=row.proceeding or info.get("proceeding", ""),
+            dod=row.dod,
+            estate_closed=info.get("estate_closed", ""),
+            disposed=info.get("disposed", ""),
+            letters=info.get("letters", ""),
+            letters_issued=info.get("letters_issued", ""),
+            estate_attorney=info.get("estate_attorney", ""),
+            estate_attorney_firm=info.get("estate_attorney_firm", ""),
+            judge=info.get("judge", ""),
+            parties=parties_list,
+            documents=docs,
+            related_files=related,
+        )
+        self._store_case(case)
+        if self.change_feed:
+            changes = self.change_feed.record(case)
+            if changes and changes[0]["change"] != "case_added":
+                log.info("    -> %d change(s) since the last scrape", len(changes))
+        self._skip_files(court).add(file_num)
+        if self.file_index:
+            self.file_index.add(court, file_num)
+
+        downloaded_count = sum(1 for d in docs if d.downloaded)
+        log.info("    -> %d parties, %d docs, %d related, %d downloaded",
+                 len(parties_list), len(docs), len(related), downloaded_count)
+        duration = time.monotonic() - t0
+        self.events.emit(
+            "file_finished", court=court, file_num=file_num,
+            parties=len(parties_list), documents=len(docs),
+            related=len(related), downloaded=downloaded_count,
+            duration_s=round(duration, 3),
+        )
+        self.progress.file_finished(duration, docs=downloaded_count)
+
+    def _plan_downloads(self, docs: list[Document], person: str) -> list[tuple[int, str, Path]]:
+        """(index, uuid, save_path) for every linked document of one file.
+
+        Names are numbered over all linked documents, not just the ones
+        fetched, so a document lands on the same path whichever pass
+        (deep scrape, replay, --download-pending) downloads it.
+        """
+        folder = self.download_dir / self._sanitize_filename(person)
+        queue = []
+        name_counter: dict[str, int] = {}
+        for idx, doc in enumerate(docs):
+            if not (doc.has_link and doc.uuid):
+                continue
+            doc_name = self._sanitize_filename(doc.doc_name or "document")
+            doc_date = self._sanitize_filename(doc.doc_filed.replace("/", "-"))
+            base_name = f"{doc_name}_{doc_date}" if doc_date else doc_name
+            if base_name in name_counter:
+                name_counter[base_name] += 1
+                file_name = f"{base_name}_{name_counter[base_name]}.pdf"
+            else:
+                name_counter[base_name] = 0
+                file_name = f"{base_name}.pdf"
+            queue.append((idx, doc.uuid, folder / file_name))
+        return queue
+
+    async def _download_docs(
+        self, queue: list[tuple[int, str, Path]], docs: list[Document],
+        court: str, file_num: str,
+    ):
+        """Batch-download queue from the current File History page and record
+        the outcome on docs. Returns the number downloaded."""
+        if not queue:
+            return 0
+        b0, t0 = self.progress.bytes_downloaded, time.monotonic()
+        results = await self._download_with_retry(queue, court, file_num)
+        for idx, success, save_path in results:
+            docs[idx].downloaded = success
+            if success:
+                docs[idx].local_path = str(save_path)
+        if self.download_policy:
+            self.download_policy.record(sum(1 for _, ok, _ in results if ok),
+                                        self.progress.bytes_downloaded - b0,
+                                        time.monotonic() - t0)
+        return sum(1 for _, ok, _ in results if ok)
+
+    async def _open_file_history(self, court: str, file_num: str) -> str:
+        """Search one file number and open its File History page."""
+        html = await self._submit_file_search(court, file_number=file_num, reuse_form=True)
+        rows = [r for r in parse_search_results(html) if r.file_num == file_num and r.btn_value]
+        if not rows:
+            raise RuntimeError(f"File {file_num} not found in {court}")
+        return await self._click_file_number(rows[0].btn_value)
+
+    async def download_pending(self) -> int:
+        """Download the documents earlier deep runs recorded but didn't fetch.
+
+        Works off self.cases (see load_previous): linked documents that are
+        not downloaded, or whose PDF has gone missing, grouped by file so
+        each File History page is opened once. The download policy applies.
+        Returns the number of documents downloaded.
+        """
+        work = []
+        for case in self.cases:
+            for d in case.documents:
+                if d.downloaded and not (d.local_path and Path(d.local_path).exists()):
+                    d.downloaded, d.local_path = False, ""  # PDF gone since
+            pending = {i for i, d in enumerate(case.documents)
+                       if d.has_link and d.uuid and not d.downloaded}
+            queue = [q for q in self._plan_downloads(case.documents, case.file_name or case.file_number)
+                     if q[0] in pending]
+            if queue and self.download_policy:
+                queue = self.download_policy.select(queue, case.documents)
+            if queue:
+                work.append((case, queue))
+        log.info("=== Download pending: %d document(s) in %d file(s) ===",
+                 sum(len(q) for _, q in work), len(work))
+        self.progress.add_units(len(work))
+        downloaded = 0
+        for case, queue in work:
+            court, file_num = case.court, case.file_number
+            log.info("  %s %s: %d document(s)", court, file_num, len(queue))
+            t0 = time.monotonic()
+            try:
+                await self.ensure_session()
+                fh_html = await self._run_with_retry(
+                    "file", {"court": court, "file_num": file_num},
+                    lambda: self._open_file_history(court, file_num),
+                )
+            except BrowserLost:
+                raise
+            except Exception as e:
+                log.error("  ERROR: %s", e)
+                self.progress.unit_finished(time.monotonic() - t0, failed=True)
+                continue
+            # Documents removed from the page since the deep run can't be fetched
+            live = {d.uuid for d in parse_file_history(fh_html)["documents"]}
+            stale = [q for q in queue if q[1] not in live]
+            if stale:
+                log.warning("    %d document(s) no longer listed — skipped", len(stale))
+            downloaded += await self._download_docs([q for q in queue if q[1] in live],
+                                                    case.documents, court, file_num)
+            self.progress.unit_finished(time.monotonic() - t0)
+        log.info("Download pending done — %d document(s) downloaded", downloaded)
+        return downloaded
+
+    def verify_downloads(self) -> list[Path]:
+        """verify_pdf_files() over download_dir and this run's cases."""
+        return verify_pdf_files(self.download_dir, self.cases)
+
+    # -- retries -----------------------------------------------------------
+    def _file_failed(self, court: str, file_num: str, error: Exception) -> "FileScrapeError":
+        """Count a per-file failure; dead-letter the file once its budget is spent."""
+        kind = classify_failure(error)
+        key = (court, file_num)
+        attempts = self._file_failures[key] = self._file_failures.get(key, 0) + 1
+        log.warning("    File %s failed (%s, attempt %d): %s", file_num, kind, attempts, error)
+        self.events.emit("file_failed", court=court, file_num=file_num, kind=kind,
+                         attempt=attempts, error=str(error))
+        dead = not self.retry.should_retry(kind, attempts)
+        if dead:
+            self._dead_files.add(key)
+            self._skip_files(court).add(file_num)
+            self.dead_letter.add("file", kind, str(error), attempts,
+                                 court=court, file_num=file_num)
+            self.progress.errors += 1
+        return FileScrapeError(court, file_num, error, dead_lettered=dead)
+
+    def _skip_files(self, court: str) -> set[str]:
+        """Live set of file numbers in court already scraped or dead-lettered."""
+        return self._done.setdefault(court, set())
+
+    def _find_case(self, court: str, file_num: str) -> int | None:
+        """Index of the case for (court, file_num) in self.cases, if any."""
+        if self._case_pos_len != len(self.cases):  # loaded or reset elsewhere
+            self._case_pos = {(c.court, c.file_number): i for i, c in enumerate(self.cases)}
+            self._case_pos_len = len(self.cases)
+        i = self._case_pos.get((court, file_num))
+        if i is not None and (self.cases[i].court, self.cases[i].file_number) != (court, file_num):
+            self._case_pos_len = -1  # list rebuilt to the same length
+            return self._find_case(court, file_num)
+        return i
+
+    def _store_case(self, case: Case):
+        """Record a scraped case, replacing an earlier version of the same file
+        (a --retry-failed or --refresh of a file loaded from results.json)."""
+        i = self._find_case(case.court, case.file_number)
+        if i is None:
+            self._case_pos[(case.court, case.file_number)] = len(self.cases)
+            self.cases.append(case)
+            self._case_pos_len = len(self.cases)
+        else:
+            self.cases[i] = case
+
+    def use_file_index(self, path: str | Path) -> int:
+        """Skip files recorded in a FileIndex by earlier runs and record this
+        run's files there. Returns the number of files loaded."""
+        self.file_index = FileIndex(path)
+        known = self.file_index.load()
+        for court, nums in known.items():
+            self._skip_files(court).update(nums)
+        n = sum(len(nums) for nums in known.values())
+        log.info("File index %s: %d files already scraped", self.file_index.path, n)
+        return n
+
+    async def _run_with_retry(self, type_: str, unit: dict, run) -> list[dict]:
+        """Run one work unit with classified retries and back-off.
+
+        run is a zero-argument coroutine factory. Search rows appended by a
+        failed attempt are rolled back; cases already scraped are kept and
+        skipped on the next attempt. On exhaustion the unit is dead-lettered
+        and the error re-raised.
+        """
+        attempt = 0
+        while True:
+            mark = len(self.search_results)
+            counts = (self.progress.rows_found, self.progress.duplicates)
+            generation = self.session.generation
+            try:
+                return await run()
+            except Exception as e:
+                for r in self.search_results[mark:]:
+                    self._seen_rows.discard((r.court, r.file_num))
+                del self.search_results[mark:]
+                self.progress.rows_found, self.progress.duplicates = counts
+                # A newly dead-lettered file is progress: retry the unit
+                # without it rather than spending a unit attempt.
+                if isinstance(e, FileScrapeError) and e.dead_lettered:
+                    continue
+                kind = classify_failure(e)
+                attempt += 1
+                if not self.retry.should_retry(kind, attempt):
+                    log.error("  Giving up after %d attempt(s) (%s): %s", attempt, kind, e)
+                    self.dead_letter.add(type_, kind, str(e), attempt, **unit)
+                    raise
+                wait = self.retry.delay(attempt)
+                log.warning("  %s failure — retry %d in %.1fs: %s", kind, attempt, wait, e)
+                self.events.emit("unit_retry", kind=kind, attempt=attempt,
+                                 wait_s=round(wait, 2), error=str(e), **unit)
+                await asyncio.sleep(wait)
+                if kind == FAIL_SESSION:
+                    await self._reauthenticate(reason=str(e), seen_generation=generation)
+
+    async def _download_with_retry(
+        self, queue: list[tuple[int, str, Path]], court: str, file_num: str,
+    ) -> list[tuple[int, bool, Path]]:
+        """_batch_download, re-opening only the failed documents until each
+        succeeds or exhausts its retry budget (then it is dead-lettered)."""
+        results: dict[int, tuple[int, bool, Path]] = {}
+        pending = queue
+        attempt = 0
+        while pending:
+            attempt += 1
+            errors: dict[int, str] = {}
+            for idx, success, save_path in await self._batch_download(pending, errors):
+                results[idx] = (idx, success, save_path)
+            retry_now = []
+            for item in pending:
+                idx, uuid, save_path = item
+                if results[idx][1]:
+                    continue
+                error = errors.get(idx, "unknown")
+                kind = classify_failure(error)
+                if self.retry.should_retry(kind, attempt):
+                    retry_now.append(item)
+                else:
+                    self.dead_letter.add("document", kind, error, attempt, court=court,
+                                         file_num=file_num, uuid=uuid, save_path=str(save_path))
+                    self.progress.errors += 1
+            if retry_now:
+                wait = self.retry.delay(attempt)
+                log.info("      Retrying %d document(s) in %.1fs", len(retry_now), wait)
+                await asyncio.sleep(wait)
+            pending = retry_now
+        return [results[idx] for idx, _, _ in queue]
+
+    async def retry_failed(self):
+        """Replay the dead-letter queue: units first, then files/documents
+        grouped by file so each File History page is opened once.
+
+        Replayed files bypass the skip set, a re-scraped case replaces the
+        one loaded from results.json, and document-only entries of a loaded
+        case are downloaded into it in place. Entries that neither succeed
+        nor fail again (e.g. a file no longer found) stay on the queue.
+        """
+        entries = self.dead_letter.take()
+        if not entries:
+            log.info("Dead-letter queue is empty")
+            return
+        log.info("Replaying %d dead-lettered entries from %s", len(entries), self.dead_letter.path)
+        keep = []
+        files: dict[tuple[str, str], set[str] | None] = {}
+        by_file: dict[tuple[str, str], list[dict]] = {}
+        for e in entries:
+            if e["type"] == "unit":
+                unit = {k: v for k, v in e.items()
+                        if k not in ("type", "kind", "error", "attempts", "ts")}
+                mark = len(self.dead_letter.added)
+                try:
+                    await self._run_bulk_unit(unit)
+                except BrowserLost:
+                    raise
+                except Exception:
+                    if len(self.dead_letter.added) == mark:
+                        keep.append(e)
+            else:
+                key = (e["court"], e["file_num"])
+                by_file.setdefault(key, []).append(e)
+                if e["type"] == "file":
+                    files[key] = None  # whole file
+                elif key not in files or files[key] is not None:
+                    files.setdefault(key, set()).add(e["uuid"])
+
+        download = self.download
+        for key, uuids in files.items():
+            mark = len(self.dead_letter.added)
+            done = await self._replay_file(*key, uuids, download)
+            requeued = self.dead_letter.added[mark:]
+            for e in by_file[key]:
+                if e["type"] == "file" or uuids is None:
+                    ok = done is not None
+                else:
+                    ok = e["uuid"] in (done or ()) or any(
+                        r["type"] == "document" and r.get("uuid") == e["uuid"] for r in requeued)
+                if not ok and not any(r["type"] == "file" for r in requeued):
+                    keep.append(e)
+        self.only_uuids = None
+        self.download = download
+        self.dead_letter.finish_replay(keep)
+        log.info("Replay done — %d entries re-queued", self.dead_letter.count)
+
+    async def _replay_file(
+        self, court: str, file_num: str, uuids: set[str] | None, download: bool,
+    ) -> set[str] | None:
+        """Replay one dead-lettered file (uuids None) or some of its documents.
+
+        Returns the uuids downloaded (empty for a whole file), or None if the
+        file could not be scraped.
+        """
+        unit = {"court": court, "file_num": file_num}
+        i = self._find_case(court, file_num) if uuids is not None else None
+        if i is not None:
+            case = self.cases[i]
+            try:
+                await self.ensure_session()
+                fh_html = await self._run_with_retry(
+                    "file", unit, lambda: self._open_file_history(court, file_num))
+            except BrowserLost:
+                raise
+            except Exception as e:
+                log.error("  ERROR: %s", e)
+                return None
+            live = {d.uuid for d in parse_file_history(fh_html)["documents"]}
+            if uuids - live:
+                log.warning("    %d document(s) no longer listed — skipped", len(uuids - live))
+            queue = [q for q in self._plan_downloads(case.documents, case.file_name or file_num)
+                     if q[1] in uuids & live]
+            await self._download_docs(queue, case.documents, court, file_num)
+            return {d.uuid for d in case.documents if d.uuid in uuids and d.downloaded}
+
+        self.only_uuids = uuids
+        self.download = download or uuids is not None
+        skip = self._skip_files(court)
+        was_done = file_num in skip
+        skip.discard(file_num)  # loaded from results.json; fetch it again
+        done0 = self.progress.files_done
+        try:
+            await self._run_with_retry(
+                "file", unit,
+                lambda: self.file_search_by_number(court, file_num, deep=True, skip=skip),
+            )
+        except Exception:
+            pass
+        if self.progress.files_done == done0:
+            if was_done:
+                skip.add(file_num)
+            return None
+        if uuids is None:
+            return set()
+        i = self._find_case(court, file_num)
+        return {d.uuid for d in self.cases[i].documents if d.uuid in uuids and d.downloaded}
+
+    # -- benchmarks --------------------------------------------------------
+    async def bench_resource_filter(
+        self, court: str, proceeding: str, from_date: str, to_date: str, files: int = 5,
+    ) -> dict:
+        """Page-load time and bytes per File History page, filter off vs on.
+
+        Runs one search, then opens the first `files` File History pages
+        from the results once per mode.
+        """
+        tab = self._browser.main_tab
+        meter = NetworkMeter()
+        await meter.attach(tab)
+        filt = self.resource_filter or ResourceFilter()
+        report = {}
+        try:
+            for mode in ("unfiltered", "filtered"):
+                if mode == "filtered":
+                    await filt.attach(tab)
+                elif self.resource_filter:
+                    await self.resource_filter.detach(tab)
+                html = await self._submit_file_search(
+                    court, proceeding=proceeding, from_date=from_date, to_date=to_date)
+                if html is None:
+                    raise ValueError(f"{proceeding!r} is not offered in {court}")
+                rows = [r for r in parse_search_results(html) if r.btn_value][:files]
+                times, sizes = [], []
+                for row in rows:
+                    meter.reset()
+                    t0 = time.monotonic()
+                    await self._click_file_number(row.btn_value)
+                    times.append(time.monotonic() - t0)
+                    sizes.append(meter.bytes)
+                    await self._history_back()
+                n = max(len(rows), 1)
+                report[mode] = {
+                    "files": len(rows),
+                    "avg_load_s": round(sum(times) / n, 3),
+                    "avg_kb": round(sum(sizes) / n / 1024, 1),
+                }
+                log.info("Bench %-10s %d files, %.2fs/page, %.1f KB/page", mode,
+                         len(rows), report[mode]["avg_load_s"], report[mode]["avg_kb"])
+        finally:
+            meter.detach(tab)
+            if not self.resource_filter:
+                await filt.detach(tab)
+        report["blocked_requests"] = filt.blocked
+        return report
 
     # -- bulk helpers ------------------------------------------------------
-    async def bulk_file_search_by_info(
-        self, courts: list[str], proceeding: str,
-        from_date: str, to_date: str,
-        chunk_days: int = 30, deep: bool = False,
+    async def batch_file_search_by_number(
+        self, numbers: list[tuple[str, str]], deep: bool = False, refresh: bool = False,
     ):
-        start = date.fromisoformat(from_date)
-        end = date.fromisoformat(to_date)
-        for court in courts:
-            log.info("=== Bulk: %s ===", court)
-            current = start
-            while current <= end:
-                chunk_end = min(current + timedelta(days=chunk_days - 1), end)
-                f = current.strftime("%m/%d/%Y")
-                t = chunk_end.strftime("%m/%d/%Y")
-                log.info("  %s — %s", f, t)
+        """Look up many known file numbers, grouped by court.
+
+        Numbers already scraped (this run or a loaded previous output) are
+        skipped unless refresh, which fetches them again and replaces their
+        cases. Consecutive searches reuse the File Search form when it is
+        still on the page instead of reloading it and re-selecting the court.
+        """
+        if refresh:
+            for court, num in numbers:
+                self._skip_files(court).discard(num)
+        by_court: dict[str, list[str]] = {}
+        for court, num in numbers:
+            if num not in self._skip_files(court):
+                by_court.setdefault(court, []).append(num)
+        todo_total = sum(len(nums) for nums in by_court.values())
+        log.info("Batch: %d file number(s) to look up, %d already scraped",
+                 todo_total, len(numbers) - todo_total)
+        self.progress.add_units(todo_total)
+        for court, todo in by_court.items():
+            done = self._skip_files(court)
+            log.info("=== Batch: %s — %d file number(s) ===", court, len(todo))
+            for num in todo:
+                # An earlier search in this batch may have returned this file too
+                if num in done:
+                    self.progress.unit_finished(0.0)
+                    continue
+                unit = {"court": court, "file_num": num}
+                await self._govern()
+                t0 = time.monotonic()
+                self.events.emit("unit_started", unit=f"{court}|{num}", **unit)
+
+                async def lookup():
+                    rows = await self.file_search_by_number(court, num, skip=done, reuse_form=True)
+                    on_file = bool(deep and rows) and await self._deep_scrape(rows, court, skip=done)
+                    return rows, on_file
+
                 try:
-                    await self.file_search_by_info(court, proceeding, f, t, deep=deep)
+                    rows, on_file = await self._run_with_retry("file", unit, lookup)
                 except Exception as e:
                     log.error("  ERROR: %s", e)
-                current = chunk_end + timedelta(days=1)
+                    self.events.emit("unit_failed", unit=f"{court}|{num}", error=str(e))
+                    self.progress.unit_finished(time.monotonic() - t0, failed=True)
+                    continue
+                duration = time.monotonic() - t0
+                self.events.emit("unit_finished", unit=f"{court}|{num}", rows=len(rows),
+                                 duration_s=round(duration, 3))
+                self.progress.unit_finished(duration)
+                if on_file:
+                    # Back to the results page — its search form can be reused
+                    await self._history_back()
+
+    async def _run_bulk_unit(self, unit: dict) -> list[dict]:
+        """One bulk work unit (a search with fixed parameters), with retries.
+
+        unit["search_type"] selects the search: "file_info" (default, a
+        court/proceeding/date chunk), "file_number", "name_person",
+        "name_org" or one of INDEX_SEARCH_TYPES.
+        """
+        court = unit["court"]
+        search_type = unit.get("search_type", "file_info")
+        p = self.progress
+        await self.ensure_session(SEARCH_OPTION.get(search_type, search_type),
+                                  upcoming=p.unit_time / p.units_done if p.units_done else 0.0)
+        if search_type == "file_info":
+            run = lambda: self.file_search_by_info(  # noqa: E731
+                court, unit["proceeding"], unit["from_date"], unit["to_date"],
+                deep=unit["deep"], skip=self._skip_files(court), reuse_form=True,
+            )
+        elif search_type == "file_number":
+            run = lambda: self.file_search_by_number(  # noqa: E731
+                court, unit["file_number"], deep=unit["deep"],
+                skip=self._skip_files(court), reuse_form=True,
+            )
+        elif search_type == "name_person":
+            run = lambda: self.name_search_person(  # noqa: E731
+                court, unit["last_name"], unit.get("first_name"),
+                unit.get("death_from_date"), unit.get("death_to_date"), deep=unit["deep"],
+            )
+        elif search_type == "name_org":
+            run = lambda: self.name_search_organization(  # noqa: E731
+                court, unit["organization"], unit.get("file_from_date"),
+                unit.get("file_to_date"), deep=unit["deep"],
+            )
+        else:
+            run = lambda: self.index_search(  # noqa: E731
+                search_type, court, deep=unit["deep"], skip=self._skip_files(court),
+                **{k: v for k, v in unit.items()
+                   if k not in ("court", "search_type", "deep")},
+            )
+        return await self._run_with_retry("unit", unit, run)
+
+    async def _run_units(self, units: list[dict]):
+        """Run bulk units in order with progress, events and retries."""
+        self.progress.add_units(len(units))
+        court = None
+        for unit in units:
+            if unit["court"] != court:
+                court = unit["court"]
+                log.info("=== Bulk: %s ===", court)
+            label = unit_label(unit)
+            log.info("  %s", label)
+            t0 = time.monotonic()
+            self.events.emit("unit_started", unit=label, **unit)
+            try:
+                rows = await self._run_bulk_unit(unit)
+            except BrowserLost:
+                raise
+            except Exception as e:
+                log.error("  ERROR: %s", e)
+                duration = time.monotonic() - t0
+                self.events.emit("unit_failed", unit=label, error=str(e),
+                                 duration_s=round(duration, 3))
+                self.progress.unit_finished(duration, failed=True)
+                if self.watermarks and "proceeding" in unit:
+                    self.watermarks.unit_failed(unit)
+                continue
+            duration = time.monotonic() - t0
+            self.events.emit("unit_finished", unit=label, rows=len(rows),
+                             duration_s=round(duration, 3))
+            self.progress.unit_finished(duration)
+            if self.watermarks and "proceeding" in unit:
+                self.watermarks.unit_done(unit)
+            if self.profiler:
+                self.profiler.checkpoint(label)
+
+    async def bulk_file_search_by_info(
+        self, courts: list[str], proceedings: str | list[str],
+        from_date: str | None, to_date: str | None = None,
+        chunk_days: int = 30, deep: bool = False,
+        since_last_run: bool = False, overlap_days: int = 1,
+    ):
+        """courts x proceedings x date chunks, court-major so each court's
+        form and proceeding dropdown is loaded once and reused.
+
+        to_date defaults to today. With since_last_run each (court,
+        proceeding) starts from its watermark (see WatermarkStore.start);
+        from_date then only seeds pairs that don't have one yet.
+        """
+        if isinstance(proceedings, str):
+            proceedings = [proceedings]
+        end = date.fromisoformat(to_date) if to_date else date.today()
+        units = []
+        for court in courts:
+            for proceeding in proceedings:
+                start = date.fromisoformat(from_date) if from_date else None
+                if since_last_run and self.watermarks:
+                    start = self.watermarks.start(court, proceeding, overlap_days) or start
+                if start is None:
+                    log.warning("  %s|%s: no watermark yet — pass --from-date to seed it",
+                                court, proceeding)
+                    continue
+                if start > end:
+                    log.info("  %s|%s: up to date", court, proceeding)
+                    continue
+                units += [{"court": court, "proceeding": proceeding,
+                           "from_date": f, "to_date": t, "deep": deep}
+                          for f, t in date_chunks(start, end, chunk_days)]
+        if since_last_run:
+            log.info("Since last run: %d chunk(s) across %d court/proceeding pair(s)",
+                     len(units), len({(u["court"], u["proceeding"]) for u in units}))
+        await self._run_units(units)
+
+    async def bulk_index_search(
+        self, search_type: str, courts: list[str],
+        params: list[dict], deep: bool = False,
+    ):
+        """Historical searches over courts x parameter sets (e.g. index-book
+        letters x courts) through the same retrying, resumable unit runner."""
+        await self._run_units([
+            {"court": court, "search_type": search_type, "deep": deep, **p}
+            for court in courts for p in params
+        ])
+
+    async def run_job(self, unit: dict, download: bool = False) -> dict:
+        """Run one unit on this already-open session and return only its output.
+
+        Used by the job daemon: results and the done-set are reset per job so
+        a repeated lookup of the same file is fetched fresh.
+        """
+        self.search_results, self.cases, self.documents = [], [], []
+        self._done.clear()
+        self._seen_rows.clear()
+        self._file_failures.clear()
+        self._dead_files.clear()
+        self.download = download and unit.get("deep", False)
+        await self._run_bulk_unit(unit)
+        return {"search_results": [r.to_dict() for r in self.search_results],
+                "cases": [c.to_row() for c in self.cases]}
+
+    async def crawl_related(self, crawler: RelatedFilesCrawler, max_files: int = 500):
+        """Follow related_files from the cases scraped so far, breadth-first.
+
+        Every fetched file goes through the same retrying deep-scrape path;
+        its own related files join the frontier one level deeper.
+        """
+        for case in self.cases:
+            crawler.visit(case.court, case.file_number)
+        for case in list(self.cases):
+            crawler.add_edges(case.court, case.file_number, case.related_files, 0)
+        log.info("=== Crawl: %d related file(s) queued (depth <= %d, max %d files) ===",
+                 len(crawler), crawler.max_depth, max_files)
+
+        fetched = 0
+        tried: set[tuple[str, str]] = set()  # failed this run; don't re-queue
+        while fetched < max_files:
+            item = crawler.pop()
+            if item is None:
+                break
+            court, file_num, depth = item
+            if (court, file_num) in tried:
+                continue
+            # Only files actually scraped are persisted as visited, so one
+            # that fails (or is dead-lettered) is crawled again next run.
+            if file_num in self._skip_files(court):
+                if (court, file_num) not in self._dead_files:
+                    crawler.visit(court, file_num)
+                continue
+            tried.add((court, file_num))
+            fetched += 1
+            log.info("  Crawl [%d] depth %d: %s %s (%d queued)",
+                     fetched, depth, court, file_num, len(crawler))
+            n0 = len(self.cases)
+
+            async def fetch():
+                skip = self._skip_files(court)
+                rows = await self.file_search_by_number(court, file_num, skip=skip, reuse_form=True)
+                return bool(rows) and await self._deep_scrape(rows, court, skip=skip)
+
+            try:
+                on_file = await self._run_with_retry(
+                    "file", {"court": court, "file_num": file_num}, fetch)
+            except Exception as e:
+                log.error("  ERROR: %s", e)
+                continue
+            for case in self.cases[n0:]:
+                crawler.visit(case.court, case.file_number)
+                crawler.add_edges(case.court, case.file_number, case.related_files, depth)
+            if on_file:
+                await self._history_back()
+        log.info("Crawl done — %d fetched, %d edges, %d still queued, %d dropped (frontier full)",
+                 fetched, len(crawler.edges), len(crawler), crawler.dropped)
 
     # -- output ------------------------------------------------------------
+    def load_previous(self, basename: str = "results") -> int:
+        """Load an earlier run's results.json so its files are skipped and
+        kept in the next save(). Returns the number of cases loaded."""
+        loaded = load_results(basename)
+        if loaded is None:
+            return 0
+        rows, cases = loaded
+        self.search_results.extend(rows)
+        self._seen_rows.update((r.court, r.file_num) for r in rows if r.btn_value and r.file_num)
+        self.cases.extend(cases)
+        for case in cases:
+            self._skip_files(case.court).add(case.file_number)
+        log.info("Loaded %d previously scraped files from %s", len(cases),
+                 OUTPUT_DIR / f"{basename}.json")
+        return len(cases)
+
     def save(self, basename: str = "results"):
-        OUTPUT_DIR.mkdir(exist_ok=True)
-
-        # Shallow search results (always saved)
-        if self.search_results:
-            path = OUTPUT_DIR / f"{basename}_search.csv"
-            keys = [k for k in self.search_results[0].keys() if k != "btn_value"]
-            with open(path, "w", newline="", encoding="utf-8") as f:
-                w = csv.DictWriter(f, fieldnames=keys, extrasaction="ignore")
-                w.writeheader()
-                w.writerows(self.search_results)
-            log.info("Saved %d search results -> %s", len(self.search_results), path)
-
-        # Deep scrape: single flat CSV with all data per file
-        if self.cases:
-            path = OUTPUT_DIR / f"{basename}_deep.csv"
-            keys = list(self.cases[0].keys())
-            with open(path, "w", newline="", encoding="utf-8") as f:
-                w = csv.DictWriter(f, fieldnames=keys)
-                w.writeheader()
-                w.writerows(self.cases)
-            log.info("Saved %d files (deep) -> %s", len(self.cases), path)
-
-        # Full JSON with everything
-        path = OUTPUT_DIR / f"{basename}.json"
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(
-                {
-                    "search_results": self.search_results,
-                    "cases": self.cases,
-                },
-                f, indent=2, ensure_ascii=False,
-            )
-        log.info("Saved -> %s", path)
+        save_results(self.search_results, self.cases, basename)
+
+# ---------------------------------------------------------------------------
+# Warm browser pool + local job daemon
+# ---------------------------------------------------------------------------
+DEFAULT_SOCKET = OUTPUT_DIR / "scraper.sock"
+JOB_REPLY_LIMIT = 1 << 26  # max bytes of one JSON reply line (deep results can be large)
+
+JOB_FIELDS = {  # search type -> required job fields
+    "file_info": ("proceeding", "from_date"),
+    "file_number": ("file_number",),
+    "name_person": ("last_name",),
+    "name_org": ("organization",),
+    "old_index": ("last_name",),
+    "will": ("last_name",),
+    "index_book": ("letter",),
+}
+
+
+def job_unit(job: dict) -> dict:
+    """Validate a daemon job and turn it into a bulk unit.
+
+    A job is a flat JSON object: search_type, court, deep, download plus the
+    search's own fields (e.g. {"search_type": "file_number", "court": "Kings",
+    "file_number": "2025-267", "deep": true}). ISO from/to dates are
+    converted to the site's MM/DD/YYYY.
+    """
+    search_type = job.get("search_type")
+    if search_type not in JOB_FIELDS:
+        raise ValueError(f"Unknown search_type: {search_type!r}")
+    if job.get("court") not in COURTS:
+        raise ValueError(f"Unknown court: {job.get('court')!r}")
+    missing = [k for k in JOB_FIELDS[search_type] if not job.get(k)]
+    if missing:
+        raise ValueError(f"{search_type} job needs {', '.join(missing)}")
+    unit = {k: v for k, v in job.items() if k != "download" and v not in (None, "")}
+    unit["deep"] = bool(job.get("deep"))
+    if search_type == "file_info":
+        unit.setdefault("to_date", unit["from_date"])
+    for k in ("from_date", "to_date"):
+        if k in unit and re.fullmatch(r"\d{4}-\d{2}-\d{2}", unit[k]):
+            unit[k] = date.fromisoformat(unit[k]).strftime("%m/%d/%Y")
+    return unit
+
+
+class ScraperPool:
+    """A fixed set of authenticated scrapers kept warm between jobs.
+
+    Member 0 uses the configured profile; the others get sibling profiles
+    (.browser_profile-1, …) since Chrome can't open one profile twice, and
+    likewise their own session_stats-<i>.json. All members share one rate
+    limiter, so the pool as a whole stays under --rpm. Idle members are
+    revalidated every *keepalive* seconds.
+    """
+
+    def __init__(self, size: int = 1, keepalive: float = 300.0, **scraper_kwargs):
+        self.size = max(1, size)
+        self.keepalive = keepalive
+        self._kwargs = scraper_kwargs
+        self.members: list[WebSurrogateScraper] = []
+        self._idle: asyncio.Queue = asyncio.Queue()
+        self._keepalive_task: asyncio.Task | None = None
+        self.jobs = 0
+
+    async def start(self):
+        base = Path(self._kwargs.pop("profile_dir", None) or PROFILE_DIR)
+        for i in range(self.size):
+            profile = base if i == 0 else base.with_name(f"{base.name}-{i}")
+            s = WebSurrogateScraper(profile_dir=profile, **self._kwargs)
+            if self.members:
+                s.rate_limiter = self.members[0].rate_limiter
+                s.session = SessionManager(OUTPUT_DIR / f"session_stats-{i}.json")
+            self.members.append(s)
+        t0 = time.monotonic()
+        await asyncio.gather(*(s.__aenter__() for s in self.members))
+        for s in self.members:
+            self._idle.put_nowait(s)
+        log.info("Pool ready — %d session(s) in %.1fs", self.size, time.monotonic() - t0)
+        self._keepalive_task = asyncio.create_task(self._keep_warm())
+
+    async def stop(self):
+        if self._keepalive_task:
+            self._keepalive_task.cancel()
+        for s in self.members:
+            await s.__aexit__(None, None, None)
+
+    @contextlib.asynccontextmanager
+    async def lease(self):
+        s = await self._idle.get()
+        try:
+            yield s
+        finally:
+            self._idle.put_nowait(s)
+
+    async def run(self, job: dict) -> dict:
+        unit = job_unit(job)
+        label = unit_label(unit)
+        async with self.lease() as s:
+            t0 = time.monotonic()
+            log.info("Job: %s", label)
+            result = await s.run_job(unit, download=bool(job.get("download")))
+        self.jobs += 1
+        elapsed = time.monotonic() - t0
+        log.info("Job done in %.1fs — %d rows, %d cases", elapsed,
+                 len(result["search_results"]), len(result["cases"]))
+        return {**result, "elapsed_s": round(elapsed, 3)}
+
+    async def _keep_warm(self):
+        while True:
+            await asyncio.sleep(self.keepalive)
+            for _ in range(self._idle.qsize()):
+                s = self._idle.get_nowait()
+                try:
+                    await s.ensure_session()
+                except Exception as e:
+                    log.warning("Pool keepalive failed: %s", e)
+                finally:
+                    self._idle.put_nowait(s)
+
+
+async def socket_in_use(socket_path: str | Path) -> bool:
+    """True if something accepts connections on the Unix socket."""
+    try:
+        _, writer = await asyncio.open_unix_connection(str(socket_path))
+    except OSError:
+        return False
+    writer.close()
+    return True
+
+
+async def serve_jobs(pool: ScraperPool, socket_path: str | Path = DEFAULT_SOCKET):
+    """Accept JSON-line jobs on a Unix socket until cancelled.
+
+    Each line in is one job; each line out is {"ok": true, "search_results",
+    "cases", "elapsed_s"} or {"ok": false, "error"}. Connections are served
+    concurrently, bounded by the pool size.
+    """
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while line := await reader.readline():
+                try:
+                    reply = {"ok": True, **await pool.run(json.loads(line))}
+                except Exception as e:
+                    log.error("Job failed: %s", e)
+                    reply = {"ok": False, "error": str(e)}
+                writer.write(json.dumps(reply, ensure_ascii=False).encode() + b"\n")
+                await writer.drain()
+        finally:
+            writer.close()
+
+    path = Path(socket_path)
+    if await socket_in_use(path):
+        raise RuntimeError(f"A job daemon is already serving on {path}")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.unlink(missing_ok=True)  # stale: left by a daemon that didn't exit cleanly
+    server = await asyncio.start_unix_server(handle, path=str(path))
+    log.info("Serving jobs on %s (pool of %d)", path, pool.size)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        path.unlink(missing_ok=True)
+
+
+async def submit_job(job: dict, socket_path: str | Path = DEFAULT_SOCKET) -> dict:
+    """Send one job to a running daemon and wait for its reply."""
+    reader, writer = await asyncio.open_unix_connection(str(socket_path), limit=JOB_REPLY_LIMIT)
+    try:
+        writer.write(json.dumps(job).encode() + b"\n")
+        await writer.drain()
+        line = await reader.readline()
+    finally:
+        writer.close()
+    return json.loads(line) if line else {"ok": False, "error": "daemon closed the connection"}
+
+
+def governor_from_args(args) -> BrowserGovernor | None:
+    """The CLI's browser governor: on by default, None with --no-governor."""
+    if args.no_governor:
+        return None
+    return BrowserGovernor(args.max_browser_mb, args.max_tabs, args.restart_every)
+
+
+def watermarks_from_args(args) -> WatermarkStore | None:
+    """The watermark file, only for runs meant to move it: --since-last-run or
+    --update-watermarks. A one-off run for a later range must not set a mark
+    that the next --since-last-run would start after."""
+    if args.bench_replay or not (args.since_last_run or args.update_watermarks):
+        return None
+    return WatermarkStore(args.watermarks)
+
+
+def jobs_from_args(args) -> list[dict]:
+    """The CLI search as daemon jobs (one per court / date chunk / file / letter)."""
+    st, courts = args.search_type, args.courts or []
+    base = {"search_type": st, "deep": args.deep, "download": args.download}
+    if st == "file_number":
+        pairs = (read_file_numbers(args.file_numbers_from, courts) if args.file_numbers_from
+                 else [(c, args.file_number) for c in courts])
+        return [{**base, "court": c, "file_number": n} for c, n in pairs]
+    if st == "file_info":
+        if not args.from_date or not args.proceedings:
+            return [{**base, "court": c} for c in courts]  # fails validation
+        chunks = date_chunks(date.fromisoformat(args.from_date),
+                             date.fromisoformat(args.to_date or args.from_date), args.chunk_days)
+        return [{**base, "court": c, "proceeding": p, "from_date": f, "to_date": t}
+                for c in courts for p in args.proceedings for f, t in chunks]
+    if st == "index_book":
+        letters = list(args.letters.upper()) if args.letters else INDEX_BOOK_LETTERS
+        return [{**base, "court": c, "letter": letter} for c in courts for letter in letters]
+    if st == "name_person":
+        fields = {"last_name": args.last_name, "first_name": args.first_name,
+                  "death_from_date": args.death_from_date, "death_to_date": args.death_to_date}
+    elif st == "name_org":
+        fields = {"organization": args.organization, "file_from_date": args.file_from_date,
+                  "file_to_date": args.file_to_date}
+    else:  # old_index / will
+        fields = {"last_name": args.last_name, "first_name": args.first_name}
+        if st == "will":
+            fields |= {"from_date": args.from_date, "to_date": args.to_date or args.from_date}
+    return [{**base, "court": c, **fields} for c in courts]
+
+
+# ---------------------------------------------------------------------------
+# Local HTTP lookup service
+# ---------------------------------------------------------------------------
+HTTP_STATUS = {200: "OK", 400: "Bad Request", 404: "Not Found",
+               405: "Method Not Allowed", 500: "Internal Server Error"}
+
+
+class TTLCache:
+    """LRU cache whose entries also expire *ttl* seconds after insertion."""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 900.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict = OrderedDict()  # key -> (expires, value)
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        entry = self._data.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            self._data.pop(key, None)
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key, value):
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class LatencyStats:
+    """Per-endpoint request latencies (last *window* requests each)."""
+
+    def __init__(self, window: int = 1000):
+        self.window = window
+        self._samples: dict[str, list[float]] = {}
+        self._errors: dict[str, int] = {}
+
+    def record(self, endpoint: str, seconds: float, ok: bool = True):
+        samples = self._samples.setdefault(endpoint, [])
+        samples.append(seconds)
+        del samples[:-self.window]
+        if not ok:
+            self._errors[endpoint] = self._errors.get(endpoint, 0) + 1
+
+    def summary(self) -> dict:
+        out = {}
+        for endpoint, samples in self._samples.items():
+            ts = sorted(samples)
+            out[endpoint] = {
+                "count": len(ts),
+                "errors": self._errors.get(endpoint, 0),
+                "p50_ms": round(ts[len(ts) // 2] * 1000, 1),
+                "p95_ms": round(ts[min(len(ts) - 1, int(len(ts) * 0.95))] * 1000, 1),
+                "max_ms": round(ts[-1] * 1000, 1),
+            }
+        return out
+
+
+class LookupService:
+    """On-demand searches and file histories over a ScraperPool.
+
+    Parsed file histories are cached (LRU + TTL) per (court, file number);
+    concurrent requests for the same file or the same search share one
+    in-flight fetch. Cases are returned structured (parties and documents
+    as JSON lists, not the CSV schema's JSON strings).
+    """
+
+    def __init__(self, pool: ScraperPool, cache_size: int = 1024, cache_ttl: float = 900.0):
+        self.pool = pool
+        self.cache = TTLCache(cache_size, cache_ttl)
+        self.latency = LatencyStats()
+        self.coalesced = 0
+        self._inflight: dict = {}
+
+    async def _coalesce(self, key, fetch):
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fetch())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self.coalesced += 1
+        # shield: a client hanging up must not cancel a fetch others wait on
+        return await asyncio.shield(task)
+
+    @staticmethod
+    def _structured(rows: list[dict]) -> list[dict]:
+        return [asdict(Case.from_row(row)) for row in rows]
+
+    def _cache_cases(self, cases: list[dict]):
+        by_file: dict[tuple[str, str], list[dict]] = {}
+        for case in cases:
+            by_file.setdefault((case["court"], case["file_number"]), []).append(case)
+        for key, group in by_file.items():
+            self.cache.put(key, group)
+
+    async def file_history(self, court: str, file_number: str, fresh: bool = False) -> list[dict]:
+        key = (court, file_number)
+        if not fresh:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        async def fetch():
+            reply = await self.pool.run({"search_type": "file_number", "court": court,
+                                         "file_number": file_number, "deep": True})
+            cases = self._structured(reply["cases"])
+            self._cache_cases(cases)
+            return [c for c in cases if c["file_number"] == file_number]
+
+        return await self._coalesce(key, fetch)
+
+    async def search(self, job: dict) -> dict:
+        async def fetch():
+            reply = await self.pool.run(job)
+            reply["cases"] = self._structured(reply["cases"])
+            self._cache_cases(reply["cases"])
+            return reply
+
+        return await self._coalesce(json.dumps(job, sort_keys=True), fetch)
+
+    def metrics(self) -> dict:
+        return {
+            "endpoints": self.latency.summary(),
+            "cache": {"size": len(self.cache), "hits": self.cache.hits,
+                      "misses": self.cache.misses},
+            "coalesced": self.coalesced,
+            "pool": {"size": self.pool.size, "jobs": self.pool.jobs},
+        }
+
+    async def _route(self, method: str, path: str, query: dict, body: bytes) -> tuple[int, object]:
+        if path == "/health":
+            return 200, {"ok": True}
+        if path == "/metrics":
+            return 200, self.metrics()
+        if path == "/file-history":
+            if not query.get("court") or not query.get("file_number"):
+                return 400, {"error": "court and file_number are required"}
+            cases = await self.file_history(query["court"], query["file_number"],
+                                            fresh=query.get("fresh") in ("1", "true"))
+            return (200, {"cases": cases}) if cases else (404, {"error": "file not found"})
+        if path == "/search":
+            if method == "POST":
+                job = json.loads(body or b"{}")
+                if not isinstance(job, dict):
+                    return 400, {"error": "the job body must be a JSON object"}
+            elif method == "GET":
+                job = dict(query)
+                for k in ("deep", "download"):
+                    job[k] = job.get(k) in ("1", "true")
+            else:
+                return 405, {"error": "use GET or POST"}
+            job_unit(job)  # validate before queueing
+            return 200, await self.search(job)
+        return 404, {"error": f"no such endpoint: {path}"}
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Serve one HTTP/1.1 request per connection (Connection: close)."""
+        t0 = time.monotonic()
+        path = "?"
+        try:
+            method, target, _ = (await reader.readline()).decode("latin-1").split(" ", 2)
+            headers = {}
+            while (line := (await reader.readline()).decode("latin-1").strip()):
+                k, _, v = line.partition(":")
+                headers[k.strip().lower()] = v.strip()
+            body = await reader.readexactly(int(headers.get("content-length", 0)))
+            url = urlsplit(target)
+            path = url.path.rstrip("/") or "/"
+            try:
+                status, payload = await self._route(method, path, dict(parse_qsl(url.query)), body)
+            except ValueError as e:  # includes malformed JSON bodies
+                status, payload = 400, {"error": str(e)}
+            except Exception as e:
+                log.error("HTTP %s %s failed: %s", method, path, e)
+                status, payload = 500, {"error": str(e)}
+            data = json.dumps(payload, ensure_ascii=False).encode()
+            writer.write(
+                f"HTTP/1.1 {status} {HTTP_STATUS[status]}\r\n"
+                f"Content-Type: application/json\r\nContent-Length: {len(data)}\r\n"
+                f"Connection: close\r\n\r\n".encode() + data)
+            await writer.drain()
+            if path != "/metrics":
+                self.latency.record(path, time.monotonic() - t0, ok=status < 500)
+        except (ValueError, ConnectionError, asyncio.IncompleteReadError):
+            pass  # malformed request line or client hung up
+        finally:
+            writer.close()
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 8765):
+        server = await asyncio.start_server(self.handle, host, port)
+        log.info("HTTP API on http://%s:%d (pool of %d)", host, port, self.pool.size)
+        async with server:
+            await server.serve_forever()
 
 
 # ---------------------------------------------------------------------------
 # CLI
 # ---------------------------------------------------------------------------
-async def main():
+def build_parser():
     import argparse
 
     parser = argparse.ArgumentParser(
@@ -1419,10 +4928,10 @@ Examples:
 """,
     )
 
-    parser.add_argument("--search-type", required=True, choices=[
-        "name_person", "name_org", "file_number", "file_info",
+    parser.add_argument("--search-type", choices=[
+        "name_person", "name_org", "file_number", "file_info", *INDEX_SEARCH_TYPES,
     ])
-    parser.add_argument("--courts", nargs="+", required=True)
+    parser.add_argument("--courts", nargs="+", help='Court names, or "all"')
     parser.add_argument("--deep", action="store_true")
 
     parser.add_argument("--last-name", type=str)
@@ -1435,72 +4944,439 @@ Examples:
     parser.add_argument("--file-from-date", type=str)
     parser.add_argument("--file-to-date", type=str)
     parser.add_argument("--file-number", type=str)
+    parser.add_argument("--file-numbers-from", type=str,
+                        help="Batch file_number input: .txt, .csv (court,file_number) "
+                             "or a results .json (its related_files)")
+    parser.add_argument("--crawl-related", action="store_true",
+                        help="After the search, follow related_files (requires --deep)")
+    parser.add_argument("--crawl-depth", type=int, default=1,
+                        help="Max related-file hops from the searched files")
+    parser.add_argument("--crawl-max-files", type=int, default=500,
+                        help="Max files fetched by the crawl in one run")
+    parser.add_argument("--crawl-visited", type=str, default=None,
+                        help="Visited-set file kept across runs (default: output/crawl_visited.json)")
+    parser.add_argument("--file-index", type=str, default=None,
+                        help="Skip files deep-scraped by earlier runs listed in this index "
+                             "and append this run's files to it")
+    parser.add_argument("--refresh", action="store_true",
+                        help="Batch mode: re-scrape listed files already in the --output "
+                             "results, replacing them there")
     parser.add_argument("--proceeding", type=str)
+    parser.add_argument("--proceedings", nargs="+", default=None,
+                        help="file_info: several proceedings, or 'all' (every entry in PROCEEDINGS)")
     parser.add_argument("--chunk-days", type=int, default=30)
+    parser.add_argument("--since-last-run", action="store_true",
+                        help="file_info: start each court/proceeding at its watermark "
+                             "(--to-date defaults to today)")
+    parser.add_argument("--overlap-days", type=int, default=1,
+                        help="--since-last-run: days re-searched before each watermark")
+    parser.add_argument("--update-watermarks", action="store_true",
+                        help="file_info: move the watermarks without --since-last-run "
+                             "(to seed them from a --from-date run)")
+    parser.add_argument("--watermarks", type=str, default=str(OUTPUT_DIR / "watermarks.json"),
+                        help="Per court/proceeding watermark file")
+    parser.add_argument("--change-feed", type=str, default=None, metavar="PATH",
+                        help="Append per-file field/document deltas against the last "
+                             "scraped version to this JSON-lines feed (needs --deep)")
+    parser.add_argument("--case-store", type=str, default=str(OUTPUT_DIR / "cases.db"),
+                        help="--change-feed: SQLite store of each file's last version")
+    parser.add_argument("--letters", type=str, default=None,
+                        help="index_book: letters to sweep, e.g. ABC (default: A-Z)")
 
     parser.add_argument("--headless", action="store_true")
     parser.add_argument("--download", action="store_true",
                         help="Download document PDFs (requires --deep)")
+    parser.add_argument("--verify-downloads", action="store_true",
+                        help="Check the PDFs under output/downloads/ and mark corrupt ones "
+                             "for re-download (with --download-pending: fetch them now)")
+    parser.add_argument("--download-policy", type=str, default=None,
+                        help="JSON file: include/exclude/priority doc_name patterns, max_per_file")
+    parser.add_argument("--download-include", nargs="+", default=[], metavar="PATTERN",
+                        help="Only download documents whose name matches (regex, case-insensitive)")
+    parser.add_argument("--download-exclude", nargs="+", default=[], metavar="PATTERN",
+                        help="Never download documents whose name matches")
+    parser.add_argument("--download-priority", nargs="+", default=[], metavar="PATTERN",
+                        help="Download matching documents first, in this order")
+    parser.add_argument("--max-docs-per-file", type=int, default=None,
+                        help="Download at most N documents per file (highest priority first)")
+    parser.add_argument("--no-governor", action="store_true",
+                        help="Never close stray viewer tabs or restart Chrome "
+                             "(ignores --max-browser-mb, --max-tabs and --restart-every)")
+    parser.add_argument("--max-browser-mb", type=float, default=2048,
+                        help="Restart Chrome between work units when its processes use more "
+                             "than this much memory, as PSS (0 = no limit)")
+    parser.add_argument("--max-tabs", type=int, default=4,
+                        help="Restart Chrome when more tabs than this stay open after "
+                             "closing strays (0 = no limit)")
+    parser.add_argument("--restart-every", type=int, default=0, metavar="N",
+                        help="Restart Chrome after every N deep-scraped files (0 = never)")
+    parser.add_argument("--write-queue", type=int, default=8,
+                        help="Max downloaded PDFs waiting for disk before fetching pauses")
+    parser.add_argument("--fsync-every", type=int, default=0, metavar="N",
+                        help="fsync each downloaded PDF, and their folders in batches "
+                             "of N files (0 = off)")
     parser.add_argument("--limit", type=int, default=0,
                         help="Limit to N files for deep scrape (0=all)")
     parser.add_argument("--profile", type=str, default=None,
                         help="Browser profile directory (default: .browser_profile/)")
     parser.add_argument("--delay", type=float, default=1.0)
+    parser.add_argument("--block-resources", action="store_true",
+                        help="Block images, fonts, stylesheets and analytics (CDP)")
+    parser.add_argument("--bench-resources", type=int, default=0, metavar="N",
+                        help="file_info: compare load time/bytes of N File History "
+                             "pages with and without --block-resources, then exit")
+    parser.add_argument("--bench-memory", type=int, default=0, metavar="N",
+                        help="Compare memory of N synthetic search rows (and N/10 cases) "
+                             "as dicts vs slotted records, then exit")
+    parser.add_argument("--capture-responses", action="store_true",
+                        help="Parse results/File History HTML from the network response "
+                             "body instead of waiting for the rendered DOM")
+    parser.add_argument("--rpm", type=float, default=None,
+                        help="Requests-per-minute ceiling per host (default: 60 / --delay)")
     parser.add_argument("--output", type=str, default="results")
+    parser.add_argument("--events", type=str, default=None,
+                        help="Write structured JSON-lines run events to this file")
+    parser.add_argument("--progress-every", type=float, default=30.0,
+                        help="Seconds between live progress/ETA log lines")
+    parser.add_argument("--max-retries", type=int, default=3,
+                        help="Attempts per chunk/file/document before dead-lettering")
+    parser.add_argument("--dead-letter", type=str, default=None,
+                        help="Dead-letter file (default: output/dead_letter.jsonl)")
+    parser.add_argument("--retry-failed", action="store_true",
+                        help="Replay the dead-letter queue instead of searching")
+    parser.add_argument("--download-pending", action="store_true",
+                        help="Download the documents recorded in the --output results but "
+                             "not yet fetched (no search)")
+    parser.add_argument("--serve", action="store_true",
+                        help="Run as a daemon: keep --pool-size warm sessions and "
+                             "accept JSON-line jobs on --socket")
+    parser.add_argument("--via-daemon", action="store_true",
+                        help="Send this search to a running --serve daemon instead "
+                             "of launching Chrome")
+    parser.add_argument("--socket", type=str, default=str(DEFAULT_SOCKET),
+                        help="Daemon Unix socket (default: output/scraper.sock)")
+    parser.add_argument("--pool-size", type=int, default=1,
+                        help="--serve: number of warm browser sessions")
+    parser.add_argument("--keepalive", type=float, default=300.0,
+                        help="--serve: seconds between idle session revalidations")
+    parser.add_argument("--http", type=int, default=0, metavar="PORT",
+                        help="--serve: also expose the HTTP lookup API on this port")
+    parser.add_argument("--http-host", type=str, default="127.0.0.1")
+    parser.add_argument("--cache-size", type=int, default=1024,
+                        help="--http: file histories kept in the lookup cache")
+    parser.add_argument("--cache-ttl", type=float, default=900.0,
+                        help="--http: seconds a cached file history stays fresh")
+    parser.add_argument("--record", type=str, default=None, metavar="ARCHIVE",
+                        help="Record the site's responses and downloaded PDFs to this "
+                             "SQLite archive")
+    parser.add_argument("--replay", type=str, default=None, metavar="ARCHIVE",
+                        help="Serve the site and PDFs from a --record archive instead of "
+                             "the network")
+    parser.add_argument("--replay-latency", choices=("recorded", "zero"), default="recorded",
+                        help="--replay: wait each response's recorded time, or not at all")
+    parser.add_argument("--bench-replay", action="store_true",
+                        help="With --replay: run the search at zero latency, print a "
+                             "throughput report and save nothing")
+    parser.add_argument("--profile-cpu", nargs="?", const=str(OUTPUT_DIR / "profile.pstats"),
+                        default=None, metavar="PATH",
+                        help="Profile the run with cProfile and save the stats "
+                             "(default: output/profile.pstats)")
+    parser.add_argument("--profile-mem", nargs="?", type=int, const=10, default=0, metavar="N",
+                        help="Trace allocations and log the top N growing source lines "
+                             "after each chunk (default N: 10)")
+    parser.add_argument("--debug-loop", nargs="?", type=float, const=0.1, default=0.0,
+                        metavar="SECONDS",
+                        help="asyncio debug mode: warn when a callback blocks the event "
+                             "loop longer than SECONDS (default: 0.1)")
+    return parser
 
-    args = parser.parse_args()
 
-    if args.download and not args.deep:
+async def main():
+    parser = build_parser()
+    args = parser.parse_args()
+    profiler = RunProfiler(args.profile_cpu, args.profile_mem, args.debug_loop)
+    profiler.start()
+    await asyncio.sleep(0)  # debug mode only times loop steps that start after it
+    try:
+        await run(args, parser, profiler)
+    finally:
+        profiler.stop()
+
+
+async def run(args, parser, profiler: RunProfiler):
+    if args.bench_memory:
+        print(json.dumps(bench_record_memory(args.bench_memory), indent=2))
+        return
+    if args.verify_downloads and not args.download_pending:
+        search_results, cases = load_results(args.output) or ([], [])
+        if verify_pdf_files(OUTPUT_DIR / "downloads", cases) and cases:
+            save_results(search_results, cases, args.output)
+        return
+    if not (args.retry_failed or args.serve or args.download_pending) and not (
+            args.search_type and (args.courts or args.file_numbers_from)):
+        parser.error("--search-type and --courts are required")
+    if args.download and not args.deep and not args.retry_failed:
         parser.error("--download requires --deep")
+    if args.crawl_related and not args.deep:
+        parser.error("--crawl-related requires --deep")
+    if args.change_feed and not (args.deep or args.retry_failed):
+        parser.error("--change-feed requires --deep")
+    if args.bench_replay and not args.replay:
+        parser.error("--bench-replay requires --replay")
+    if (args.record or args.replay) and (args.block_resources or args.serve
+                                          or (args.record and args.replay)):
+        parser.error("--record/--replay can't be combined with each other, "
+                     "--block-resources or --serve")
+    if args.courts and [c.lower() for c in args.courts] == ["all"]:
+        args.courts = list(COURTS)
+    if args.proceedings and [p.lower() for p in args.proceedings] == ["all"]:
+        args.proceedings = list(PROCEEDINGS)
+    elif not args.proceedings:
+        args.proceedings = [args.proceeding] if args.proceeding else []
+    for p in args.proceedings:
+        if p not in PROCEEDINGS:
+            log.warning("Proceeding %r is not in PROCEEDINGS — check the spelling", p)
+
+    if args.via_daemon:
+        jobs = jobs_from_args(args)
+        for job in jobs:
+            try:
+                job_unit(job)
+            except ValueError as e:
+                parser.error(str(e))
+        replies = await asyncio.gather(*(submit_job(job, args.socket) for job in jobs))
+        search_results, cases = [], []
+        for job, reply in zip(jobs, replies):
+            if not reply["ok"]:
+                log.error("Job %s failed: %s", unit_label(job_unit(job)), reply["error"])
+                continue
+            search_results.extend(SearchRow.from_dict(r) for r in reply["search_results"])
+            cases.extend(Case.from_row(c) for c in reply["cases"])
+        save_results(search_results, cases, args.output)
+        log.info("Done via daemon. %d search results, %d cases",
+                 len(search_results), len(cases))
+        return
+
+    events = EventLog(args.events)
+    events.emit("run_started", argv=vars(args))
+    if args.serve:
+        if await socket_in_use(args.socket):
+            parser.error(f"a job daemon is already serving on {args.socket}")
+        pool = ScraperPool(
+            args.pool_size, keepalive=args.keepalive,
+            headless=args.headless, request_delay=args.delay,
+            profile_dir=args.profile, events=events, rpm=args.rpm,
+            block_resources=args.block_resources,
+            capture_responses=args.capture_responses,
+        )
+        service = LookupService(pool, args.cache_size, args.cache_ttl)
+        try:
+            await pool.start()
+            for m in pool.members:
+                m.profiler = profiler
+                m.governor = governor_from_args(args)
+                m.limit = args.limit
+                m.retry.max_attempts = args.max_retries
+                if args.dead_letter:
+                    m.dead_letter = DeadLetterQueue(args.dead_letter)
+            servers = [serve_jobs(pool, args.socket)]
+            if args.http:
+                servers.append(service.serve(args.http_host, args.http))
+            await asyncio.gather(*servers)
+        finally:
+            if args.http:
+                log.info("HTTP metrics: %s", json.dumps(service.metrics()))
+            await pool.stop()
+            events.close()
+        return
 
     async with WebSurrogateScraper(
         headless=args.headless,
         request_delay=args.delay,
         download=args.download,
         profile_dir=args.profile,
+        events=events,
+        rpm=args.rpm,
+        block_resources=args.block_resources,
+        capture_responses=args.capture_responses,
+        record=args.record,
+        replay=args.replay,
+        replay_latency="zero" if args.bench_replay else args.replay_latency,
     ) as s:
+        bench_t0 = time.monotonic()  # after launch + authentication
         s.limit = args.limit
+        s.writer = DiskWriter(args.write_queue, args.fsync_every)
+        s.profiler = profiler
+        s.governor = governor_from_args(args)
+        if args.bench_replay:  # keep the real output and dead-letter files untouched
+            s.download_dir = OUTPUT_DIR / "bench_downloads"
+            s.dead_letter = DeadLetterQueue(OUTPUT_DIR / "bench_dead_letter.jsonl")
+        s.progress.report_every = args.progress_every
+        s.retry.max_attempts = args.max_retries
+        if args.dead_letter and not args.bench_replay:
+            s.dead_letter = DeadLetterQueue(args.dead_letter)
+        if args.file_index:
+            s.use_file_index(args.file_index)
+        if args.change_feed and not args.bench_replay:
+            s.change_feed = ChangeFeed(args.change_feed, args.case_store)
+            if seeded := s.change_feed.seed(OUTPUT_DIR / f"{args.output}.json"):
+                log.info("Change feed: seeded %d file(s) from output/%s.json",
+                         seeded, args.output)
+        if (args.download_policy or args.download_include or args.download_exclude
+                or args.download_priority or args.max_docs_per_file is not None):
+            policy = (DownloadPolicy.from_file(args.download_policy) if args.download_policy
+                      else DownloadPolicy())
+            policy.include += [re.compile(p, re.I) for p in args.download_include]
+            policy.exclude += [re.compile(p, re.I) for p in args.download_exclude]
+            policy.priority += [re.compile(p, re.I) for p in args.download_priority]
+            if args.max_docs_per_file is not None:
+                policy.max_per_file = args.max_docs_per_file
+            s.download_policy = policy
 
         st = args.search_type
         deep = args.deep
         courts = args.courts
 
-        if st == "name_person":
-            if not args.last_name:
-                parser.error("--last-name required")
-            for c in courts:
-                await s.name_search_person(
-                    c, args.last_name, args.first_name,
-                    args.death_from_date, args.death_to_date, deep=deep,
-                )
+        if args.bench_resources:
+            if st != "file_info" or not args.proceedings or not args.from_date:
+                parser.error("--bench-resources needs a file_info search")
+            report = await s.bench_resource_filter(
+                courts[0], args.proceedings[0],
+                date.fromisoformat(args.from_date).strftime("%m/%d/%Y"),
+                date.fromisoformat(args.to_date or args.from_date).strftime("%m/%d/%Y"),
+                files=args.bench_resources,
+            )
+            print(json.dumps(report, indent=2))
+            return
 
-        elif st == "name_org":
-            if not args.organization:
-                parser.error("--organization required")
-            for c in courts:
-                await s.name_search_organization(
-                    c, args.organization, args.file_from_date,
-                    args.file_to_date, deep=deep,
+        aborted = False
+        try:
+            if args.retry_failed:
+                s.load_previous(args.output)
+                await s.retry_failed()
+
+            elif args.download_pending:
+                if not s.load_previous(args.output):
+                    parser.error(f"no cases in output/{args.output}.json to download from")
+                if args.verify_downloads:
+                    s.verify_downloads()
+                await s.download_pending()
+
+            elif st == "name_person":
+                if not args.last_name:
+                    parser.error("--last-name required")
+                for c in courts:
+                    await s.name_search_person(
+                        c, args.last_name, args.first_name,
+                        args.death_from_date, args.death_to_date, deep=deep,
+                    )
+
+            elif st == "name_org":
+                if not args.organization:
+                    parser.error("--organization required")
+                for c in courts:
+                    await s.name_search_organization(
+                        c, args.organization, args.file_from_date,
+                        args.file_to_date, deep=deep,
+                    )
+
+            elif st == "file_number" and args.file_numbers_from:
+                numbers = read_file_numbers(args.file_numbers_from, courts)
+                s.load_previous(args.output)
+                await s.batch_file_search_by_number(numbers, deep=deep, refresh=args.refresh)
+
+            elif st == "file_number":
+                if not args.file_number:
+                    parser.error("--file-number or --file-numbers-from required")
+                for c in courts:
+                    await s.file_search_by_number(c, args.file_number, deep=deep)
+
+            elif st == "index_book":
+                letters = list(args.letters.upper()) if args.letters else INDEX_BOOK_LETTERS
+                await s.bulk_index_search(
+                    st, courts, [{"letter": letter} for letter in letters], deep=deep,
                 )
 
-        elif st == "file_number":
-            if not args.file_number:
-                parser.error("--file-number required")
-            for c in courts:
-                await s.file_search_by_number(c, args.file_number, deep=deep)
-
-        elif st == "file_info":
-            if not args.proceeding or not args.from_date:
-                parser.error("--proceeding and --from-date required")
-            to = args.to_date or args.from_date
-            await s.bulk_file_search_by_info(
-                courts, args.proceeding, args.from_date, to,
-                args.chunk_days, deep=deep,
-            )
+            elif st in ("old_index", "will"):
+                if not args.last_name:
+                    parser.error("--last-name required")
+                params = {"last_name": args.last_name, "first_name": args.first_name or ""}
+                if st == "will" and args.from_date:
+                    params["from_date"] = date.fromisoformat(args.from_date).strftime("%m/%d/%Y")
+                    params["to_date"] = date.fromisoformat(args.to_date or args.from_date).strftime("%m/%d/%Y")
+                await s.bulk_index_search(st, courts, [params], deep=deep)
+
+            elif st == "file_info":
+                if not args.proceedings or not (args.from_date or args.since_last_run):
+                    parser.error("--proceeding/--proceedings and --from-date "
+                                 "(or --since-last-run) required")
+                to = args.to_date or (None if args.since_last_run else args.from_date)
+                s.watermarks = watermarks_from_args(args)
+                await s.bulk_file_search_by_info(
+                    courts, args.proceedings, args.from_date, to,
+                    args.chunk_days, deep=deep,
+                    since_last_run=args.since_last_run, overlap_days=args.overlap_days,
+                )
 
+            if args.crawl_related:
+                crawler = RelatedFilesCrawler(
+                    args.crawl_visited or OUTPUT_DIR / "crawl_visited.json",
+                    max_depth=args.crawl_depth,
+                )
+                try:
+                    await s.crawl_related(crawler, max_files=args.crawl_max_files)
+                finally:
+                    OUTPUT_DIR.mkdir(exist_ok=True)
+                    crawler.save(OUTPUT_DIR / f"{args.output}_edges.csv")
+        except BrowserLost as e:
+            log.error("Run aborted: %s — saving what was scraped", e)
+            aborted = True
+
+        if args.bench_replay:
+            await s.writer.close()
+            p, wall = s.progress, time.monotonic() - bench_t0
+            print(json.dumps({
+                "archive": args.replay,
+                "wall_s": round(wall, 2),
+                "units": p.units_done,
+                "files": p.files_done,
+                "docs": p.docs_downloaded,
+                "mb": round(p.bytes_downloaded / 1_048_576, 2),
+                "units_per_min": round(p.units_done / wall * 60, 2),
+                "files_per_min": round(p.files_done / wall * 60, 2),
+                "mb_per_min": round(p.bytes_downloaded / 1_048_576 / wall * 60, 2),
+                "search_s_per_unit": round((p.unit_time - p.file_time) / max(p.units_done, 1), 3),
+                "s_per_file": round(p.file_time / max(p.files_done, 1), 3),
+                "replayed": s.replayer.served,
+                "missed": s.replayer.missed,
+            }, indent=2))
+            return
         s.save(args.output)
         log.info("Done. %d search results, %d cases, %d documents",
                  len(s.search_results), len(s.cases), len(s.documents))
+        s.progress.maybe_report(force=True)
+        log.info("Session: %s", s.session.summary())
+        log.info("Time to parseable HTML: %s", s.parse_timing_summary())
+        if s.writer.files:
+            log.info("Disk writer: %s", s.writer.summary())
+        for archive in (s.recorder, s.replayer):
+            if archive:
+                log.info("Archive: %s", archive.summary())
+        if s.change_feed:
+            log.info("Change feed: %d change(s) in %d file(s) -> %s", s.change_feed.changes,
+                     s.change_feed.files_changed, s.change_feed.feed_path)
+        if s.governor and (s.governor.restarts or s.governor.orphans_closed):
+            log.info("Browser governor: %s", s.governor.summary())
+        if s.download_policy and s.download_policy.considered:
+            report = s.download_policy.summary()
+            log.info("Download policy: skipped %d of %d documents — est. %.1f MB and "
+                     "%.1f min saved vs downloading all", report["skipped"],
+                     report["considered"], report["est_mb_saved"], report["est_min_saved"])
+            events.emit("download_policy", **report)
+        events.emit("run_finished", **s.progress.snapshot())
+    events.close()
+    if aborted:
+        raise SystemExit(1)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,66 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import scraper  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def output_dir(tmp_path, monkeypatch):
+    """Keep every test's output/ (session stats, dead letters…) in tmp_path."""
+    out = tmp_path / "output"
+    monkeypatch.setattr(scraper, "OUTPUT_DIR", out)
+    return out
+
+
+class FakePage:
+    """Stands in for a nodriver tab: serves `html` and records evaluated JS."""
+
+    def __init__(self, html: str = "<html></html>", url: str = scraper.BASE):
+        self.html = html
+        self.url = url
+        self.scripts: list[str] = []
+        self.results: dict[str, object] = {}  # JS substring -> return value
+
+    async def evaluate(self, js, **kwargs):
+        self.scripts.append(js)
+        if js == scraper.JS_GET_HTML:
+            return self.html
+        if js == "window.location.href":
+            return self.url
+        for needle, value in self.results.items():
+            if needle in js:
+                return value(js) if callable(value) else value
+        if "__wsMark !==" in js:
+            return "true"
+        return None
+
+
+class FakeBrowser:
+    def __init__(self, page: FakePage):
+        self.page = page
+        self.main_tab = page
+        self.tabs = [page]
+        self.visits: list[str] = []
+
+    async def get(self, url, **kwargs):
+        self.visits.append(url)
+        return self.page
+
+
+@pytest.fixture
+def page():
+    return FakePage()
+
+
+@pytest.fixture
+def s(page, tmp_path):
+    """A scraper wired to a FakePage, without launching Chrome."""
+    sc = scraper.WebSurrogateScraper(profile_dir=tmp_path / "profile")
+    sc._page = page
+    sc._browser = FakeBrowser(page)
+    sc.governor = None
+    return sc
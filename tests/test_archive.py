@@ -0,0 +1,84 @@
+import asyncio
+from types import SimpleNamespace
+
+import scraper
+
+
+class FakeTab:
+    def __init__(self, body=("", False)):
+        self.body = body
+
+    async def send(self, cmd):
+        return self.body
+
+
+def paused(method="GET", url=scraper.BASE + "/", post_data=None, status=None, rid="r1"):
+    return SimpleNamespace(
+        request_id=rid, response_status_code=status, response_error_reason=None,
+        response_headers=[SimpleNamespace(name="Content-Type", value="text/html")],
+        request=SimpleNamespace(method=method, url=url, post_data=post_data))
+
+
+def test_request_key_ignores_volatile_fields_and_field_order():
+    a = scraper.request_key("post", "https://x/s", "b=2&__VIEWSTATE=abc&a=1")
+    b = scraper.request_key("POST", "https://x/s", "a=1&b=2&__VIEWSTATE=xyz")
+    assert a == b == "POST https://x/s\na=1&b=2"
+    assert scraper.request_key("GET", "https://x/s") == "GET https://x/s"
+
+
+def test_recorder_stores_responses_and_always_continues(tmp_path, monkeypatch):
+    calls = []
+    monkeypatch.setattr(scraper.uc.cdp.fetch, "continue_request",
+                        lambda request_id: calls.append(("continue", request_id)))
+    rec = scraper.ArchiveRecorder(tmp_path / "a.db")
+    tab = FakeTab(body=("<html>ok</html>", False))
+    asyncio.run(rec._on_paused(paused(), tab))
+    asyncio.run(rec._on_paused(paused(status=200), tab))
+    assert rec.responses == 1
+    row = rec.db.execute("SELECT key, status, body FROM responses").fetchone()
+    assert row == ("GET " + scraper.BASE + "/", 200, b"<html>ok</html>")
+
+    tab.body = None  # get_response_body returns garbage: the request still continues
+    asyncio.run(rec._on_paused(paused(status=200, rid="r2"), tab))
+    assert rec.responses == 1
+    assert calls == [("continue", "r1"), ("continue", "r1"), ("continue", "r2")]
+    rec.close()
+
+
+def record(path, *responses):
+    rec = scraper.ArchiveRecorder(path)
+    for key, body in responses:
+        rec.db.execute("INSERT INTO responses (key, url, status, headers, body, elapsed) "
+                       "VALUES (?, ?, 200, '[]', ?, 0)", (key, key.split(" ")[1], body))
+    rec.close()
+
+
+def test_replayer_serves_in_order_and_falls_back_only_for_get(tmp_path):
+    url = scraper.BASE + "/Search"
+    post = scraper.request_key("POST", url, "a=1")
+    record(tmp_path / "a.db", (f"GET {url}", b"g1"), (post, b"p1"), (post, b"p2"))
+    rep = scraper.ArchiveReplayer(tmp_path / "a.db", latency="zero")
+    body = lambda rid: rep.db.execute("SELECT body FROM responses WHERE id = ?",
+                                      (rid,)).fetchone()[0]
+    assert [body(rep._lookup(post)) for _ in range(3)] == [b"p1", b"p2", b"p2"]
+    assert body(rep._lookup(f"GET {url}\nq=1")) == b"g1"
+    assert rep._lookup(scraper.request_key("POST", url, "a=2")) is None
+    rep.close()
+
+
+def test_replayer_fails_a_request_it_cannot_fulfil(tmp_path, monkeypatch):
+    calls = []
+    monkeypatch.setattr(scraper.uc.cdp.fetch, "fail_request",
+                        lambda request_id, error_reason: calls.append(("fail", request_id)))
+    monkeypatch.setattr(scraper.uc.cdp.fetch, "fulfill_request",
+                        lambda **kw: calls.append(("fulfill", kw["request_id"])))
+    url = scraper.BASE + "/"
+    record(tmp_path / "a.db", (f"GET {url}", b"hi"))
+    rep = scraper.ArchiveReplayer(tmp_path / "a.db", latency="zero")
+    tab = FakeTab()
+    asyncio.run(rep._on_paused(paused(url=url, rid="hit"), tab))
+    asyncio.run(rep._on_paused(paused(url=scraper.BASE + "/other", rid="miss"), tab))
+    rep.db.close()  # reading the row fails: the request must not hang
+    asyncio.run(rep._on_paused(paused(url=url, rid="broken"), tab))
+    assert calls == [("fulfill", "hit"), ("fail", "miss"), ("fail", "broken")]
+    assert (rep.served, rep.missed) == (1, 1)
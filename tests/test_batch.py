@@ -0,0 +1,67 @@
+import asyncio
+
+import scraper
+
+
+def test_read_file_numbers_txt_and_csv(tmp_path):
+    txt = tmp_path / "nums.txt"
+    txt.write_text("# header\n2020-1\nBronx,2020-2\n\n2020-1\n")
+    assert scraper.read_file_numbers(txt, ["Albany"]) == [
+        ("Albany", "2020-1"), ("Bronx", "2020-2")]
+    csv_ = tmp_path / "nums.csv"
+    csv_.write_text("court,file_number\nBronx,1\n,2\nNowhere,3\n")
+    assert scraper.read_file_numbers(csv_, ["Albany", "Bronx"]) == [
+        ("Bronx", "1"), ("Albany", "2"), ("Bronx", "2")]
+
+
+def rows(*nums):
+    return [scraper.SearchRow(btn_value=f"b{n}", file_num=n) for n in nums]
+
+
+def wire(s, monkeypatch, results):
+    """Fake the site: file_search_by_number returns results[num]; each
+    scrape stores a case; every history.back() is counted."""
+    backs = []
+
+    async def search(court, num, deep=False, skip=None, reuse_form=False):
+        return results[num]
+
+    async def scrape(row, court):
+        s._store_case(scraper.Case(court, row.file_num, judge="NEW"))
+        s._skip_files(court).add(row.file_num)
+
+    async def back():
+        backs.append(1)
+
+    monkeypatch.setattr(s, "file_search_by_number", search)
+    monkeypatch.setattr(s, "_scrape_file", scrape)
+    monkeypatch.setattr(s, "_history_back", back)
+    return backs
+
+
+def test_deep_scrape_reports_open_file_history(s, monkeypatch):
+    backs = wire(s, monkeypatch, {})
+    assert asyncio.run(s._deep_scrape(rows("1", "2"), "Albany")) is True
+    assert len(backs) == 1
+    # Last row already done: the scraper went back after "3"
+    assert asyncio.run(s._deep_scrape(rows("3", "1"), "Albany")) is False
+    assert len(backs) == 2
+
+
+def test_batch_goes_back_only_from_a_file_history_page(s, monkeypatch):
+    s._skip_files("Albany").add("1")
+    backs = wire(s, monkeypatch, {"1": rows("1"), "2": rows("2", "1"), "3": []})
+    # "1" is filtered up front; the rows of "2" end on an already-done file
+    asyncio.run(s.batch_file_search_by_number(
+        [("Albany", "1"), ("Albany", "2"), ("Albany", "3")], deep=True))
+    assert [c.file_number for c in s.cases] == ["2"]
+    assert len(backs) == 1  # between "2" and "1" only
+
+
+def test_refresh_rescrapes_listed_files_and_keeps_the_rest(s, monkeypatch):
+    s.cases = [scraper.Case("Albany", "1"), scraper.Case("Albany", "9")]
+    s._skip_files("Albany").update({"1", "9"})
+    backs = wire(s, monkeypatch, {"1": rows("1")})
+    asyncio.run(s.batch_file_search_by_number([("Albany", "1")], deep=True, refresh=True))
+    assert [(c.file_number, c.judge) for c in s.cases] == [("1", "NEW"), ("9", "")]
+    assert len(backs) == 1
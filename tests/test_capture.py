@@ -0,0 +1,73 @@
+import asyncio
+import base64
+from types import SimpleNamespace
+
+import pytest
+
+import scraper
+
+
+@pytest.fixture
+def pending(s, page, monkeypatch):
+    """A captured navigation whose live DOM has not loaded yet: the page
+    serves the outgoing document until _wait_for_ready runs."""
+    s._dom_pending = True
+    page.url = "https://outgoing"
+    settled = []
+
+    async def wait_for_ready(timeout=10.0, poll=0.25):
+        settled.append(len(page.scripts))
+        page.url = "https://landed"
+        return page.html
+
+    monkeypatch.setattr(s, "_wait_for_ready", wait_for_ready)
+    return settled
+
+
+def test_form_setters_settle_first(s, page, pending):
+    asyncio.run(s._set_select("CourtSelect", "1"))
+    assert pending == [0] and not s._dom_pending
+    s._dom_pending = True
+    asyncio.run(s._set_input("FileNumber", "2020-1"))
+    assert pending == [0, 1]
+    s._dom_pending = True
+    page.results["function(cands"] = "LastName"
+    asyncio.run(s._set_field(["LastName"], "DOE"))
+    assert pending == [0, 1, 2]
+
+
+def test_reused_form_is_read_from_the_landed_page(s, page, pending):
+    assert asyncio.run(s._file_form_state()) == {}
+    assert pending == [0]
+
+
+def test_file_history_url_is_read_after_settling(s, page, pending, monkeypatch):
+    async def click(btn_value):
+        return "<html></html>"
+
+    monkeypatch.setattr(s, "_click_file_number", click)
+    asyncio.run(s._scrape_file(scraper.SearchRow(btn_value="b", file_num="1"), "Albany"))
+    assert s.cases[0].file_history_url == "https://landed"
+
+
+def test_capture_resolves_with_main_frame_document():
+    cap = scraper.ResponseCapture()
+    tab = SimpleNamespace(target=SimpleNamespace(target_id="main"))
+
+    async def send(cmd):
+        return base64.b64encode(b"<html>hi</html>").decode(), True
+
+    tab.send = send
+
+    async def run():
+        waiter = cap.arm()
+        doc = scraper.uc.cdp.network.ResourceType.DOCUMENT
+        cap._on_response(SimpleNamespace(type_=doc, frame_id="sub", request_id="a"), tab)
+        cap._on_response(SimpleNamespace(type_=doc, frame_id="main", request_id="b"), tab)
+        await cap._on_finished(SimpleNamespace(request_id="a"), tab)
+        assert not waiter.done()
+        await cap._on_finished(SimpleNamespace(request_id="b"), tab)
+        return await waiter
+
+    assert asyncio.run(run()) == "<html>hi</html>"
+    assert cap.captured == 1
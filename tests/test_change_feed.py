@@ -0,0 +1,71 @@
+import json
+
+import scraper
+
+
+def case(**kw):
+    base = dict(court="Kings", file_number="2025-1", file_name="DOE, JOHN", estate_closed="N",
+                documents=[scraper.Document("PETITION", uuid="u1", has_link=True),
+                           scraper.Document("CLERK DUE SLIP", doc_filed="01/02/2025")],
+                parties=[scraper.Party("DOE, JANE", "Petitioner")],
+                related_files=["2020-9"])
+    base.update(kw)
+    return scraper.Case(**base)
+
+
+def kinds(changes):
+    return [c["change"] for c in changes]
+
+
+def test_unchanged_case_has_no_changes():
+    assert scraper.diff_cases(case(), case()) == []
+    assert kinds(scraper.diff_cases(None, case())) == ["case_added"]
+
+
+def test_diff_reports_fields_documents_parties_and_related_files():
+    new = case(estate_closed="Y", file_history_url="https://elsewhere",
+               documents=[scraper.Document("PETITION", uuid="u1", has_link=True, qty="2"),
+                          scraper.Document("DECREE", uuid="u2", has_link=True)],
+               parties=[scraper.Party("DOE, JANE", "Petitioner", appointed="03/01/2025"),
+                        scraper.Party("DOE, JIM", "Distributee")],
+               related_files=["2025-7"])
+    changes = scraper.diff_cases(case(), new)
+    assert kinds(changes) == ["field", "document_changed", "document_added", "document_removed",
+                              "party_changed", "party_added", "related_added",
+                              "related_removed"]
+    assert changes[0] == {"change": "field", "field": "estate_closed", "old": "N", "new": "Y"}
+    assert changes[1]["fields"] == {"qty": ["", "2"]}
+    assert changes[3]["document"]["doc_name"] == "CLERK DUE SLIP"
+
+
+def test_download_state_is_not_a_change():
+    new = case(documents=[scraper.Document("PETITION", uuid="u1", has_link=True,
+                                           downloaded=True, local_path="a.pdf"),
+                          scraper.Document("CLERK DUE SLIP", doc_filed="01/02/2025")])
+    assert scraper.diff_cases(case(), new) == []
+
+
+def test_feed_appends_changes_and_keeps_the_latest_version(tmp_path):
+    feed = scraper.ChangeFeed(tmp_path / "changes.jsonl", tmp_path / "cases.db")
+    assert kinds(feed.record(case())) == ["case_added"]
+    assert feed.record(case()) == []
+    assert kinds(feed.record(case(estate_closed="Y"))) == ["field"]
+    assert feed.previous("Kings", "2025-1").estate_closed == "Y"
+    feed.close()
+    lines = [json.loads(l) for l in (tmp_path / "changes.jsonl").read_text().splitlines()]
+    assert [(l["file_number"], l["change"]) for l in lines] == [
+        ("2025-1", "case_added"), ("2025-1", "field")]
+    assert (feed.files_changed, feed.changes) == (2, 2)
+
+
+def test_seed_fills_only_files_the_store_lacks(tmp_path):
+    results = tmp_path / "results.json"
+    results.write_text(json.dumps({"cases": [
+        case().to_row(), case(file_number="2025-2", estate_closed="Y").to_row()]}))
+    feed = scraper.ChangeFeed(tmp_path / "changes.jsonl", tmp_path / "cases.db")
+    feed.record(case(file_number="2025-2"))
+    assert feed.seed(results) == 1
+    assert feed.seed(tmp_path / "missing.json") == 0
+    assert feed.previous("Kings", "2025-2").estate_closed == "N"  # the store's row wins
+    assert kinds(feed.record(case(estate_closed="Y"))) == ["field"]  # not case_added
+    feed.close()
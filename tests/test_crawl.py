@@ -0,0 +1,51 @@
+import asyncio
+
+import scraper
+
+
+def test_frontier_is_depth_ordered_and_capped():
+    c = scraper.RelatedFilesCrawler(max_depth=2, max_frontier=3)
+    c.add_edges("Albany", "1", ["2", "3", "1"], 1)
+    c.add_edges("Albany", "0", ["4"], 0)
+    c.add_edges("Albany", "2", ["5"], 2)  # too deep
+    c.push("Albany", "6", 2)
+    assert c.dropped == 1 and len(c) == 3
+    assert [c.pop()[1] for _ in range(3)] == ["4", "2", "3"]
+    assert c.pop() is None
+    assert len(c.edges) == 4
+
+
+def test_visited_files_are_not_queued_and_persist(tmp_path):
+    path = tmp_path / "visited.json"
+    c = scraper.RelatedFilesCrawler(path)
+    c.visit("Albany", "1")
+    c.push("Albany", "1", 1)
+    assert c.pop() is None
+    c.save()
+    assert scraper.RelatedFilesCrawler(path).visited == {"Albany|1"}
+
+
+def test_failed_files_are_not_persisted_as_visited(s, monkeypatch, tmp_path):
+    s.cases = [scraper.Case("Albany", "1", related_files=["2", "3"])]
+    s._skip_files("Albany").add("1")
+    found = {"3": [scraper.SearchRow(btn_value="b3", file_num="3")]}
+
+    async def search(court, num, deep=False, skip=None, reuse_form=False):
+        if num == "2":
+            raise RuntimeError("File 2 not found")
+        return found[num]
+
+    async def scrape(row, court):
+        s._store_case(scraper.Case(court, row.file_num))
+        s._skip_files(court).add(row.file_num)
+
+    async def noop(*args):
+        pass
+
+    monkeypatch.setattr(s, "file_search_by_number", search)
+    monkeypatch.setattr(s, "_scrape_file", scrape)
+    monkeypatch.setattr(s, "_history_back", noop)
+    monkeypatch.setattr(scraper.asyncio, "sleep", noop)
+    crawler = scraper.RelatedFilesCrawler(tmp_path / "visited.json")
+    asyncio.run(s.crawl_related(crawler))
+    assert crawler.visited == {"Albany|1", "Albany|3"}
@@ -0,0 +1,88 @@
+import asyncio
+import json
+
+import pytest
+
+import scraper
+
+
+async def noop(*args, **kwargs):
+    pass
+
+
+def test_socket_in_use(tmp_path):
+    path = tmp_path / "d.sock"
+
+    async def run():
+        assert not await scraper.socket_in_use(path)
+        server = await asyncio.start_unix_server(noop, path=str(path))
+        assert await scraper.socket_in_use(path)
+        server.close()
+        await server.wait_closed()
+        path.touch()  # stale file, nobody listening
+        assert not await scraper.socket_in_use(path)
+
+    asyncio.run(run())
+
+
+def test_serve_jobs_refuses_a_live_socket(tmp_path):
+    path = tmp_path / "d.sock"
+
+    async def run():
+        server = await asyncio.start_unix_server(noop, path=str(path))
+        try:
+            with pytest.raises(RuntimeError, match="already serving"):
+                await scraper.serve_jobs(scraper.ScraperPool(), path)
+            assert path.exists()
+        finally:
+            server.close()
+
+    asyncio.run(run())
+
+
+def test_run_job_starts_from_a_clean_slate(s, monkeypatch):
+    s._file_failures[("Albany", "1")] = 2
+    s._dead_files.add(("Albany", "1"))
+    s._skip_files("Albany").add("1")
+    monkeypatch.setattr(s, "_run_bulk_unit", noop)
+    out = asyncio.run(s.run_job({"court": "Albany", "search_type": "file_number",
+                                 "file_number": "1"}))
+    assert out == {"search_results": [], "cases": []}
+    assert not s._file_failures and not s._dead_files and not s._done
+
+
+def test_pool_members_keep_their_own_session_stats(tmp_path, monkeypatch, output_dir):
+    monkeypatch.setattr(scraper.WebSurrogateScraper, "__aenter__", noop)
+    monkeypatch.setattr(scraper.WebSurrogateScraper, "__aexit__", noop)
+    pool = scraper.ScraperPool(3, profile_dir=tmp_path / "profile")
+
+    async def run():
+        await pool.start()
+        await pool.stop()
+
+    asyncio.run(run())
+    paths = [m.session.stats_path for m in pool.members]
+    assert paths == [output_dir / "session_stats.json", output_dir / "session_stats-1.json",
+                     output_dir / "session_stats-2.json"]
+    assert len({id(m.rate_limiter) for m in pool.members}) == 1
+
+
+def test_via_daemon_saves_replies_without_a_scraper(monkeypatch, output_dir):
+    async def submit_job(job, socket_path):
+        if job["court"] == "Bronx":
+            return {"ok": False, "error": "boom"}
+        return {"ok": True, "search_results": [],
+                "cases": [scraper.Case(job["court"], job["file_number"]).to_row()]}
+
+    def no_scraper(*args, **kwargs):
+        raise AssertionError("--via-daemon must not create a scraper")
+
+    monkeypatch.setattr(scraper, "submit_job", submit_job)
+    monkeypatch.setattr(scraper, "WebSurrogateScraper", no_scraper)
+    parser = scraper.build_parser()
+    args = parser.parse_args(["--search-type", "file_number", "--courts", "Kings", "Bronx",
+                              "--file-number", "2025-1", "--via-daemon", "--output", "d"])
+    asyncio.run(scraper.run(args, parser, scraper.RunProfiler()))
+    saved = json.loads((output_dir / "d.json").read_text())
+    assert [(c["court"], c["file_number"]) for c in saved["cases"]] == [("Kings", "2025-1")]
+    assert not (output_dir / "session_stats.json").exists()
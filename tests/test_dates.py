@@ -0,0 +1,28 @@
+import scraper
+
+
+def test_iso_date():
+    assert scraper.iso_date("01/17/2025") == "2025-01-17"
+    assert scraper.iso_date(" 1/7/2025 ") == "2025-01-07"
+    assert scraper.iso_date("02/30/2025") == ""
+    assert scraper.iso_date("") == scraper.iso_date("pending") == ""
+
+
+def test_name_key():
+    assert scraper.name_key("Smith ,John  A.") == "SMITH, JOHN A"
+    assert scraper.name_key("Ĉapek, Karel") == "CAPEK, KAREL"
+    assert scraper.name_key("O'Brien-Jones,  Mary") == "O'BRIEN-JONES, MARY"
+
+
+def test_download_paths_keep_the_existing_layout(s):
+    docs = [scraper.Document("WAIVER AND CONSENT", doc_filed="01/17/2025", uuid="a", has_link=True),
+            scraper.Document("WAIVER AND CONSENT", doc_filed="01/17/2025", uuid="b", has_link=True),
+            scraper.Document("NOTE", uuid="c"),
+            scraper.Document("WILL: COPY", doc_filed="1/7/2025", uuid="d", has_link=True)]
+    queue = s._plan_downloads(docs, "ABE J RIEDER")
+    folder = s.download_dir / "ABE J RIEDER"
+    assert queue == [
+        (0, "a", folder / "WAIVER AND CONSENT_01-17-2025.pdf"),
+        (1, "b", folder / "WAIVER AND CONSENT_01-17-2025_1.pdf"),
+        (3, "d", folder / "WILL COPY_1-7-2025.pdf"),
+    ]
@@ -0,0 +1,68 @@
+import asyncio
+
+import pytest
+
+import scraper
+
+
+def run_writer(writer, jobs):
+    async def run():
+        futs = [await writer.write(path, data) for path, data in jobs]
+        results = await asyncio.gather(*futs, return_exceptions=True)
+        await writer.close()
+        return results
+
+    return asyncio.run(run())
+
+
+def test_files_are_renamed_into_place(tmp_path):
+    w = scraper.DiskWriter(max_pending=2)
+    jobs = [(tmp_path / "a" / f"{i}.pdf", b"x" * i) for i in range(1, 5)]
+    assert run_writer(w, jobs) == [None] * 4
+    assert [p.read_bytes() for p, _ in jobs] == [d for _, d in jobs]
+    assert not list(tmp_path.rglob("*.part"))
+    assert (w.files, w.bytes) == (4, 10)
+
+
+def test_failed_write_leaves_no_part_file(tmp_path, monkeypatch):
+    def fail(src, dst):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(scraper.os, "replace", fail)
+    w = scraper.DiskWriter()
+    [err] = run_writer(w, [(tmp_path / "a.pdf", b"data")])
+    assert isinstance(err, OSError)
+    assert not list(tmp_path.iterdir())
+    assert w.files == 0
+
+
+def test_fsync_file_before_rename_and_batch_directories(tmp_path, monkeypatch):
+    events = []
+    real_replace, real_fsync = scraper.os.replace, scraper.os.fsync
+    monkeypatch.setattr(scraper.os, "replace",
+                        lambda a, b: (events.append("replace"), real_replace(a, b))[1])
+    monkeypatch.setattr(scraper.os, "fsync",
+                        lambda fd: (events.append("fsync"), real_fsync(fd))[1])
+    synced = []
+    monkeypatch.setattr(scraper.DiskWriter, "_sync",
+                        staticmethod(lambda dirs: synced.append(list(dirs))))
+    w = scraper.DiskWriter(fsync_every=2, workers=1)
+    run_writer(w, [(tmp_path / "a" / "1.pdf", b"1"), (tmp_path / "a" / "2.pdf", b"2"),
+                   (tmp_path / "b" / "3.pdf", b"3")])
+    assert events == ["fsync", "replace"] * 3
+    assert synced == [[tmp_path / "a", tmp_path / "a"], [tmp_path / "b"]]
+
+
+def test_sync_opens_each_directory_once(tmp_path, monkeypatch):
+    opened = []
+    real_open = scraper.os.open
+    monkeypatch.setattr(scraper.os, "open", lambda p, flags: (opened.append(p), real_open(p, flags))[1])
+    scraper.DiskWriter._sync([tmp_path, tmp_path, tmp_path])
+    assert opened == [tmp_path]
+
+
+@pytest.mark.parametrize("fsync_every", [0, 1])
+def test_summary(tmp_path, fsync_every):
+    w = scraper.DiskWriter(fsync_every=fsync_every)
+    run_writer(w, [(tmp_path / "a.pdf", b"x" * 1_048_576)])
+    assert w.summary().startswith("1 files, 1.0 MB")
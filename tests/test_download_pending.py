@@ -0,0 +1,62 @@
+import asyncio
+
+import scraper
+
+
+def test_download_pending_fetches_missing_and_unfetched_documents(s, monkeypatch, tmp_path):
+    kept = tmp_path / "kept.pdf"
+    kept.write_bytes(b"%PDF-1.4 %%EOF")
+    docs = [scraper.Document("KEPT", uuid="u0", has_link=True, downloaded=True, local_path=str(kept)),
+            scraper.Document("GONE", uuid="u1", has_link=True, downloaded=True,
+                             local_path=str(tmp_path / "gone.pdf")),
+            scraper.Document("NEW", uuid="u2", has_link=True),
+            scraper.Document("REMOVED", uuid="u3", has_link=True),
+            scraper.Document("UNLINKED")]
+    s.cases = [scraper.Case("Albany", "1", file_name="DOE", documents=docs),
+               scraper.Case("Albany", "2")]
+    opened, fetched = [], []
+
+    async def noop(*args, **kwargs):
+        pass
+
+    async def open_fh(court, file_num):
+        opened.append(file_num)
+        return "<html></html>"
+
+    async def download_docs(queue, documents, court, file_num):
+        fetched.extend(uuid for _, uuid, _ in queue)
+        for idx, _, path in queue:
+            documents[idx].downloaded, documents[idx].local_path = True, str(path)
+        return len(queue)
+
+    live = [d for d in docs if d.uuid != "u3"]
+    monkeypatch.setattr(s, "ensure_session", noop)
+    monkeypatch.setattr(s, "_open_file_history", open_fh)
+    monkeypatch.setattr(scraper, "parse_file_history", lambda html: {"documents": live})
+    monkeypatch.setattr(s, "_download_docs", download_docs)
+    assert asyncio.run(s.download_pending()) == 2
+    assert opened == ["1"] and fetched == ["u1", "u2"]
+    assert docs[0].local_path == str(kept)
+    assert not docs[3].downloaded
+
+
+def test_download_pending_applies_the_policy(s, monkeypatch):
+    docs = [scraper.Document("CLERK DUE SLIP", uuid="u0", has_link=True),
+            scraper.Document("WILL", uuid="u1", has_link=True)]
+    s.cases = [scraper.Case("Albany", "1", documents=docs)]
+    s.download_policy = scraper.DownloadPolicy(exclude=["SLIP"])
+    fetched = []
+
+    async def noop(*args, **kwargs):
+        return "<html></html>"
+
+    async def download_docs(queue, documents, court, file_num):
+        fetched.extend(uuid for _, uuid, _ in queue)
+        return len(queue)
+
+    monkeypatch.setattr(s, "ensure_session", noop)
+    monkeypatch.setattr(s, "_open_file_history", noop)
+    monkeypatch.setattr(scraper, "parse_file_history", lambda html: {"documents": docs})
+    monkeypatch.setattr(s, "_download_docs", download_docs)
+    asyncio.run(s.download_pending())
+    assert fetched == ["u1"]
@@ -0,0 +1,44 @@
+import json
+from pathlib import Path
+
+import scraper
+
+NAMES = ["CLERK DUE SLIP", "AFFIDAVIT OF SERVICE", "WILL OF TESTATOR", "PROBATE PETITION",
+         "DECREE GRANTING PROBATE", "WAIVER AND CONSENT"]
+
+
+def queue_for(names):
+    docs = [scraper.Document(n, uuid=f"u{i}", has_link=True) for i, n in enumerate(names)]
+    return [(i, d.uuid, Path(f"{i}.pdf")) for i, d in enumerate(docs)], docs
+
+
+def test_exclude_wins_and_include_filters():
+    p = scraper.DownloadPolicy(include=["probate", "will"], exclude=["^decree"])
+    queue, docs = queue_for(NAMES)
+    assert [docs[q[0]].doc_name for q in p.select(queue, docs)] == [
+        "WILL OF TESTATOR", "PROBATE PETITION"]
+
+
+def test_priority_order_then_page_order_and_cap():
+    p = scraper.DownloadPolicy(exclude=["CLERK DUE SLIP", "^AFFIDAVIT OF SERVICE"],
+                               priority=["WILL OF TESTATOR", "DECREE"], max_per_file=3)
+    queue, docs = queue_for(NAMES)
+    assert [docs[q[0]].doc_name for q in p.select(queue, docs)] == [
+        "WILL OF TESTATOR", "DECREE GRANTING PROBATE", "PROBATE PETITION"]
+    assert (p.considered, p.skipped) == (6, 3)
+
+
+def test_savings_estimate():
+    p = scraper.DownloadPolicy(max_per_file=1)
+    queue, docs = queue_for(NAMES[:3])
+    p.select(queue, docs)
+    p.record(1, 2 * 1_048_576, 30.0)
+    assert p.summary() == {"considered": 3, "skipped": 2, "downloaded": 1,
+                           "est_mb_saved": 4.0, "est_min_saved": 1.0}
+
+
+def test_from_file(tmp_path):
+    path = tmp_path / "policy.json"
+    path.write_text(json.dumps({"exclude": ["SLIP"], "max_per_file": 2}))
+    p = scraper.DownloadPolicy.from_file(path)
+    assert not p.allows("CLERK DUE SLIP") and p.allows("WILL") and p.max_per_file == 2
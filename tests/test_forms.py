@@ -0,0 +1,45 @@
+import asyncio
+
+import pytest
+
+import scraper
+
+
+@pytest.fixture
+def index_form(s, page, monkeypatch):
+    """_submit_index_search with navigation stubbed out and every field present."""
+    async def noop(*args, **kwargs):
+        return "<html>results</html>"
+
+    for name in ("_navigate", "_mark_page", "_wait_for_navigation"):
+        monkeypatch.setattr(s, name, noop)
+    monkeypatch.setattr(scraper.asyncio, "sleep", noop)
+    monkeypatch.setattr(s.rate_limiter, "acquire", noop)
+    page.results["function(cands"] = lambda js: js.split('["')[1].split('"')[0]
+    page.results["function(ids)"] = "OldIndexSearchSubmit"
+
+
+def test_set_field_matches_ids_exactly():
+    assert "indexOf" not in scraper.JS_SET_FIELD
+    assert "querySelectorAll" not in scraper.JS_SET_FIELD
+
+
+def test_index_search_clicks_its_own_submit(s, page, index_form):
+    html = asyncio.run(s._submit_index_search("old_index", "Albany", last_name="DOE"))
+    assert html == "<html>results</html>"
+    assert page.scripts[-1] == 'document.getElementById("OldIndexSearchSubmit").click()'
+
+
+def test_missing_field_fails_the_search(s, page, index_form):
+    page.results["function(cands"] = lambda js: "" if "LastName" in js else "CourtSelect"
+    with pytest.raises(RuntimeError, match="no field LastName"):
+        asyncio.run(s._submit_index_search("old_index", "Albany", last_name="DOE"))
+    assert not any(".click()" in js for js in page.scripts)
+
+
+def test_missing_submit_fails_the_search(s, page, index_form):
+    page.results["function(ids)"] = ""
+    with pytest.raises(RuntimeError, match="no submit button"):
+        asyncio.run(s._submit_index_search("will", "Albany", last_name="DOE"))
+    assert not any(".click()" in js for js in page.scripts)
+    assert scraper.JS_CLICK_SUBMIT not in page.scripts
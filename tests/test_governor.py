@@ -0,0 +1,146 @@
+import asyncio
+import base64
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+import scraper
+
+
+def test_reason_checks_memory_tabs_and_file_count():
+    g = scraper.BrowserGovernor(max_mb=100, max_tabs=2, restart_every=10)
+    assert g.reason(50 * 1_048_576, 2, 9) is None
+    assert g.reason(150 * 1_048_576, 1, 0) == "PSS 150 MB > 100 MB"
+    assert g.reason(None, 3, 0) == "3 tabs open"
+    assert g.reason(None, 1, 10) == "10 files since launch"
+    g.restarted(10)
+    assert g.reason(None, 1, 19) is None and g.restarts == 1
+    assert g.summary().endswith("peak PSS 150 MB")
+
+
+@pytest.mark.skipif(not Path("/proc/self/smaps_rollup").exists(), reason="needs smaps_rollup")
+def test_process_tree_pss_reads_smaps_rollup():
+    pss = scraper.process_tree_pss(os.getpid())
+    assert pss and pss > 1_048_576
+    assert scraper.process_tree_pss(None) is None
+
+
+class Chrome:
+    def __init__(self, page):
+        self.tabs = [page]
+        self.stopped = False
+
+    def stop(self):
+        self.stopped = True
+
+
+@pytest.fixture
+def governed(s, page, monkeypatch):
+    """s with a governor that restarts Chrome before every unit; returns
+    the list of launch outcomes to play back (True = success)."""
+    s.governor = scraper.BrowserGovernor(max_mb=0, max_tabs=0, restart_every=1)
+    s._browser = Chrome(page)
+    s.progress.files_done = 1
+    outcomes = []
+
+    async def init_browser():
+        s._browser = Chrome(page)
+        if not outcomes.pop(0):
+            raise RuntimeError("Chrome failed to start")
+        s._page = page
+
+    async def noop(*args):
+        return 0
+
+    monkeypatch.setattr(s, "_init_browser", init_browser)
+    monkeypatch.setattr(s, "_close_orphan_tabs", noop)
+    monkeypatch.setattr(scraper.asyncio, "sleep", noop)
+    return outcomes
+
+
+def test_failed_relaunch_is_retried(s, page, governed):
+    governed += [False, True]
+    asyncio.run(s._govern())
+    assert s._page is page and s.governor.restarts == 1
+
+
+def test_relaunch_gives_up_with_browser_lost_then_tries_again(s, page, governed):
+    governed += [False] * scraper.RELAUNCH_ATTEMPTS
+    with pytest.raises(scraper.BrowserLost):
+        asyncio.run(s._govern())
+    assert s._browser is None and s._page is None
+    governed.append(True)
+    asyncio.run(s._govern())
+    assert s._page is page and s.governor.restarts == 1
+
+
+def test_browser_lost_aborts_the_unit_loop(s, monkeypatch):
+    calls = []
+
+    async def run_bulk_unit(unit):
+        calls.append(unit)
+        raise scraper.BrowserLost("Chrome could not be relaunched")
+
+    monkeypatch.setattr(s, "_run_bulk_unit", run_bulk_unit)
+    with pytest.raises(scraper.BrowserLost):
+        asyncio.run(s._run_units([{"court": "Albany"}, {"court": "Bronx"}]))
+    assert len(calls) == 1
+
+
+def test_governor_is_opt_in(tmp_path):
+    assert scraper.WebSurrogateScraper(profile_dir=tmp_path).governor is None
+    parser = scraper.build_parser()
+    g = scraper.governor_from_args(parser.parse_args(["--max-browser-mb", "512"]))
+    assert (g.max_mb, g.max_tabs) == (512, 4)
+    assert scraper.governor_from_args(parser.parse_args(["--no-governor"])) is None
+
+
+GOOD_PDF = b"%PDF-1.7\n" + b"0" * 100 + b"\n%%EOF\n"
+
+
+class Tab:
+    def __init__(self, browser, url, close_fails=False):
+        self.browser, self.url, self.close_fails = browser, url, close_fails
+        browser.tabs.append(self)
+
+    async def evaluate(self, js, **kwargs):
+        if self.browser.late:  # a tab that opens too late to be matched to its document
+            Tab(self.browser, scraper.VIEWER_BASE + "/late")
+            self.browser.late = False
+        data = "data:application/pdf;base64," + base64.b64encode(GOOD_PDF).decode()
+        return json.dumps({"ok": True, "data": data})
+
+    async def close(self):
+        if self.close_fails:
+            raise RuntimeError("close failed")
+        self.browser.tabs.remove(self)
+
+
+def test_only_viewer_tabs_a_batch_opened_are_closed(s, page, tmp_path, monkeypatch):
+    async def noop(*args):
+        pass
+
+    monkeypatch.setattr(scraper.asyncio, "sleep", noop)
+    browser = s._browser
+    browser.late = True
+    user_tab = Tab(browser, "https://accounts.example.com/sso")
+    opened = iter([False, True])  # the second viewer tab won't close
+
+    async def evaluate(js, **kwargs):
+        if "FHForm" in js:
+            Tab(browser, scraper.VIEWER_BASE + "/viewer", close_fails=next(opened))
+
+    monkeypatch.setattr(page, "evaluate", evaluate)
+    s.governor = scraper.BrowserGovernor()
+    s._viewer_cf_cleared = True
+    queue = [(0, "u0", tmp_path / "a.pdf"), (1, "u1", tmp_path / "b.pdf")]
+    results = asyncio.run(s._batch_download(queue))
+    assert [ok for _, ok, _ in results] == [True, True]
+    assert browser.tabs[:2] == [page, user_tab]
+    assert [t.url for t in browser.tabs[2:]] == [scraper.VIEWER_BASE + "/viewer"]
+    assert s._viewer_tabs == browser.tabs[2:] and s.governor.orphans_closed == 1
+    browser.tabs[2].close_fails = False
+    assert asyncio.run(s._close_orphan_tabs()) == 1
+    assert browser.tabs == [page, user_tab] and s._viewer_tabs == []
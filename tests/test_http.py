@@ -0,0 +1,75 @@
+import asyncio
+import json
+
+import scraper
+
+
+class FakePool:
+    size = 1
+    jobs = 0
+
+    def __init__(self):
+        self.calls = []
+
+    async def run(self, job):
+        self.calls.append(job)
+        await asyncio.sleep(0)
+        case = scraper.Case(job["court"], job.get("file_number", "1"),
+                            documents=[scraper.Document("WILL", uuid="u1", has_link=True)],
+                            related_files=["2020-2"])
+        return {"search_results": [], "cases": [case.to_row()]}
+
+
+def test_ttl_cache_expires_and_evicts(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(scraper.time, "monotonic", lambda: now[0])
+    c = scraper.TTLCache(maxsize=2, ttl=10)
+    c.put("a", 1)
+    c.put("b", 2)
+    assert c.get("a") == 1
+    c.put("c", 3)  # evicts b, the least recently used
+    assert c.get("b") is None and len(c) == 2
+    now[0] += 11
+    assert c.get("a") is None
+    assert (c.hits, c.misses) == (1, 2)
+
+
+def test_latency_stats_summary():
+    stats = scraper.LatencyStats(window=3)
+    for ms in (10, 20, 30, 40):
+        stats.record("/search", ms / 1000)
+    stats.record("/search", 0.05, ok=False)
+    assert stats.summary()["/search"] == {
+        "count": 3, "errors": 1, "p50_ms": 40.0, "p95_ms": 50.0, "max_ms": 50.0}
+
+
+def test_file_history_is_structured_cached_and_coalesced():
+    pool = FakePool()
+    svc = scraper.LookupService(pool)
+
+    async def run():
+        return await asyncio.gather(svc.file_history("Kings", "2025-1"),
+                                    svc.file_history("Kings", "2025-1"))
+
+    first, second = asyncio.run(run())
+    assert first == second and len(pool.calls) == 1 and svc.coalesced == 1
+    case = first[0]
+    assert case["documents"][0]["uuid"] == "u1"
+    assert case["related_files"] == ["2020-2"] and case["parties"] == []
+    assert asyncio.run(svc.file_history("Kings", "2025-1")) == first
+    assert len(pool.calls) == 1
+
+
+def test_search_rejects_a_non_object_body():
+    svc = scraper.LookupService(FakePool())
+    for body in (b"[1, 2]", b'"x"', b"3"):
+        status, payload = asyncio.run(svc._route("POST", "/search", {}, body))
+        assert status == 400 and "JSON object" in payload["error"]
+
+
+def test_search_returns_structured_cases():
+    svc = scraper.LookupService(FakePool())
+    job = {"search_type": "file_number", "court": "Kings", "file_number": "2025-1"}
+    status, payload = asyncio.run(svc._route("POST", "/search", {}, json.dumps(job).encode()))
+    assert status == 200
+    assert isinstance(payload["cases"][0]["documents"], list)
@@ -0,0 +1,44 @@
+import asyncio
+
+import pytest
+
+import scraper
+
+
+def row(num, btn="b"):
+    return scraper.SearchRow(btn_value=btn and f"{btn}{num}", file_num=num)
+
+
+def test_rows_are_deduplicated_per_court(s):
+    s._ingest_rows([row("1"), row("2"), row("1")], "Albany")
+    s._ingest_rows([row("2"), row("3")], "Albany")
+    s._ingest_rows([row("2")], "Bronx")
+    assert [(r.court, r.file_num) for r in s.search_results] == [
+        ("Albany", "1"), ("Albany", "2"), ("Albany", "3"), ("Bronx", "2")]
+    assert (s.progress.rows_found, s.progress.duplicates) == (4, 2)
+
+
+def test_rows_without_a_file_link_are_always_kept(s):
+    s._ingest_rows([row("1", btn=""), row("1", btn="")], "Albany")
+    assert len(s.search_results) == 2
+
+
+def test_failed_attempt_rolls_back_its_rows(s, monkeypatch):
+    async def noop(*args):
+        pass
+
+    monkeypatch.setattr(scraper.asyncio, "sleep", noop)
+    s.retry.max_attempts = 1
+    s._ingest_rows([row("1")], "Albany")
+
+    async def attempt():
+        s._ingest_rows([row("2")], "Albany")
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(s._run_with_retry("unit", {"court": "Albany"}, attempt))
+    assert [r.file_num for r in s.search_results] == ["1"]
+    assert s._seen_rows == {("Albany", "1")}
+    assert (s.progress.rows_found, s.progress.duplicates) == (1, 0)
+    s._ingest_rows([row("2")], "Albany")  # the retry is not a duplicate
+    assert s.progress.duplicates == 0
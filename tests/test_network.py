@@ -0,0 +1,43 @@
+import asyncio
+from types import SimpleNamespace
+
+import scraper
+
+
+class FakeTab:
+    def __init__(self):
+        self.sent = []
+
+    async def send(self, cmd):
+        self.sent.append(cmd)
+
+
+def paused(url):
+    return SimpleNamespace(request=SimpleNamespace(url=url), request_id="r1")
+
+
+def test_allows_challenge_hosts_and_paths_only():
+    f = scraper.ResourceFilter()
+    assert f.allows("https://challenges.cloudflare.com/turnstile/v0/api.js")
+    assert f.allows("https://newassets.hcaptcha.com/captcha/v1/img.png")
+    assert f.allows(scraper.BASE + "/cdn-cgi/challenge-platform/h/b/orchestrate")
+    assert not f.allows(scraper.BASE + "/Content/site.css")
+    assert not f.allows("https://evilhcaptcha.com/x.png")
+    assert not f.allows("https://fonts.gstatic.com/s/roboto.woff2")
+
+
+def test_paused_requests_are_continued_or_failed():
+    f, tab = scraper.ResourceFilter(), FakeTab()
+    asyncio.run(f._on_paused(paused("https://hcaptcha.com/i.png"), tab))
+    asyncio.run(f._on_paused(paused(scraper.BASE + "/logo.png"), tab))
+    assert (f.passed, f.blocked) == (1, 1)
+    assert len(tab.sent) == 2
+
+
+def test_network_meter_counts_bytes():
+    m = scraper.NetworkMeter()
+    m._on_finished(SimpleNamespace(encoded_data_length=1200.0))
+    m._on_finished(SimpleNamespace(encoded_data_length=300))
+    assert (m.bytes, m.requests) == (1500, 2)
+    m.reset()
+    assert (m.bytes, m.requests) == (0, 0)
@@ -0,0 +1,136 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+import scraper
+
+
+def table(nums):
+    rows = "".join(f'<tr><td>{n}</td><td>01/01/2025</td>'
+                   f'<td><button name="button" value="b{n}">{n}</button></td></tr>'
+                   for n in nums)
+    return f'<table id="NameResultsTable"><tbody>{rows}</tbody></table>'
+
+
+PAGES = [table(range(p * 10, p * 10 + 10)) for p in range(3)]
+
+
+@pytest.fixture
+def pager(s, page, monkeypatch):
+    """A three-page server-side pager: clicking Next loads the next page."""
+    async def noop(*args):
+        pass
+
+    monkeypatch.setattr(scraper.asyncio, "sleep", noop)
+    monkeypatch.setattr(s.rate_limiter, "acquire", noop)
+    current = [0]
+    page.html = PAGES[0]
+
+    def click(js):
+        if current[0] == len(PAGES) - 1:
+            return False
+        current[0] += 1
+        page.html = PAGES[current[0]]
+        return True
+
+    page.results["el.click();"] = click
+    page.results["page_rows"] = lambda js: json.dumps(
+        {"table": True, "page_rows": 10, "next": current[0] < len(PAGES) - 1})
+    return current
+
+
+def test_pager_is_stepped_to_the_last_page(s, pager):
+    rows = asyncio.run(s._all_results(PAGES[0]))
+    assert [r.file_num for r in rows] == [str(n) for n in range(30)]
+
+
+def test_a_throwing_next_click_stops_paging(s, page, pager):
+    page.results["el.click();"] = SimpleNamespace(text="Uncaught TypeError")  # ExceptionDetails
+    rows = asyncio.run(s._all_results(PAGES[0]))
+    assert len(rows) == 10 and pager[0] == 0
+    assert scraper.JS_GET_HTML not in page.scripts  # no wait for a page that never comes
+
+
+def test_a_failed_paging_check_keeps_the_rows_so_far(s, page, pager):
+    calls = []
+
+    def paging(js):
+        calls.append(js)
+        if len(calls) > 1:
+            raise RuntimeError("target closed")
+        return json.dumps({"table": True, "page_rows": 10, "next": True})
+
+    page.results["page_rows"] = paging
+    rows = asyncio.run(s._all_results(PAGES[0]))
+    assert len(rows) == 20 and pager[0] == 1
+
+
+def test_datatable_rows_are_read_from_the_api(s, page):
+    api_rows = [f'<tr><td>{n}</td><td>01/01/2025</td></tr>' for n in range(25)]
+    page.results["page_rows"] = json.dumps(
+        {"table": True, "page_rows": 10, "next": True, "datatable": True, "rows": api_rows})
+    rows = asyncio.run(s._all_results(PAGES[0]))
+    assert len(rows) == 25
+    assert not any("el.click();" in js for js in page.scripts)
+
+
+def posts(page):
+    return [js for js in page.scripts if "form.submit()" in js]
+
+
+def test_a_button_missing_from_the_page_is_not_posted(s, page, monkeypatch):
+    async def noop(*args):
+        pass
+
+    monkeypatch.setattr(s.rate_limiter, "acquire", noop)
+    page.html = PAGES[0]
+    with pytest.raises(RuntimeError, match="No result button"):
+        asyncio.run(s._click_file_number("stale"))
+    assert posts(page) == []
+
+
+def test_rows_read_from_other_pages_are_posted(s, page, pager, monkeypatch):
+    async def navigated(timeout=10.0):
+        return "<html>file history</html>"
+
+    monkeypatch.setattr(s, "_wait_for_navigation", navigated)
+    rows = asyncio.run(s._all_results(PAGES[0]))
+    page.results["closest('form')"] = True  # the post script
+    assert asyncio.run(s._click_file_number(rows[0].btn_value)) == "<html>file history</html>"
+    assert posts(page) and '"b0"' in posts(page)[0]
+    asyncio.run(s._all_results(table(range(3))))  # a new search forgets them
+    with pytest.raises(RuntimeError):
+        asyncio.run(s._click_file_number(rows[0].btn_value))
+
+
+@pytest.fixture
+def truncations(s, monkeypatch):
+    events = []
+    monkeypatch.setattr(s.events, "emit",
+                        lambda kind, **kw: events.append(kw) if kind == "results_truncated" else None)
+    return events
+
+
+def test_a_fully_walked_pager_is_not_truncated(s, page, pager, truncations, monkeypatch):
+    pages = [table(range(p * 50, p * 50 + 50)) for p in range(2)]
+    monkeypatch.setitem(globals(), "PAGES", pages)
+    page.html = PAGES[0]
+    rows = asyncio.run(s._all_results(PAGES[0]))
+    assert len(rows) == 100 and truncations == []
+
+
+def test_a_cap_without_a_pager_is_flagged(s, page, truncations):
+    page.results["page_rows"] = json.dumps({"table": True, "page_rows": 100, "next": False})
+    asyncio.run(s._all_results(table(range(100))))
+    assert truncations == [{"rows": 100}]
+
+
+def test_a_server_total_beyond_the_rows_read_is_flagged(s, page, truncations):
+    page_rows = [f'<tr><td>{n}</td></tr>' for n in range(10)]
+    page.results["page_rows"] = json.dumps(
+        {"table": True, "page_rows": 10, "next": True, "datatable": True, "rows": page_rows,
+         "total": 37})
+    asyncio.run(s._all_results(table(range(10))))
+    assert truncations == [{"rows": 10, "total": 37}]
@@ -0,0 +1,74 @@
+import asyncio
+
+import pytest
+
+import scraper
+
+GOOD = b"%PDF-1.7\n" + b"0" * 5000 + b"\n%%EOF\n"
+
+
+@pytest.mark.parametrize("data, expected, problem", [
+    (GOOD, None, None),
+    (GOOD, len(GOOD), None),
+    (b"\xef\xbb\xbf" + GOOD, None, None),  # leading junk is tolerated
+    (b"", None, "empty"),
+    (GOOD, len(GOOD) + 10, f"truncated ({len(GOOD)} of {len(GOOD) + 10} bytes)"),
+    (b"  <html><body>Just a moment...</body></html>", None, "HTML instead of PDF"),
+    (b"PK\x03\x04zip", None, "no %PDF- header"),
+    (GOOD[:-20], None, "no %%EOF trailer"),
+])
+def test_pdf_problem(data, expected, problem):
+    assert scraper.pdf_problem(data, expected) == problem
+
+
+def test_pdf_file_problem_reads_both_ends(tmp_path):
+    path = tmp_path / "a.pdf"
+    path.write_bytes(GOOD)
+    assert scraper.pdf_file_problem(path) is None
+    path.write_bytes(GOOD[:3000])
+    assert scraper.pdf_file_problem(path) == "no %%EOF trailer"
+
+
+@pytest.mark.parametrize("result, size", [
+    ({"length": "1234"}, 1234),
+    ({"length": "1234", "encoding": "gzip"}, None),
+    ({"length": ""}, None),
+    ({"length": "n/a"}, None),
+    ({}, None),
+])
+def test_expected_size(result, size):
+    assert scraper._expected_size(result) == size
+
+
+def test_verify_downloads_requeues_corrupt_files(s):
+    folder = s.download_dir / "DOE"
+    folder.mkdir(parents=True)
+    good, bad, orphan = folder / "good.pdf", folder / "bad.pdf", folder / "orphan.pdf"
+    good.write_bytes(GOOD)
+    bad.write_bytes(b"<html>error</html>")
+    orphan.write_bytes(b"")
+    docs = [scraper.Document("GOOD", uuid="u0", downloaded=True, local_path=str(good)),
+            scraper.Document("BAD", uuid="u1", downloaded=True, local_path=str(bad))]
+    s.cases = [scraper.Case("Albany", "1", documents=docs)]
+    assert sorted(s.verify_downloads()) == sorted([bad, orphan])
+    assert docs[0].downloaded and not docs[1].downloaded and not docs[1].local_path
+    assert (folder / "bad.pdf.corrupt").exists() and not bad.exists()
+
+
+def test_verify_downloads_cli_needs_no_scraper(output_dir, monkeypatch):
+    bad = output_dir / "downloads" / "DOE" / "bad.pdf"
+    bad.parent.mkdir(parents=True)
+    bad.write_bytes(b"")
+    doc = scraper.Document("BAD", uuid="u1", downloaded=True, local_path=str(bad))
+    scraper.save_results([], [scraper.Case("Albany", "1", documents=[doc])], "r")
+
+    def no_scraper(*args, **kwargs):
+        raise AssertionError("--verify-downloads must not create a scraper")
+
+    monkeypatch.setattr(scraper, "WebSurrogateScraper", no_scraper)
+    parser = scraper.build_parser()
+    args = parser.parse_args(["--verify-downloads", "--output", "r"])
+    asyncio.run(scraper.run(args, parser, scraper.RunProfiler()))
+    _, cases = scraper.load_results("r")
+    assert not cases[0].documents[0].downloaded
+    assert not (output_dir / "session_stats.json").exists()
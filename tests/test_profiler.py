@@ -0,0 +1,44 @@
+import asyncio
+import logging
+import pstats
+import tracemalloc
+
+import scraper
+
+
+def test_cpu_profile_is_written(tmp_path):
+    path = tmp_path / "prof" / "run.pstats"
+    p = scraper.RunProfiler(cpu_path=str(path))
+    p.start()
+    sum(i * i for i in range(10_000))
+    p.stop()
+    assert pstats.Stats(str(path)).total_calls > 0
+
+
+def test_memory_checkpoints_log_top_allocators(caplog):
+    p = scraper.RunProfiler(mem_top=3)
+    caplog.set_level(logging.INFO, logger="scraper")
+    p.start()
+    try:
+        hold = [bytes(1000) for _ in range(1000)]
+        p.checkpoint("chunk 1")
+    finally:
+        p.stop()
+    assert hold and not tracemalloc.is_tracing()
+    messages = [r.getMessage() for r in caplog.records]
+    assert any(m.startswith("Memory after chunk 1") for m in messages)
+    assert any(m.startswith("Memory after run") for m in messages)
+
+
+def test_checkpoint_is_a_noop_without_tracing():
+    scraper.RunProfiler().checkpoint("x")
+    assert not tracemalloc.is_tracing()
+
+
+def test_slow_callback_puts_the_loop_in_debug_mode():
+    async def run():
+        scraper.RunProfiler(slow_callback=0.05).start()
+        loop = asyncio.get_running_loop()
+        return loop.get_debug(), loop.slow_callback_duration
+
+    assert asyncio.run(run()) == (True, 0.05)
@@ -0,0 +1,56 @@
+import asyncio
+
+import scraper
+
+STALE = "<html><body>Request Could Not Be Processed</body></html>"
+
+
+def test_penalize_halves_rate_and_cools_down():
+    b = scraper.TokenBucket(60, burst=2, min_rpm=6)
+    b.penalize(cooldown=5.0)
+    assert b.rpm == 30 and b.tokens == 0
+    assert b.cooldown_until > 0
+    for _ in range(10):
+        b.penalize(cooldown=0)
+    assert b.rpm == 6  # floor
+
+
+def test_reward_creeps_back_to_ceiling():
+    b = scraper.TokenBucket(60)
+    b.penalize(cooldown=0)
+    b.reward()
+    assert b.rpm == 33 and b.penalties == 0
+    for _ in range(20):
+        b.reward()
+    assert b.rpm == 60
+
+
+def test_acquire_serves_burst_without_waiting():
+    b = scraper.TokenBucket(600, burst=3)
+
+    async def take(n):
+        return [await b.acquire() for _ in range(n)]
+
+    assert asyncio.run(take(3)) == [0.0, 0.0, 0.0]
+
+
+def test_rate_limiter_keeps_one_bucket_per_host():
+    rl = scraper.RateLimiter(60)
+    assert rl.bucket(scraper.BASE + "/File/FileSearch") is rl.bucket(scraper.BASE)
+    assert rl.bucket(scraper.VIEWER_BASE) is not rl.bucket(scraper.BASE)
+    rl.penalize(scraper.VIEWER_BASE)
+    assert rl.bucket(scraper.BASE).rpm == 60
+
+
+def test_stale_page_penalized_once_per_navigation(s, page, monkeypatch):
+    page.html = STALE
+    calls = []
+    monkeypatch.setattr(s.rate_limiter, "penalize", lambda url=None, reason="": calls.append(reason))
+
+    async def reauth(*args, **kwargs):
+        page.html = "<html>ok</html>"
+
+    monkeypatch.setattr(s, "_reauthenticate", reauth)
+    monkeypatch.setattr(s.rate_limiter, "acquire", lambda url=None: asyncio.sleep(0))
+    asyncio.run(s._navigate(scraper.URLS["file"]))
+    assert len(calls) == 1
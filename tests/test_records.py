@@ -0,0 +1,48 @@
+import json
+
+import scraper
+
+
+def test_search_row_round_trip():
+    d = {"btn_value": "v1", "file_num": "2025-1", "file_date": "01/17/2025",
+         "file_name": "RIEDER, ABE J", "proceeding": "PROBATE PETITION", "dod": "", "court": "Kings"}
+    r = scraper.SearchRow.from_dict(d)
+    assert r.file_date_iso == "2025-01-17" and r.extra is None
+    out = r.to_dict()
+    assert {k: out[k] for k in d} == d
+    assert scraper.SearchRow.from_dict(out) == r
+
+
+def test_historical_row_keeps_only_its_columns():
+    r = scraper.SearchRow.from_dict({"btn_value": "", "file_num": "", "file_name": "DOE",
+                                     "book": "12", "search_type": "index_book"})
+    assert r.extra == {"book": "12", "search_type": "index_book"}
+    assert r.to_dict() == {"btn_value": "", "file_num": "", "file_name": "DOE",
+                           "name_key": r.name_key, "book": "12",
+                           "search_type": "index_book", "court": ""}
+
+
+def test_case_row_round_trip():
+    case = scraper.Case(
+        "Kings", "2025-1", file_name="RIEDER, ABE J", letters_issued="02/03/2025",
+        parties=[scraper.Party("RIEDER, ABE J", "Decedent", "01/01/2025")],
+        documents=[scraper.Document("WILL", doc_filed="01/17/2025", uuid="u1", has_link=True,
+                                    downloaded=True, local_path="/x/WILL.pdf"),
+                   scraper.Document("RECEIPT")],
+        related_files=["2024-9"])
+    row = case.to_row()
+    assert isinstance(row["documents"], str) and row["document_count"] == 2
+    assert "local_path" not in json.loads(row["documents"])[1]
+    assert scraper.Case.from_row(row) == case
+    assert scraper.Case.from_row(json.loads(json.dumps(row))) == case
+
+
+def test_empty_nested_columns_are_blank():
+    row = scraper.Case("Kings", "1").to_row()
+    assert row["parties"] == row["documents"] == row["related_files"] == ""
+    assert scraper.Case.from_row(row) == scraper.Case("Kings", "1")
+
+
+def test_records_are_slotted():
+    r = scraper.SearchRow()
+    assert not hasattr(r, "__dict__")
@@ -0,0 +1,120 @@
+import asyncio
+import json
+
+import scraper
+
+
+def read_queue(dlq):
+    if not dlq.path.exists():
+        return []
+    return [json.loads(line) for line in dlq.path.read_text().splitlines() if line.strip()]
+
+
+def test_classify_failure():
+    assert scraper.classify_failure(asyncio.TimeoutError()) == scraper.FAIL_TIMEOUT
+    assert scraper.classify_failure("Request Could Not Be Processed") == scraper.FAIL_SESSION
+    assert scraper.classify_failure("not PDF (text/html)") == scraper.FAIL_VIEWER
+    assert scraper.classify_failure(KeyError("x")) == scraper.FAIL_PARSE
+    assert scraper.classify_failure(RuntimeError("boom")) == scraper.FAIL_OTHER
+
+
+def test_retry_policy_budgets_and_delay():
+    p = scraper.RetryPolicy(max_attempts=3, base=2.0, cap=5.0)
+    assert p.should_retry(scraper.FAIL_TIMEOUT, 2)
+    assert not p.should_retry(scraper.FAIL_TIMEOUT, 3)
+    assert not p.should_retry(scraper.FAIL_PARSE, 2)
+    assert all(0 <= p.delay(10) <= 5.0 for _ in range(20))
+
+
+def test_dead_letter_replay_requeues_kept_entries(tmp_path):
+    dlq = scraper.DeadLetterQueue(tmp_path / "dl.jsonl")
+    dlq.add("file", "other", "boom", 3, court="C", file_num="1")
+    dlq.add("file", "other", "boom", 3, court="C", file_num="2")
+    entries = dlq.take()
+    assert [e["file_num"] for e in entries] == ["1", "2"]
+    assert not dlq.path.exists()
+    dlq.finish_replay(keep=entries[1:])
+    assert [e["file_num"] for e in read_queue(dlq)] == ["2"]
+    assert dlq.take() == entries[1:]
+
+
+def fake_rescrape(s, seen, found=True):
+    async def file_search_by_number(court, file_num, deep=False, skip=None, reuse_form=False):
+        seen.append(file_num in skip)
+        if found:
+            s._store_case(scraper.Case(court, file_num, file_name="NEW"))
+            s._skip_files(court).add(file_num)
+            s.progress.file_finished(0.1)
+        return []
+    return file_search_by_number
+
+
+def test_replayed_file_bypasses_skip_set_and_replaces_case(s, monkeypatch):
+    s.cases = [scraper.Case("C", "1", file_name="OLD"), scraper.Case("C", "2")]
+    s._skip_files("C").update({"1", "2"})
+    s.dead_letter.add("file", "other", "boom", 3, court="C", file_num="1")
+    seen = []
+    monkeypatch.setattr(s, "file_search_by_number", fake_rescrape(s, seen))
+    asyncio.run(s.retry_failed())
+    assert seen == [False]
+    assert [(c.file_number, c.file_name) for c in s.cases] == [("1", "NEW"), ("2", "")]
+    assert read_queue(s.dead_letter) == []
+
+
+def test_replay_keeps_entry_without_outcome(s, monkeypatch):
+    s.cases = [scraper.Case("C", "1")]
+    s._skip_files("C").add("1")
+    s.dead_letter.add("file", "other", "boom", 3, court="C", file_num="1")
+    monkeypatch.setattr(s, "file_search_by_number", fake_rescrape(s, [], found=False))
+    asyncio.run(s.retry_failed())
+    assert [e["file_num"] for e in read_queue(s.dead_letter)] == ["1"]
+    assert "1" in s._skip_files("C")
+
+
+def test_document_entries_update_loaded_case_in_place(s, monkeypatch):
+    docs = [scraper.Document("A", uuid="u1", has_link=True),
+            scraper.Document("B", uuid="u2", has_link=True),
+            scraper.Document("C", uuid="u3", has_link=True)]
+    case = scraper.Case("C", "1", file_name="DOE JOHN", documents=docs)
+    s.cases = [case]
+    for uuid in ("u1", "u2"):
+        s.dead_letter.add("document", "viewer", "not PDF", 3, court="C", file_num="1", uuid=uuid)
+    fetched = []
+
+    async def noop(*args, **kwargs):
+        return "<html></html>"
+
+    async def download_docs(queue, documents, court, file_num):
+        for idx, uuid, path in queue:
+            fetched.append(uuid)
+            if uuid == "u1":
+                documents[idx].downloaded = True
+            else:
+                s.dead_letter.add("document", "viewer", "not PDF", 3,
+                                  court=court, file_num=file_num, uuid=uuid)
+        return 1
+
+    async def rescrape(*args, **kwargs):
+        raise AssertionError("a document replay must not re-scrape the file")
+
+    monkeypatch.setattr(s, "ensure_session", noop)
+    monkeypatch.setattr(s, "_open_file_history", noop)
+    monkeypatch.setattr(scraper, "parse_file_history", lambda html: {"documents": docs})
+    monkeypatch.setattr(s, "_download_docs", download_docs)
+    monkeypatch.setattr(s, "file_search_by_number", rescrape)
+    asyncio.run(s.retry_failed())
+    assert fetched == ["u1", "u2"]
+    assert s.cases == [case] and docs[0].downloaded
+    # u1 succeeded, u2 was dead-lettered again: only the new entry remains
+    assert [e["uuid"] for e in read_queue(s.dead_letter)] == ["u2"]
+
+
+def test_store_case_replaces_by_key_after_reload(s):
+    s.cases.extend([scraper.Case("C", "1"), scraper.Case("C", "2")])
+    s._store_case(scraper.Case("C", "2", judge="X"))
+    s._store_case(scraper.Case("D", "2"))
+    assert [(c.court, c.file_number, c.judge) for c in s.cases] == [
+        ("C", "1", ""), ("C", "2", "X"), ("D", "2", "")]
+    s.cases = [scraper.Case("C", "2"), scraper.Case("C", "1"), scraper.Case("D", "2")]
+    s._store_case(scraper.Case("C", "1", judge="Y"))
+    assert [c.judge for c in s.cases] == ["", "Y", ""]
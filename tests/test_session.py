@@ -0,0 +1,61 @@
+import asyncio
+import json
+
+import scraper
+
+
+def expire_after(sm, age, **kwargs):
+    sm.mark_authenticated()
+    sm.started -= age
+    sm.mark_expired("test", **kwargs)
+
+
+def test_expected_lifetime_is_25th_percentile(tmp_path):
+    sm = scraper.SessionManager(tmp_path / "stats.json")
+    for age in (100, 400, 200):
+        expire_after(sm, age)
+    assert sm.expected_lifetime() == 100
+    expire_after(sm, 300)
+    assert sm.expected_lifetime() == 200
+    saved = json.loads((tmp_path / "stats.json").read_text())
+    assert len(saved["lifetimes"]) == 4
+    assert scraper.SessionManager(tmp_path / "stats.json").expected_lifetime() == 200
+
+
+def test_proactive_refresh_records_no_lifetime(tmp_path):
+    sm = scraper.SessionManager(tmp_path / "stats.json")
+    for age in (300, 300, 300):
+        expire_after(sm, age)
+    expire_after(sm, 10, sample=False)
+    assert len(sm.lifetimes) == 3 and sm.expected_lifetime() == 300
+    assert sm.reauths == 4 and sm.started is None
+
+
+def test_restored_session_records_no_lifetime():
+    sm = scraper.SessionManager()
+    sm.mark_authenticated(restored=True)
+    sm.mark_expired()
+    assert sm.lifetimes == []
+
+
+def test_due_for_refresh():
+    sm = scraper.SessionManager()
+    sm.lifetimes = [600.0] * 3
+    sm.mark_authenticated()
+    assert not sm.due_for_refresh(upcoming=60)
+    sm.started -= 590
+    assert sm.due_for_refresh(upcoming=60)
+
+
+def test_ensure_session_refreshes_proactively(s, monkeypatch):
+    s.session.lifetimes = [100.0] * 3
+    s.session.mark_authenticated()
+    s.session.started -= 200
+    calls = []
+
+    async def reauth(*args, **kwargs):
+        calls.append(kwargs)
+
+    monkeypatch.setattr(s, "_reauthenticate", reauth)
+    asyncio.run(s.ensure_session())
+    assert calls[0]["proactive"] is True and calls[0]["full_reset"] is False
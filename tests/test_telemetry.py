@@ -0,0 +1,45 @@
+import json
+
+import scraper
+
+
+def test_event_log_disabled_without_path():
+    log = scraper.EventLog(None)
+    log.emit("anything", x=1)
+    log.close()  # no file, no error
+
+
+def test_event_log_buffers_and_flushes(tmp_path):
+    path = tmp_path / "events.jsonl"
+    log = scraper.EventLog(path, flush_every=3)
+    log.emit("a", n=1)
+    log.emit("b", n=2)
+    assert path.read_text() == ""
+    log.emit("c", n=3)
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [e["event"] for e in lines] == ["a", "b", "c"]
+    assert all("ts" in e for e in lines)
+    log.emit("d")
+    log.close()
+    assert len(path.read_text().splitlines()) == 4
+
+
+def test_run_progress_eta_and_snapshot():
+    p = scraper.RunProgress(report_every=1e9)
+    p.add_units(4)
+    assert p.eta_seconds() is None  # no finished unit to extrapolate from
+    p.unit_finished(10.0)
+    p.unit_files(5)
+    p.file_finished(2.0, docs=1)
+    # 4 files left at 2s each + 2 units left at 10s each
+    assert p.eta_seconds() == 4 * 2.0 + 2 * 10.0
+    snap = p.snapshot()
+    assert snap["units_done"] == 1 and snap["files_done"] == 1
+    assert snap["docs_downloaded"] == 1
+
+
+def test_run_progress_counts_failed_units_as_errors():
+    p = scraper.RunProgress(report_every=1e9)
+    p.add_units(2)
+    p.unit_finished(1.0, failed=True)
+    assert p.errors == 1 and p.units_done == 1
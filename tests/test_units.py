@@ -0,0 +1,48 @@
+import asyncio
+from datetime import date
+
+import scraper
+
+
+def test_date_chunks_cover_the_range_without_overlap():
+    assert scraper.date_chunks(date(2025, 1, 1), date(2025, 2, 5), 30) == [
+        ("01/01/2025", "01/30/2025"), ("01/31/2025", "02/05/2025")]
+    assert scraper.date_chunks(date(2025, 1, 2), date(2025, 1, 1), 30) == []
+
+
+def test_unit_label():
+    unit = {"court": "Kings", "proceeding": "PROBATE PETITION", "deep": True,
+            "from_date": "01/01/2025", "to_date": "01/30/2025"}
+    assert scraper.unit_label(unit) == "Kings|PROBATE PETITION|01/01/2025-01/30/2025"
+    assert scraper.unit_label({"court": "Kings", "search_type": "index_book",
+                               "letter": "A"}) == "Kings|index_book|A"
+
+
+def test_proceedings_are_scheduled_court_major(s, monkeypatch):
+    units = []
+
+    async def run_units(batch):
+        units.extend(batch)
+
+    monkeypatch.setattr(s, "_run_units", run_units)
+    asyncio.run(s.bulk_file_search_by_info(
+        ["Albany", "Bronx"], ["PROBATE PETITION", "ADMINISTRATION"],
+        "2025-01-01", "2025-02-05", chunk_days=30))
+    assert [(u["court"], u["proceeding"], u["from_date"]) for u in units] == [
+        ("Albany", "PROBATE PETITION", "01/01/2025"), ("Albany", "PROBATE PETITION", "01/31/2025"),
+        ("Albany", "ADMINISTRATION", "01/01/2025"), ("Albany", "ADMINISTRATION", "01/31/2025"),
+        ("Bronx", "PROBATE PETITION", "01/01/2025"), ("Bronx", "PROBATE PETITION", "01/31/2025"),
+        ("Bronx", "ADMINISTRATION", "01/01/2025"), ("Bronx", "ADMINISTRATION", "01/31/2025")]
+
+
+def test_proceeding_not_offered_is_skipped_without_submitting(s, page):
+    s._court_proceedings["Albany"] = {"PROBATE PETITION"}
+    rows = asyncio.run(s.file_search_by_info("Albany", "ADMINISTRATION", "01/01/2025"))
+    assert rows == [] and page.scripts == []
+
+
+def test_extract_select_options():
+    html = ('<select id="SelectedProceeding"><option value="">Select</option>'
+            '<option value="PROBATE PETITION">Probate</option></select>')
+    assert scraper.extract_select_options(html, "SelectedProceeding") == {
+        "PROBATE PETITION": "Probate"}
@@ -0,0 +1,118 @@
+import asyncio
+from datetime import date
+
+import pytest
+
+import scraper
+
+
+def unit(from_date, to_date, court="Kings", proceeding="PROBATE PETITION"):
+    return {"court": court, "proceeding": proceeding, "from_date": from_date,
+            "to_date": to_date, "deep": False}
+
+
+def test_start_is_the_day_after_the_mark_minus_overlap(tmp_path):
+    w = scraper.WatermarkStore(tmp_path / "w.json")
+    assert w.start("Kings", "PROBATE PETITION") is None
+    w.marks["Kings|PROBATE PETITION"] = "2025-01-31"
+    assert w.start("Kings", "PROBATE PETITION", overlap_days=0) == date(2025, 2, 1)
+    assert w.start("Kings", "PROBATE PETITION") == date(2025, 1, 31)
+    assert w.start("Kings", "PROBATE PETITION", overlap_days=3) == date(2025, 1, 29)
+
+
+def test_unit_done_advances_only_over_contiguous_chunks(tmp_path):
+    path = tmp_path / "w.json"
+    w = scraper.WatermarkStore(path)
+    w.unit_done(unit("01/01/2025", "01/30/2025"))
+    assert w.get("Kings", "PROBATE PETITION") == date(2025, 1, 30)
+    w.unit_done(unit("03/01/2025", "03/30/2025"))  # leaves a gap: ignored
+    assert w.get("Kings", "PROBATE PETITION") == date(2025, 1, 30)
+    w.unit_done(unit("01/10/2025", "01/20/2025"))  # behind the mark: ignored
+    assert w.get("Kings", "PROBATE PETITION") == date(2025, 1, 30)
+    w.unit_done(unit("01/31/2025", "02/28/2025"))
+    assert w.get("Kings", "PROBATE PETITION") == date(2025, 2, 28)
+    assert scraper.WatermarkStore(path).marks == {"Kings|PROBATE PETITION": "2025-02-28"}
+
+
+def test_a_failed_chunk_freezes_its_pair_for_the_run(tmp_path):
+    w = scraper.WatermarkStore(tmp_path / "w.json")
+    w.unit_done(unit("01/01/2025", "01/30/2025"))
+    w.unit_failed(unit("01/31/2025", "03/01/2025"))
+    w.unit_done(unit("03/02/2025", "03/31/2025"))
+    w.unit_done(unit("01/01/2025", "01/30/2025", court="Bronx"))
+    assert w.marks == {"Kings|PROBATE PETITION": "2025-01-30",
+                       "Bronx|PROBATE PETITION": "2025-01-30"}
+
+
+@pytest.fixture
+def planned(s, monkeypatch):
+    units = []
+
+    async def run_units(batch):
+        units.extend(batch)
+
+    monkeypatch.setattr(s, "_run_units", run_units)
+    return units
+
+
+def test_since_last_run_starts_each_pair_at_its_watermark(s, planned, tmp_path):
+    s.watermarks = scraper.WatermarkStore(tmp_path / "w.json")
+    s.watermarks.marks = {"Kings|PROBATE PETITION": "2025-01-31",
+                          "Bronx|PROBATE PETITION": "2025-03-31"}
+    asyncio.run(s.bulk_file_search_by_info(
+        ["Kings", "Bronx", "Albany"], "PROBATE PETITION", None, "2025-03-01",
+        since_last_run=True))
+    assert [(u["court"], u["from_date"], u["to_date"]) for u in planned] == [
+        ("Kings", "01/31/2025", "03/01/2025")]
+
+
+def test_from_date_seeds_pairs_without_a_watermark(s, planned, tmp_path):
+    s.watermarks = scraper.WatermarkStore(tmp_path / "w.json")
+    s.watermarks.marks = {"Kings|PROBATE PETITION": "2025-02-20"}
+    asyncio.run(s.bulk_file_search_by_info(
+        ["Kings", "Albany"], "PROBATE PETITION", "2025-02-01", "2025-03-01",
+        since_last_run=True))
+    assert [(u["court"], u["from_date"]) for u in planned] == [
+        ("Kings", "02/20/2025"), ("Albany", "02/01/2025")]
+
+
+def test_run_units_moves_watermarks(s, tmp_path, monkeypatch):
+    s.watermarks = scraper.WatermarkStore(tmp_path / "w.json")
+
+    async def run_bulk_unit(u):
+        if u["court"] == "Bronx":
+            raise RuntimeError("boom")
+        return []
+
+    monkeypatch.setattr(s, "_run_bulk_unit", run_bulk_unit)
+    asyncio.run(s._run_units([unit("01/01/2025", "01/30/2025"),
+                              unit("01/01/2025", "01/30/2025", court="Bronx")]))
+    assert s.watermarks.marks == {"Kings|PROBATE PETITION": "2025-01-30"}
+
+
+def test_only_since_last_run_or_update_watermarks_moves_marks(tmp_path):
+    parser = scraper.build_parser()
+    base = ["--search-type", "file_info", "--watermarks", str(tmp_path / "w.json")]
+    one_off = parser.parse_args(base + ["--from-date", "2025-06-01"])
+    assert scraper.watermarks_from_args(one_off) is None
+    for flag in ("--since-last-run", "--update-watermarks"):
+        assert isinstance(scraper.watermarks_from_args(parser.parse_args(base + [flag])),
+                          scraper.WatermarkStore)
+
+
+def test_one_off_later_run_leaves_the_next_since_last_run_alone(s, tmp_path, monkeypatch):
+    async def run_bulk_unit(u):
+        return []
+
+    monkeypatch.setattr(s, "_run_bulk_unit", run_bulk_unit)
+    parser = scraper.build_parser()
+    base = ["--search-type", "file_info", "--watermarks", str(tmp_path / "w.json")]
+
+    def store(*flags):
+        return scraper.watermarks_from_args(parser.parse_args(base + list(flags)))
+
+    s.watermarks = store("--from-date", "2025-06-01")
+    asyncio.run(s.bulk_file_search_by_info(["Kings"], "PROBATE PETITION",
+                                           "2025-06-01", "2025-06-30"))
+    s.watermarks = store("--since-last-run")
+    assert s.watermarks.get("Kings", "PROBATE PETITION") is None